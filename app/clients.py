@@ -1,77 +1,331 @@
-from datetime import datetime, timezone, timedelta
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from datetime import datetime, timezone
+from typing import Annotated, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from database.session import get_app_db, get_admin_db
+from database.session import get_app_db, get_app_read_db, get_admin_db, new_admin_session, new_app_read_session
+from database.routing import replica_router
 from schema.s_client_update import ClientUpdate
-from database.db_customer import Client, ClientMain, ClientSettings, ClientSubscription
+from database.db_customer import Client, ClientMain, ClientSubscription
+from database.db_client_summary import ClientSummary
 from database.db_packages import Package
 from schema.s_client import ClientBase 
 from schema.s_client_list_base import ClientListBase
+from schema.s_client_batch import ClientBatchRequest
+from core.cache import Cache
+from core.config import settings
+from core.logging import get_logger
 from core.security import get_user_id, get_bearer_token, verify_user
 from database.db_updates import TrackUpdate
 from utils.send_updates import send_device1_update
+from utils import client_summary, columnar, dashboard_stats, etags, fieldsets, logos, singleflight
 
 
+logger = get_logger(__name__)
+
 router = APIRouter(prefix="/admin-api/customers", tags=[" Account"])
 
+# get_all_clients response fields and the columns they are read from
+CLIENT_LIST_FIELDS = {
+    "account_id": Client.account_id,
+    "business_name": Client.business_name,
+    "phone": Client.phone,
+    "email": ClientMain.business_email,
+    "subscribed": ClientSubscription.subscribed,
+    "package": ClientSubscription.package_id,
+    "onboarding": Client.onboarded_date,
+    "account_status": ClientMain.account_status
+}
+
+# The same fields read from ClientSummaries, plus its derived counters (only returned when requested)
+CLIENT_SUMMARY_FIELDS = {
+    "account_id": ClientSummary.account_id,
+    "business_name": ClientSummary.business_name,
+    "phone": ClientSummary.phone,
+    "email": ClientSummary.email,
+    "subscribed": ClientSummary.subscribed,
+    "package": ClientSummary.package,
+    "onboarding": ClientSummary.onboarding,
+    "account_status": ClientSummary.account_status,
+    "open_tickets": ClientSummary.open_tickets,
+    "device_limit": ClientSummary.device_limit,
+    "module_count": ClientSummary.module_count
+}
+
+# Serialized client details keyed by account_id
+client_detail_cache = Cache(
+    "client_detail",
+    settings.CLIENT_DETAIL_CACHE_TTL_SECONDS,
+    settings.CLIENT_DETAIL_CACHE_SIZE
+)
+
+
+def _build_client_list(appDb: Session, wanted: List[str], selected: Optional[List[str]]) -> List[Dict]:
+    # Fetch only the requested columns (never the logo blob), labelled with their response field names
+    clients = appDb.query(*fieldsets.select_columns(CLIENT_LIST_FIELDS, wanted, Client, key=Client.account_id)).all()
+
+    # ClientMain and ClientSubscription are only queried when one of their fields is requested
+    clientMainData = {}
+    if fieldsets.uses_model(CLIENT_LIST_FIELDS, wanted, ClientMain):
+        clientMainRows = appDb.query(*fieldsets.select_columns(CLIENT_LIST_FIELDS, wanted, ClientMain, key=ClientMain.account_id)).all()
+        clientMainData = {row.account_id: row._mapping for row in clientMainRows}
+
+    clientSubscriptionData = {}
+    if fieldsets.uses_model(CLIENT_LIST_FIELDS, wanted, ClientSubscription):
+        clientSubscriptionRows = appDb.query(*fieldsets.select_columns(CLIENT_LIST_FIELDS, wanted, ClientSubscription, key=ClientSubscription.account_id)).all()
+        clientSubscriptionData = {row.account_id: row._mapping for row in clientSubscriptionRows}
+
+    clients_list = []
+
+    for client in clients:
+        # Defaults for accounts without ClientMain / ClientSubscription rows
+        values = {"email": "", "account_status": None, "subscribed": 0, "package": 0}
+        values.update(clientMainData.get(client.account_id, {}))
+        values.update(clientSubscriptionData.get(client.account_id, {}))
+        values.update(client._mapping)
+
+        if "onboarding" in values:
+            values["onboarding"] = str(values["onboarding"].strftime("%Y-%m-%dT%H:%M:%S.%f")) if values["onboarding"] else None
+
+        if selected:
+            clients_list.append(fieldsets.pick(values, selected))
+        else:
+            clients_list.append(ClientListBase(**values).to_dict())
+
+    return clients_list
+
+
+def _build_summary_list(adminDb: Session, wanted: List[str], selected: Optional[List[str]], query=None) -> List[Dict]:
+    # One narrow table instead of three pos tables
+    if query is None:
+        query = adminDb.query(*fieldsets.select_columns(CLIENT_SUMMARY_FIELDS, wanted, ClientSummary))
+
+    clients_list = []
+
+    for client in query.all():
+        values = dict(client._mapping)
+
+        if "onboarding" in values:
+            values["onboarding"] = str(values["onboarding"].strftime("%Y-%m-%dT%H:%M:%S.%f")) if values["onboarding"] else None
+
+        if selected:
+            clients_list.append(fieldsets.pick(values, selected))
+        else:
+            clients_list.append(ClientListBase(**values).to_dict())
+
+    return clients_list
+
+
+def _fetch_client_details(appDb: Session, account_ids: List[int]) -> Dict[int, Dict]:
+    """Load client details for the given accounts in a single joined query (logo and password excluded)."""
+    rows = appDb.query(
+        Client.account_id,
+        Client.business_name,
+        Client.manager,
+        Client.phone,
+        Client.street1,
+        Client.street2,
+        Client.address,
+        Client.state,
+        Client.country_code,
+        Client.postcode,
+        Client.industry_type,
+        Client.onboarded_by,
+        Client.onboarded_date,
+        ClientMain.business_email,
+        ClientMain.account_status,
+        ClientSubscription.subscribed,
+        ClientSubscription.active_modules,
+        ClientSubscription.device_limit,
+        ClientSubscription.additional_devices,
+        ClientSubscription.additional_modules,
+        ClientSubscription.package_id,
+        ClientSubscription.account_id.isnot(None).label("has_subscription")
+    ).outerjoin(
+        ClientMain, ClientMain.account_id == Client.account_id
+    ).outerjoin(
+        ClientSubscription, ClientSubscription.account_id == Client.account_id
+    ).filter(
+        Client.account_id.in_(account_ids)
+    ).all()
+
+    return {row.account_id: _build_client_detail(row) for row in rows}
+
+
+def _build_client_detail(row) -> Dict:
+    client_data = ClientBase(
+        account_id=row.account_id,
+        business_name=row.business_name,
+        manager=row.manager,
+        email=row.business_email or "",
+        phone=row.phone,
+        street1=row.street1,
+        street2=row.street2,
+        address=row.address,
+        state=row.state,
+        country_code=row.country_code,
+        postcode=row.postcode,
+        industry_type=row.industry_type,
+        subscribed=row.subscribed if row.has_subscription else 0,
+        active_modules=row.active_modules or [],
+        onboarded_by=row.onboarded_by,
+        onboarded_date=str(row.onboarded_date.strftime("%Y-%m-%dT%H:%M:%S.%f")) if row.onboarded_date else None,
+        client_status=row.account_status,
+        device_limit=row.device_limit if row.has_subscription else 0,
+        additional_devices=row.additional_devices if row.has_subscription else 0,
+        additional_modules=row.additional_modules if row.has_subscription else [],
+        package=row.package_id if row.has_subscription else 0
+    )
+    return client_data.to_dict()
+
+
+def refresh_client_detail(appDb: Session, account_id: int) -> None:
+    """Write-through after a change: reload the account from the primary into the cache (all workers)."""
+    try:
+        details = _fetch_client_details(appDb, [account_id])
+    except SQLAlchemyError as e:
+        # The change is committed; drop the entry so it reloads on the next read
+        logger.warning(f"Could not refresh client detail cache for {account_id}: {str(e)}")
+        client_detail_cache.delete(account_id)
+        return
+
+    if account_id in details:
+        client_detail_cache.set(account_id, details[account_id])
+    else:
+        client_detail_cache.delete(account_id)
+
 #------------------------------------- Get Client Search List API ------------------------------------------------
 
 @router.get('/get_all_clients')
 async def get_all_clients(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
-    appDb: Session = Depends(get_app_db),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    format: Optional[str] = Query(None, pattern="^(json|columnar)$", description="`columnar` returns column names once plus row arrays"),
+    appDb: Session = Depends(get_app_read_db),
     adminDb: Session = Depends(get_admin_db)
     ):
 
     # Validate the user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
 
-    # Fetch all clients
-    clients = appDb.query(Client).all()
+    try:
+        selected = fieldsets.parse_fields(fields, CLIENT_SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(CLIENT_LIST_FIELDS)
+    use_columnar = columnar.wants_columnar(request, response, format)
+
+    # Read ClientSummaries once it has been built; until then fall back to the pos tables
+    summary_version = etags.get_version(adminDb, etags.CLIENT_SUMMARIES)
+    use_summary = summary_version > 0
+
+    if not use_summary and not set(wanted) <= set(CLIENT_LIST_FIELDS):
+        raise HTTPException(status_code=503, detail="Client summary counters are not available yet")
+
+    # Answer polling dashboards with 304 when nothing changed
+    if use_summary:
+        # The summary only changes through versioned writes and the reconcile job
+        etag = etags.make_etag(etags.CLIENTS, summary_version, ",".join(wanted), use_columnar)
+    else:
+        etag = etags.make_etag(
+            etags.CLIENTS,
+            etags.get_version(adminDb, etags.CLIENTS),
+            etags.watermark(appDb, Client.account_id),
+            etags.staleness_bucket(),
+            ",".join(wanted),
+            use_columnar
+        )
+    not_modified = etags.check_not_modified(request, response, "get_all_clients", etag)
+    if not_modified:
+        return not_modified
+
+    # Coalesced requests share one computation, and the request that started it may disconnect
+    # (closing its sessions) while it runs, so it opens its own session on the same database
+    app_engine = appDb.bind
+
+    def build_list() -> List[Dict]:
+        session = new_admin_session() if use_summary else new_app_read_session(app_engine)
+        try:
+            if use_summary:
+                return _build_summary_list(session, wanted, selected)
+            return _build_client_list(session, wanted, selected)
+        finally:
+            session.close()
+
+    # Identical list bodies are shared between requests (and workers) through the snapshot cache,
+    # and concurrent identical requests in this worker wait for one computation. Every authorized
+    # admin sees the same list, so the ETag (data version + parameters) is the whole key.
+    clients_list = await singleflight.do(
+        "get_all_clients",
+        etag,
+        etags.list_snapshots.get_or_load,
+        etag,
+        build_list
+    )
 
-    # Fetch only account_id, email, and account_status from ClientMain
-    clientMainRows = appDb.query(
-        ClientMain.account_id,
-        ClientMain.business_email,
-        ClientMain.account_status
-    ).all()
+    # Return the list of clients
+    if use_columnar:
+        return columnar.columnar_response({"clients": columnar.to_columnar(clients_list, wanted)}, response)
 
-    # Build a dictionary for quick lookup: {account_id: (email, account_status)}
-    clientMainData = {row.account_id: (row.business_email, row.account_status) for row in clientMainRows}
+    return {"clients": clients_list}
 
-    # Fetch subscriptions
-    clientSubscriptionData = appDb.query(ClientSubscription).all()
+#------------------------------------- Search Clients API ------------------------------------------------
 
-    def get_subscription_data(account_id: int):
-        for subscription in clientSubscriptionData:
-            if subscription.account_id == account_id:
-                return subscription
-        return None
+@router.get('/search_clients')
+async def search_clients(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    adminDb: Session = Depends(get_admin_db)
+    ):
 
-    clients_list = []
+    # Validate the user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
 
-    for client in clients:
-        email, account_status = clientMainData.get(client.account_id, ("", None))
-        subscription = get_subscription_data(client.account_id)
-
-        client_data = ClientListBase(
-            account_id=client.account_id,
-            business_name=client.business_name,
-            phone=client.phone,
-            email=email,
-            subscribed=subscription.subscribed if subscription else 0,
-            package=subscription.package_id if subscription else 0,
-            account_status=account_status,
-            onboarding=str(client.onboarded_date.strftime("%Y-%m-%dT%H:%M:%S.%f"))
-            if client.onboarded_date else None,
-        )
-        clients_list.append(client_data)
+    if not client_summary.is_ready(adminDb):
+        raise HTTPException(status_code=503, detail="Client search is not available until the client summary is built")
 
-    # Return the list of clients
-    return {"clients": [client.to_dict() for client in clients_list]}
+    try:
+        selected = fieldsets.parse_fields(fields, CLIENT_SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(CLIENT_LIST_FIELDS)
+    limit = min(limit, settings.CLIENT_SEARCH_MAX_LIMIT)
+
+    # Match name or email by substring, and phone or account id exactly when the term is numeric
+    term = q.strip()
+    conditions = [
+        ClientSummary.business_name.contains(term, autoescape=True),
+        ClientSummary.email.contains(term, autoescape=True)
+    ]
+    if term.isdigit():
+        conditions.append(ClientSummary.phone == int(term))
+        conditions.append(ClientSummary.account_id == int(term))
+
+    query = adminDb.query(*fieldsets.select_columns(CLIENT_SUMMARY_FIELDS, wanted, ClientSummary)).filter(or_(*conditions))
+    total = query.count()
+    page = query.order_by(ClientSummary.business_name, ClientSummary.account_id).offset(offset).limit(limit)
+
+    return {
+        "clients": _build_summary_list(adminDb, wanted, selected, page),
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
 
 #------------------------------------- Get specific client API ------------------------------------------------
 
@@ -80,52 +334,132 @@ async def get_specific_client(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
     account_id: int,
-    appDb: Session = Depends(get_app_db),
+    appDb: Session = Depends(get_app_read_db),
     adminDb: Session = Depends(get_admin_db)
     ):
 
     # Validate the user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
 
-    # Fetch the specific client from the database
-    client = appDb.query(Client).filter(Client.account_id == account_id).first()
+    # Serve from the per-account cache when possible
+    client_data = await client_detail_cache.get_or_load_async(
+        account_id,
+        lambda: _fetch_client_details(appDb, [account_id]).get(account_id)
+    )
+
+    if not client_data:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    # Return the client data
+    return {"client": client_data}
+
+#------------------------------------- Get Clients Batch API ------------------------------------------------
+
+@router.post('/get_clients_batch')
+async def get_clients_batch(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    request: ClientBatchRequest,
+    appDb: Session = Depends(get_app_read_db),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # De-duplicate while keeping the requested order
+    account_ids = list(dict.fromkeys(request.account_ids))
+
+    if len(account_ids) > settings.CLIENT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.CLIENT_BATCH_MAX_IDS} account ids per request")
+
+    # Serve cached accounts first
+    found = client_detail_cache.get_many(account_ids)
+    generations = {account_id: client_detail_cache.generation(account_id) for account_id in account_ids if account_id not in found}
+
+    # Load the rest with one joined IN (...) query per chunk
+    misses = list(generations)
+    chunk_size = settings.CLIENT_BATCH_CHUNK_SIZE
+    for start in range(0, len(misses), chunk_size):
+        details = _fetch_client_details(appDb, misses[start:start + chunk_size])
+        for account_id, client_data in details.items():
+            client_detail_cache.store_loaded(account_id, client_data, generations[account_id])
+        found.update(details)
+
+    # Return found clients in request order and report unknown ids
+    return {
+        "clients": [found[account_id] for account_id in account_ids if account_id in found],
+        "missing": [account_id for account_id in account_ids if account_id not in found]
+    }
+
+#------------------------------------- Get Client Logo API ------------------------------------------------
+
+@router.get('/get_client_logo')
+async def get_client_logo(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    account_id: int,
+    request: Request,
+    size: Optional[int] = Query(None, ge=16, le=1024),
+    appDb: Session = Depends(get_app_read_db),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    if size and not logos.thumbnails_supported():
+        raise HTTPException(status_code=501, detail="Thumbnail support is not installed")
+
+    cache_headers = {
+        "Cache-Control": f"private, max-age={settings.LOGO_CACHE_MAX_AGE_SECONDS}",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    }
+
+    # When the content hash is known, revalidations and cached thumbnails skip BusinessDetails
+    known = logos.known_hashes.get(account_id)
+    if known:
+        digest, media_type = known
+        headers = {**cache_headers, "ETag": logos.logo_etag(digest, size)}
+
+        if etags.etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        if size and os.path.exists(logos.thumbnail_path(digest, size)):
+            return FileResponse(logos.thumbnail_path(digest, size), media_type="image/png", headers=headers)
+
+    # Fetch only the logo column
+    client = appDb.query(Client.business_logo).filter(Client.account_id == account_id).first()
 
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    
-    client_main = appDb.query(ClientMain).filter(ClientMain.account_id == account_id).first()
 
-    client_settings = appDb.query(ClientSettings).filter(ClientSettings.account_id == account_id).first()
+    if not client.business_logo:
+        raise HTTPException(status_code=404, detail="Client has no logo")
 
-    client_subscription = appDb.query(ClientSubscription).filter(ClientSubscription.account_id == account_id).first()
+    try:
+        data, media_type = logos.decode_logo(client.business_logo)
+    except ValueError:
+        raise HTTPException(status_code=500, detail="Stored logo could not be decoded")
 
-    client_data = ClientBase(
-        account_id=client.account_id,
-        business_name=client.business_name,
-        manager=client.manager,
-        email=client_main.business_email,
-        phone=client.phone,
-        street1=client.street1,
-        street2=client.street2,
-        address=client.address,
-        state=client.state,
-        country_code=client.country_code,
-        postcode=client.postcode,
-        industry_type=client.industry_type,
-        subscribed=client_subscription.subscribed,
-        active_modules=client_subscription.active_modules or [],
-        onboarded_by=client.onboarded_by,
-        onboarded_date= str(client.onboarded_date.strftime("%Y-%m-%dT%H:%M:%S.%f")) if client.onboarded_date else None,
-        client_status= client_main.account_status,
-        device_limit=client_subscription.device_limit if client_subscription else 0,
-        additional_devices=client_subscription.additional_devices if client_subscription else 0,
-        additional_modules=client_subscription.additional_modules if client_subscription else [],
-        package=client_subscription.package_id if client_subscription else 0
-    )
+    digest = logos.content_hash(data)
+    logos.known_hashes.set(account_id, digest, media_type)
+    headers = {**cache_headers, "ETag": logos.logo_etag(digest, size)}
 
-    # Return the client data
-    return {"client": client_data.to_dict()}
+    if etags.etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    # Downscaled thumbnails are rendered once per content hash and size, then served from disk
+    if size:
+        thumbnail = await run_in_threadpool(logos.get_or_create_thumbnail, data, digest, size)
+        if thumbnail:
+            return FileResponse(thumbnail, media_type="image/png", headers=headers)
+
+    return Response(content=data, media_type=media_type, headers=headers)
 
 #------------------------------------- Update Client Subscription API ------------------------------------------------
 
@@ -139,11 +473,11 @@ async def update_client_subscription(
     ):
     try:
         # Validate the user
-        if not verify_user(user_id, token, adminDb):
+        if not await verify_user(user_id, token, adminDb):
             raise HTTPException(status_code=401, detail="Unauthorized user")
 
-        # Fetch the client from the database
-        client = appDb.query(Client).filter(Client.account_id == request.account_id).first()
+        # Check the client exists
+        client = appDb.query(Client.account_id).filter(Client.account_id == request.account_id).first()
 
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
@@ -183,6 +517,9 @@ async def update_client_subscription(
         client_subscription = appDb.query(ClientSubscription).filter(
             ClientSubscription.account_id == request.account_id
         ).first()
+
+        # Dashboard buckets the account moves out of; no subscription counts as unsubscribed without a package
+        previous = (client_subscription.subscribed, client_subscription.package_id) if client_subscription else (0, 0)
         
         if not client_subscription:
             # Create new ClientSubscription record
@@ -207,16 +544,6 @@ async def update_client_subscription(
             client_subscription.active_modules = final_active_modules
             client_subscription.device_limit = final_device_limit
 
-        # Clean up old updates (older than 45 days)
-        old_updates = adminDb.query(TrackUpdate).filter(
-            TrackUpdate.updated_at < datetime.now(timezone.utc) - timedelta(days=45)
-        ).all()
-        
-        if old_updates:
-            for update in old_updates:
-                adminDb.delete(update)
-            adminDb.commit()
-
         # Prepare update data for notification
         update_data = {
             "account_id": request.account_id,
@@ -231,9 +558,9 @@ async def update_client_subscription(
         # Send update notification to client devices
         await send_device1_update(request.account_id, 60, update_data)
 
-        # Create a track update entry
+        # Create a track update entry; previous values let the rollup job count subscription changes
         track_update = TrackUpdate(
-            update_data=update_data,
+            update_data={**update_data, "previous_subscribed": previous[0], "previous_package_id": previous[1]},
             updated_at=datetime.now(timezone.utc),
             updated_by=user_id,
             account_id=request.account_id
@@ -242,10 +569,21 @@ async def update_client_subscription(
         # Add the track update to the session
         adminDb.add(track_update)
 
+        # Invalidate cached client lists and refresh the account's summary row in the same transaction
+        etags.bump_version(adminDb, etags.CLIENTS)
+        client_summary.refresh_accounts(appDb, adminDb, [request.account_id])
+        dashboard_stats.subscription_changed(adminDb, previous, (client_subscription.subscribed, package_id))
+
         # Commit all changes to the database
         appDb.commit()
         adminDb.commit()
 
+        # Keep this user's reads on the primary until the replica has caught up
+        replica_router.mark_write(user_id)
+
+        # Replace the cached detail with the committed state
+        refresh_client_detail(appDb, request.account_id)
+
         # Return success response with calculated values
         return {
             "message": "Client subscription updated successfully",
@@ -0,0 +1,254 @@
+import os
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database.session import get_admin_db
+from core.security import get_user_id, get_bearer_token, verify_user
+from core import diagnostics
+from core.cache import cache_stats as get_cache_stats
+from core.database import get_pos_replica_engine
+from database.routing import replica_router
+from utils import etags, events, singleflight
+
+
+router = APIRouter(prefix="/admin-api/diagnostics", tags=["Diagnostics"])
+
+GROUP_BY_OPTIONS = "^(lineno|filename|traceback)$"
+
+#----------------------------------------------------- Tracing Status API ------------------------------------------------
+
+@router.get('/memory_status')
+async def memory_status(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    return {"status": diagnostics.status()}
+
+#----------------------------------------------------- Start Tracing API ------------------------------------------------
+
+@router.post('/start_tracing')
+async def start_tracing(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    frames: Optional[int] = Query(None, ge=1, le=100),
+    sample_rate: Optional[float] = Query(None, ge=0.0, le=1.0),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    return {"message": "Memory tracing started", "status": diagnostics.start_tracing(frames, sample_rate)}
+
+#----------------------------------------------------- Stop Tracing API ------------------------------------------------
+
+@router.post('/stop_tracing')
+async def stop_tracing(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    return {"message": "Memory tracing stopped", "status": diagnostics.stop_tracing()}
+
+#----------------------------------------------------- Take Snapshot API ------------------------------------------------
+
+@router.post('/take_snapshot')
+async def take_snapshot(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    name: Optional[str] = None,
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    if not diagnostics.is_tracing():
+        raise HTTPException(status_code=409, detail="Memory tracing is not active")
+
+    # Snapshotting a large heap takes seconds; keep it off the event loop
+    snapshot_name = await run_in_threadpool(diagnostics.take_snapshot, name)
+
+    return {"message": "Snapshot taken", "snapshot": snapshot_name, "status": diagnostics.status()}
+
+#----------------------------------------------------- Top Allocations API ------------------------------------------------
+
+@router.get('/top_allocations')
+async def top_allocations(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    snapshot: Optional[str] = None,
+    group_by: str = Query("lineno", pattern=GROUP_BY_OPTIONS),
+    limit: int = Query(20, ge=1, le=500),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    if not diagnostics.is_tracing():
+        raise HTTPException(status_code=409, detail="Memory tracing is not active")
+
+    # Use a stored snapshot when named, otherwise inspect the current heap (not stored, so named snapshots stay)
+    if snapshot:
+        stored = diagnostics.get_snapshot(snapshot)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Snapshot not found")
+    else:
+        stored = await run_in_threadpool(diagnostics.current_snapshot)
+
+    # Grouping every trace is as slow as taking the snapshot
+    allocations = await run_in_threadpool(diagnostics.top_allocations, stored, group_by, limit)
+
+    return {
+        "snapshot": snapshot or "current",
+        "worker_pid": os.getpid(),
+        "allocations": allocations
+    }
+
+#----------------------------------------------------- Compare Snapshots API ------------------------------------------------
+
+@router.get('/compare_snapshots')
+async def compare_snapshots(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    first: str,
+    second: str,
+    group_by: str = Query("lineno", pattern=GROUP_BY_OPTIONS),
+    limit: int = Query(20, ge=1, le=500),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    old_snapshot = diagnostics.get_snapshot(first)
+    new_snapshot = diagnostics.get_snapshot(second)
+
+    # Snapshots live in the worker that took them; the pid shows which worker answered
+    if old_snapshot is None or new_snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found in worker {os.getpid()}")
+
+    # Comparing two large snapshots takes seconds; keep it off the event loop
+    differences = await run_in_threadpool(diagnostics.compare_snapshots, old_snapshot, new_snapshot, group_by, limit)
+
+    return {
+        "worker_pid": os.getpid(),
+        "first": first,
+        "second": second,
+        "differences": differences
+    }
+
+#----------------------------------------------------- Request Allocations API ------------------------------------------------
+
+@router.get('/request_allocations')
+async def request_allocations(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    limit: int = Query(50, ge=1, le=1000),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Peaks are process-wide; samples with `overlapped` true include other requests' allocations
+    return {"worker_pid": os.getpid(), "samples": diagnostics.request_samples(limit)}
+
+#----------------------------------------------------- Replica Routing Status API ------------------------------------------------
+
+@router.get('/replica_status')
+async def replica_status(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    return {
+        "replica_configured": get_pos_replica_engine() is not None,
+        "stats": dict(replica_router.stats)
+    }
+
+#----------------------------------------------------- Conditional GET Stats API ------------------------------------------------
+
+@router.get('/etag_stats')
+async def etag_stats(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    return {"endpoints": etags.etag_stats()}
+
+#----------------------------------------------------- Cache Stats API ------------------------------------------------
+
+@router.get('/cache_stats')
+async def cache_stats(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Counters are per worker process
+    return {"caches": get_cache_stats()}
+
+#----------------------------------------------------- Request Coalescing Stats API ------------------------------------------------
+
+@router.get('/coalescing_stats')
+async def coalescing_stats(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Counters are per worker process
+    return {"endpoints": singleflight.singleflight_stats()}
+
+#----------------------------------------------------- Ticket Event Stats API ------------------------------------------------
+
+@router.get('/event_stats')
+async def event_stats(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Connected streams, buffered events and dropped slow subscribers of this worker
+    return {"events": events.broker.info()}
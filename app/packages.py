@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from core.security import get_user_id, get_bearer_token, verify_user
 from database.session import get_admin_db
 from database.db_packages import Package
 from schema.s_packages import PackageBase
+from utils import etags
+from core.cache import Cache
+from core.config import settings
 from typing import Annotated
 from datetime import datetime
 
 
 router = APIRouter(prefix="/admin-api/packages", tags=["Package"])
 
+# Serialized package catalog keyed by the PACKAGES version, so writes never need to invalidate it
+package_cache = Cache("packages", settings.PACKAGE_CACHE_TTL_SECONDS, local_size=4)
+
 #----------------------------------------------------- Create Package API ------------------------------------------------
 
 @router.post('/create_package')
@@ -21,7 +27,7 @@ async def create_package(
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     try:
@@ -43,6 +49,7 @@ async def create_package(
         
         # Add and commit the new package to the database
         adminDb.add(new_package)
+        etags.bump_version(adminDb, etags.PACKAGES)
         adminDb.commit()
         adminDb.refresh(new_package)
 
@@ -67,7 +74,7 @@ async def delete_package(
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     try:
@@ -79,6 +86,7 @@ async def delete_package(
         
         # Delete the package
         package.status = 0  
+        etags.bump_version(adminDb, etags.PACKAGES)
         adminDb.commit()
         
         return {"message": "Package deleted successfully"}
@@ -94,30 +102,42 @@ async def delete_package(
 async def get_packages(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
+    request: Request,
+    response: Response,
     adminDb: Session = Depends(get_admin_db)
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
-    
-    # Fetch all active packages
-    packages = adminDb.query(Package).all()
-
-    output = []
-
-    for pkg in packages:
-        pkg_dict = PackageBase(
-            id=pkg.id,
-            name=pkg.name,
-            active_modules=pkg.active_modules or [],
-            device_limit=pkg.device_limit,
-            status=pkg.status,
-            notes=pkg.notes,
-            price=pkg.price,
-            created_at=pkg.created_at.isoformat(),
-            created_by=pkg.created_by
-        )
-        output.append(pkg_dict)
 
-    return {"packages": output}
\ No newline at end of file
+    # Answer polling dashboards with 304 when nothing changed
+    version = etags.get_version(adminDb, etags.PACKAGES)
+    etag = etags.make_etag(etags.PACKAGES, version)
+    not_modified = etags.check_not_modified(request, response, "get_packages", etag)
+    if not_modified:
+        return not_modified
+
+    def load_packages():
+        # Fetch all active packages
+        packages = adminDb.query(Package).all()
+
+        output = []
+
+        for pkg in packages:
+            pkg_dict = PackageBase(
+                id=pkg.id,
+                name=pkg.name,
+                active_modules=pkg.active_modules or [],
+                device_limit=pkg.device_limit,
+                status=pkg.status,
+                notes=pkg.notes,
+                price=pkg.price,
+                created_at=pkg.created_at.isoformat(),
+                created_by=pkg.created_by
+            )
+            output.append(pkg_dict.model_dump())
+
+        return output
+
+    return {"packages": await package_cache.get_or_load_async(version, load_packages)}
\ No newline at end of file
@@ -0,0 +1,80 @@
+from datetime import date
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from core.security import get_user_id, get_bearer_token, verify_user
+from database.session import get_admin_db, get_app_db
+from utils import client_rollups, dashboard_stats, etags
+
+
+router = APIRouter(prefix="/admin-api/stats", tags=["Stats"])
+
+#----------------------------------------------------- Dashboard Stats API ------------------------------------------------
+
+@router.get('/dashboard')
+async def dashboard(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    request: Request,
+    response: Response,
+    appDb: Session = Depends(get_app_db),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Counters are built on first use; afterwards writes adjust them and the reconcile job corrects drift
+    if not dashboard_stats.is_ready(adminDb):
+        try:
+            dashboard_stats.rebuild(appDb, adminDb)
+            adminDb.commit()
+        except Exception as e:
+            adminDb.rollback()
+            raise HTTPException(status_code=500, detail=f"Error building dashboard stats: {str(e)}")
+
+    # Answer polling dashboards with 304 when no counter changed
+    version = etags.get_version(adminDb, etags.DASHBOARD_STATS)
+    etag = etags.make_etag(etags.DASHBOARD_STATS, version)
+    not_modified = etags.check_not_modified(request, response, "dashboard_stats", etag)
+    if not_modified:
+        return not_modified
+
+    return await dashboard_stats.get_stats(adminDb, version)
+
+
+#----------------------------------------------------- Client Rollups API ------------------------------------------------
+
+@router.get('/client_rollups')
+async def client_rollups_series(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    metric: str = Query(..., description="onboarded, subscribed, unsubscribed or package_changed"),
+    period: str = Query("month", pattern="^(day|week|month)$"),
+    start: date = Query(..., description="First day of the range (inclusive)"),
+    end: date = Query(..., description="Last day of the range (inclusive)"),
+    group_by: Optional[str] = Query(None, description="Split each bucket by package_id or onboarded_by"),
+    package_id: Optional[int] = Query(None),
+    onboarded_by: Optional[str] = Query(None),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Read from the precomputed rollups: one index range over the requested buckets
+    try:
+        series = client_rollups.query_series(adminDb, metric, period, start, end, group_by, package_id, onboarded_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "metric": metric,
+        "period": period,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "series": series
+    }
@@ -1,17 +1,93 @@
 from datetime import datetime
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Dict, List, Optional
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from database.session import get_admin_db
+from database.session import get_admin_db, new_admin_session
+from core.config import settings
 from core.security import get_user_id, get_bearer_token, verify_user
-from database.db_tickets import Ticket
-from database.db_ticket_updates import TicketUpdate
+from database.db_ticket_claims import TicketClaim
+from database.db_tickets import OPEN_TICKET_STATUSES, ArchivedTicket, Ticket
+from database.db_ticket_updates import ArchivedTicketUpdate, TicketUpdate
 from schema.s_ticket_updates import TicketUpdateSchema
 from schema.s_tickets import TicketSchema
+from schema.s_ticket_import import TicketImportRequest
+from utils import client_summary, columnar, dashboard_stats, etags, events, fieldsets, singleflight, ticket_analytics, ticket_archive, ticket_import, ticket_search
+from utils import ticket_queue as work_queue  # `ticket_queue` is also an endpoint below
+from utils.blob_store import BlobTooLarge, get_blob_store
 
 
 router = APIRouter(prefix="/admin-api/tickets", tags=["Ticket CRUD Operations"])
 
+# Ticket list response fields and the columns they are read from
+TICKET_FIELDS = {
+    "ticket_id": Ticket.ticket_id,
+    "account_id": Ticket.account_id,
+    "user_id": Ticket.user_id,
+    "subject": Ticket.subject,
+    "description": Ticket.description,
+    "status": Ticket.status,
+    "priority": Ticket.priority,
+    "created_at": Ticket.created_at,
+    "contact_mode": Ticket.contact_mode,
+    "client_name": Ticket.clinet_name,
+    "client_phone": Ticket.client_phone,
+    "client_email": Ticket.clinet_email,
+    "attachment": Ticket.attachment,
+    "notes": Ticket.notes
+}
+
+
+# The same fields read from the archive table
+ARCHIVED_TICKET_FIELDS = {field: getattr(ArchivedTicket, column.key) for field, column in TICKET_FIELDS.items()}
+
+# Queue order: highest priority first, then oldest first
+QUEUE_ORDER = (Ticket.priority.desc(), Ticket.created_at, Ticket.ticket_id)
+
+
+def _build_ticket_list(db: Session, wanted: List[str], selected: Optional[List[str]]) -> List[Dict]:
+    # Fetch open and under-review tickets in queue order, selecting only the requested columns
+    tickets = db.query(
+        *fieldsets.select_columns(TICKET_FIELDS, wanted, Ticket)
+    ).filter(
+        Ticket.status.in_(OPEN_TICKET_STATUSES)
+    ).order_by(*QUEUE_ORDER).all()
+
+    return _serialize_tickets(tickets, selected)
+
+
+def _serialize_tickets(tickets, selected: Optional[List[str]]) -> List[Dict]:
+    # Return the list of tickets as dictionaries
+    tickets_list = []
+
+    for ticket in tickets:
+        values = dict(ticket._mapping)
+
+        if "created_at" in values:
+            values["created_at"] = values["created_at"].isoformat()
+
+        if selected:
+            tickets_list.append(fieldsets.pick(values, selected))
+        else:
+            tickets_list.append(TicketSchema(**values).to_dict())
+
+    return tickets_list
+
+
+def _publish_ticket_event(event_type: str, ticket: Ticket, version: int) -> None:
+    # Event id is the tickets version the write committed, so streams can resume from it
+    events.publish(
+        event_type,
+        version,
+        ticket_id=ticket.ticket_id,
+        account_id=ticket.account_id,
+        status=ticket.status,
+        priority=ticket.priority
+    )
+
+
 #----------------------------------------------------- Create Ticket API ------------------------------------------------
 
 @router.post('/create_ticket')
@@ -22,11 +98,13 @@ async def create_ticket(
     adminDb: Session = Depends(get_admin_db)
     ):
     # Validate the requested user
-    if not verify_user(user_id, token, adminDb):
+    if not await verify_user(user_id, token, adminDb):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
-    # Check if the ticket ID already exists
-    existing_ticket = adminDb.query(Ticket).filter(Ticket.ticket_id == ticket_data.ticket_id).first()
+    # Check if the ticket ID already exists, archived tickets included (they keep their ids)
+    existing_ticket = adminDb.query(Ticket.ticket_id).filter(Ticket.ticket_id == ticket_data.ticket_id).first()
+    if not existing_ticket and ticket_data.ticket_id:
+        existing_ticket = adminDb.query(ArchivedTicket.ticket_id).filter(ArchivedTicket.ticket_id == ticket_data.ticket_id).first()
     
     if existing_ticket:
         raise HTTPException(status_code=400, detail="Ticket ID already exists")
@@ -34,8 +112,8 @@ async def create_ticket(
     try:
         # Create a new ticket ID if not provided
         if ticket_data.ticket_id == 0:
-            last_ticket = adminDb.query(Ticket).order_by(Ticket.ticket_id.desc()).first()
-            new_ticket_id = str(int(last_ticket.ticket_id) + 1) if last_ticket else "1"
+            # Archived tickets keep their ids, so allocate above both tables
+            new_ticket_id = str(ticket_archive.max_ticket_id(adminDb) + 1)
             ticket_data.ticket_id = new_ticket_id
         
         # Create a new ticket instance
@@ -58,9 +136,17 @@ async def create_ticket(
 
         # Add the new ticket to the session and commit
         adminDb.add(ticket)
+        etags.bump_version(adminDb, etags.TICKETS)
+        client_summary.refresh_open_tickets(adminDb, [ticket.account_id])
+        dashboard_stats.tickets_changed(adminDb, [], [(ticket.status, ticket.priority)])
+        version = work_queue.pending_version(adminDb)
         adminDb.commit()
         adminDb.refresh(ticket)
 
+        # Make the ticket available to next_ticket in this worker
+        work_queue.queue.apply(ticket, version)
+        _publish_ticket_event("ticket_created", ticket, version)
+
         ticket_data.ticket_id = ticket.ticket_id  
         ticket_data.created_at = ticket.created_at.isoformat()  
 
@@ -71,6 +157,32 @@ async def create_ticket(
         adminDb.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating ticket: {str(e)}")
 
+#----------------------------------------------------- Import Tickets API ------------------------------------------------
+
+@router.post('/import_tickets')
+async def import_tickets(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    request: TicketImportRequest,
+    dry_run: bool = Query(False, description="Validate the records without inserting them"),
+    adminDb: Session = Depends(get_admin_db)
+    ):
+    # Validate the requested user
+    if not await verify_user(user_id, token, adminDb):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    if len(request.tickets) + len(request.updates) > settings.TICKET_IMPORT_MAX_RECORDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.TICKET_IMPORT_MAX_RECORDS} records can be imported at once")
+
+    try:
+        # Validation and chunked inserts of large batches run in the threadpool
+        result = await run_in_threadpool(ticket_import.import_records, adminDb, request.tickets, request.updates, dry_run)
+    except Exception as e:
+        adminDb.rollback()
+        raise HTTPException(status_code=500, detail=f"Error importing tickets: {str(e)}")
+
+    return result
+
 #----------------------------------------------------- Get Ticket API ------------------------------------------------
 
 
@@ -78,38 +190,293 @@ async def create_ticket(
 async def get_all_opened_ticket(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    format: Optional[str] = Query(None, pattern="^(json|columnar)$", description="`columnar` returns column names once plus row arrays"),
     db: Session = Depends(get_admin_db)
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    try:
+        selected = fieldsets.parse_fields(fields, TICKET_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(TICKET_FIELDS)
+    use_columnar = columnar.wants_columnar(request, response, format)
+
+    # Answer polling dashboards with 304 when nothing changed
+    etag = etags.make_etag(etags.TICKETS, etags.get_version(db, etags.TICKETS), ",".join(wanted), use_columnar)
+    not_modified = etags.check_not_modified(request, response, "get_all_opened_ticket", etag)
+    if not_modified:
+        return not_modified
     
-    # Fetch all opened tickets
-    tickets = db.query(Ticket).filter(Ticket.status != 0).all()
-    
-    if not tickets:
-        return {"tickets": []}
-    
-    # Return the list of tickets as dictionaries
-    tickets = [TicketSchema(
-        ticket_id=ticket.ticket_id,
-        account_id=ticket.account_id,
-        user_id=ticket.user_id,
-        subject=ticket.subject,
-        description=ticket.description,
-        status=ticket.status,
-        priority=ticket.priority,
-        created_at=ticket.created_at.isoformat(),
-        contact_mode=ticket.contact_mode,
-        client_name=ticket.clinet_name,
-        client_phone=ticket.client_phone,
-        client_email=ticket.clinet_email,
-        attachment=ticket.attachment,
-        notes=ticket.notes
-    ).to_dict() for ticket in tickets]
-    
-    return {"tickets": tickets}
+    # The shared computation opens its own session: the request that started it may disconnect
+    # (closing its session) while other requests still wait for the result
+    def build_list() -> List[Dict]:
+        session = new_admin_session()
+        try:
+            return _build_ticket_list(session, wanted, selected)
+        finally:
+            session.close()
+
+    # Identical list bodies are shared between requests (and workers) through the snapshot cache,
+    # and concurrent identical requests in this worker wait for one computation. Every authorized
+    # admin sees the same list, so the ETag (data version + parameters) is the whole key.
+    tickets_list = await singleflight.do(
+        "get_all_opened_ticket",
+        etag,
+        etags.list_snapshots.get_or_load,
+        etag,
+        build_list
+    )
+
+    if use_columnar:
+        return columnar.columnar_response({"tickets": columnar.to_columnar(tickets_list, wanted)}, response)
+
+    return {"tickets": tickets_list}
+
+
+#----------------------------------------------------- Ticket Queue API ------------------------------------------------
+
+@router.get('/ticket_queue')
+async def ticket_queue(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    request: Request,
+    response: Response,
+    status: Optional[int] = Query(None, ge=1, le=3, description="Ticket status (default: open and under review)"),
+    priority: Optional[int] = Query(None, ge=1, le=3),
+    assignee_id: Optional[int] = Query(None, description="Tickets of this admin user"),
+    account_id: Optional[int] = Query(None, description="Tickets of this client"),
+    limit: int = Query(50, ge=1),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    try:
+        selected = fieldsets.parse_fields(fields, TICKET_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(TICKET_FIELDS)
+    limit = min(limit, settings.TICKET_QUEUE_MAX_LIMIT)
+
+    etag = etags.make_etag(
+        etags.TICKETS, etags.get_version(db, etags.TICKETS), "queue",
+        status, priority, assignee_id, account_id, limit, offset, ",".join(wanted)
+    )
+    not_modified = etags.check_not_modified(request, response, "ticket_queue", etag)
+    if not_modified:
+        return not_modified
+
+    # Every filter leads with an indexed column: (status, priority, created_at),
+    # (user_id, status) or (account_id, status, created_at)
+    conditions = [Ticket.status == status if status is not None else Ticket.status.in_(OPEN_TICKET_STATUSES)]
+    if priority is not None:
+        conditions.append(Ticket.priority == priority)
+    if assignee_id is not None:
+        conditions.append(Ticket.user_id == assignee_id)
+    if account_id is not None:
+        conditions.append(Ticket.account_id == account_id)
+
+    # Counts per priority for the whole filter, so the console can show totals without a second page load
+    counts = dict(
+        db.query(Ticket.priority, func.count(Ticket.ticket_id)).filter(*conditions).group_by(Ticket.priority).all()
+    )
+
+    tickets = db.query(
+        *fieldsets.select_columns(TICKET_FIELDS, wanted, Ticket)
+    ).filter(*conditions).order_by(*QUEUE_ORDER).offset(offset).limit(limit).all()
+
+    return {
+        "tickets": _serialize_tickets(tickets, selected),
+        "total": sum(counts.values()),
+        "counts_by_priority": {str(level): counts.get(level, 0) for level in (3, 2, 1)},
+        "limit": limit,
+        "offset": offset
+    }
+
+
+#----------------------------------------------------- Ticket Events API ------------------------------------------------
+
+@router.get('/ticket_events')
+async def ticket_events(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    since: Optional[int] = Query(None, description="Resume after this event id (for clients that cannot send Last-Event-ID)"),
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # The stream stays open for a long time; don't hold a pooled connection for it
+    db.close()
+
+    return StreamingResponse(
+        events.broker.stream(last_event_id if last_event_id is not None else since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+#----------------------------------------------------- Search Tickets API ------------------------------------------------
+
+@router.get('/search_tickets')
+async def search_tickets(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    include_archived: bool = Query(False, description="Also search archived (long-closed) tickets"),
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    try:
+        selected = fieldsets.parse_fields(fields, TICKET_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(TICKET_FIELDS)
+    limit = min(limit, settings.TICKET_SEARCH_MAX_LIMIT)
+
+    # Rank matching tickets (subject, description and update text), then load only the page
+    ranked, total = await run_in_threadpool(ticket_search.search, db, q, limit, offset, include_archived)
+    page_ids = [ticket_id for ticket_id, _ in ranked]
+
+    rows = db.query(
+        *fieldsets.select_columns(TICKET_FIELDS, wanted, Ticket, key=Ticket.ticket_id)
+    ).filter(Ticket.ticket_id.in_(page_ids)).all()
+    tickets_by_id = {row.ticket_id: (row, False) for row in rows}
+
+    if include_archived and len(tickets_by_id) < len(page_ids):
+        archived_rows = db.query(
+            *fieldsets.select_columns(ARCHIVED_TICKET_FIELDS, wanted, ArchivedTicket, key=ArchivedTicket.ticket_id)
+        ).filter(ArchivedTicket.ticket_id.in_([ticket_id for ticket_id in page_ids if ticket_id not in tickets_by_id])).all()
+        tickets_by_id.update({row.ticket_id: (row, True) for row in archived_rows})
+
+    tickets_list = []
+    for ticket_id, score in ranked:
+        if ticket_id not in tickets_by_id:
+            continue
+        row, archived = tickets_by_id[ticket_id]
+        ticket = _serialize_tickets([row], selected or wanted)[0]
+        ticket["score"] = round(score, 4)
+        if include_archived:
+            ticket["archived"] = archived
+        tickets_list.append(ticket)
+
+    return {
+        "tickets": tickets_list,
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
+
+
+#----------------------------------------------------- SLA Analytics API ------------------------------------------------
+
+@router.get('/sla_analytics')
+async def sla_analytics(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    days: int = Query(90, ge=1, description="Report on tickets created in the last N days"),
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    if days > settings.TICKET_ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be at most {settings.TICKET_ANALYTICS_MAX_DAYS}")
+
+    # Percentiles are computed over column arrays off the event loop, then cached per window
+    return await ticket_analytics.get_sla_report(db, days)
+
+
+#----------------------------------------------------- Next Ticket API ------------------------------------------------
+
+@router.post('/next_ticket')
+async def next_ticket(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Claim the open ticket with the earliest SLA deadline; the claim is a primary-key insert,
+    # so two agents (in any worker) never receive the same ticket
+    try:
+        claimed = work_queue.claim_next(db, user_id)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error claiming ticket: {str(e)}")
+
+    if not claimed:
+        raise HTTPException(status_code=404, detail="No unclaimed open tickets")
+
+    ticket, claim = claimed
+    values = {field: getattr(ticket, column.key) for field, column in TICKET_FIELDS.items()}
+    values["created_at"] = ticket.created_at.isoformat()
+
+    return {
+        "ticket": TicketSchema(**values).to_dict(),
+        "sla_deadline": work_queue.sla_deadline(ticket.priority, ticket.created_at).isoformat(),
+        "claim_expires_at": claim.expires_at.isoformat()
+    }
+
+
+@router.post('/release_ticket')
+async def release_ticket(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    ticket_id: int,
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    claim = db.query(TicketClaim).filter(TicketClaim.ticket_id == ticket_id).first()
+
+    if not claim:
+        raise HTTPException(status_code=404, detail="Ticket is not claimed")
+
+    if claim.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Ticket is claimed by another user")
+
+    db.delete(claim)
+    db.commit()
+
+    # Hand the ticket out again from this worker; other workers pick it up on their next rebuild
+    ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id, Ticket.status.in_(OPEN_TICKET_STATUSES)).first()
+    if ticket:
+        work_queue.queue.push(ticket.ticket_id, ticket.priority, ticket.created_at)
+
+    return {"message": "Ticket released successfully"}
 
 
 #---------------------------------------------- Get Specific Client Tickets API ------------------------------------------
@@ -119,15 +486,19 @@ async def get_client_tickets(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
     client_id: int,
+    include_archived: bool = Query(False, description="Also return archived (long-closed) tickets"),
     db: Session = Depends(get_admin_db)
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     # Fetch tickets for the specified client
     tickets = db.query(Ticket).filter(Ticket.account_id == client_id).all()
+
+    if include_archived:
+        tickets += db.query(ArchivedTicket).filter(ArchivedTicket.account_id == client_id).all()
     
     if not tickets:
         raise HTTPException(status_code=404, detail="No tickets found for this client")
@@ -160,6 +531,73 @@ async def get_client_tickets(
     
     return {"tickets": tickets_list}
 
+#----------------------------------------------------- Get Ticket Detail API ------------------------------------------------
+
+@router.get('/get_ticket_detail')
+async def get_ticket_detail(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    ticket_id: int,
+    request: Request,
+    response: Response,
+    include_archived: bool = Query(False, description="Also look the ticket up in the archive"),
+    db: Session = Depends(get_admin_db)
+    ):
+
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Fetch the ticket by primary key, from the archive only when asked and not found live
+    ticket_model, update_model = Ticket, TicketUpdate
+    ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+
+    if not ticket and include_archived:
+        ticket_model, update_model = ArchivedTicket, ArchivedTicketUpdate
+        ticket = db.query(ArchivedTicket).filter(ArchivedTicket.ticket_id == ticket_id).first()
+
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    archived = ticket_model is ArchivedTicket
+
+    values = {field: getattr(ticket, column.key) for field, column in TICKET_FIELDS.items()}
+    values["created_at"] = ticket.created_at.isoformat()
+    ticket_data = TicketSchema(**values).to_dict()
+
+    # Updates are append-only, so their count and highest id identify the timeline;
+    # an unchanged ticket is answered with 304 without loading the update bodies
+    update_count, last_update_id = db.query(
+        func.count(update_model.update_id), func.max(update_model.update_id)
+    ).filter(update_model.ticket_id == ticket_id).one()
+
+    etag = etags.make_etag("ticket_detail", sorted(ticket_data.items()), update_count, last_update_id, archived)
+    not_modified = etags.check_not_modified(request, response, "get_ticket_detail", etag)
+    if not_modified:
+        return not_modified
+
+    # Fetch the timeline in order from the (ticket_id, created_at) index
+    updates = db.query(update_model).filter(
+        update_model.ticket_id == ticket_id
+    ).order_by(update_model.created_at, update_model.update_id).all() if update_count else []
+
+    updates_list = []
+
+    for update in updates:
+        update = TicketUpdateSchema(
+                ticket_id=update.ticket_id,
+                updated_by=update.user_id,
+                description=update.description,
+                attachment=update.attachment,
+                created_at=update.created_at.isoformat(),
+                contact_mode=update.contact_mode,
+                notes=update.notes
+            )
+        updates_list.append(update.to_dict())
+
+    # A ticket without updates has an empty timeline, not a 404
+    return {"ticket": ticket_data, "updates": updates_list, "archived": archived}
+
 #----------------------------------------------------- Get Ticket Updats API ------------------------------------------------
 
 
@@ -172,7 +610,7 @@ async def get_ticket_updates(
     ):
 
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     # Fetch updates for the specified ticket
@@ -209,7 +647,7 @@ async def create_update(
     db: Session = Depends(get_admin_db)
     ):
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     # Check if the ticket ID exists
@@ -233,10 +671,16 @@ async def create_update(
         # Add the new update to the session and commit
         db.add(update)
 
+        dashboard_stats.tickets_changed(db, [(existing_ticket.status, existing_ticket.priority)], [(2, existing_ticket.priority)])
         existing_ticket.status = 2 
+        etags.bump_version(db, etags.TICKETS)
+        client_summary.refresh_open_tickets(db, [existing_ticket.account_id])
+        version = work_queue.pending_version(db)
 
         db.commit()
         db.refresh(update)
+        work_queue.queue.apply(existing_ticket, version)
+        _publish_ticket_event("ticket_updated", existing_ticket, version)
 
         update_data.created_at = update.created_at.isoformat()
 
@@ -259,7 +703,7 @@ async def update_ticket_status(
     db: Session = Depends(get_admin_db)
     ):
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
     
     # Fetch the ticket to update
@@ -270,15 +714,122 @@ async def update_ticket_status(
     
     try:
         # Update the ticket status and priority
+        status_changed = ticket.status != status
+        dashboard_stats.tickets_changed(db, [(ticket.status, ticket.priority)], [(status, priority)])
         ticket.status = status
         ticket.priority = priority
+        etags.bump_version(db, etags.TICKETS)
+        client_summary.refresh_open_tickets(db, [ticket.account_id])
+
+        # A closed ticket no longer needs to be held by anyone
+        if status not in OPEN_TICKET_STATUSES:
+            db.query(TicketClaim).filter(TicketClaim.ticket_id == ticket_id).delete(synchronize_session=False)
+
+        version = work_queue.pending_version(db)
         
         # Commit the changes to the database
         db.commit()
         db.refresh(ticket)
 
+        # Move or drop the ticket in this worker's next_ticket queue
+        work_queue.queue.apply(ticket, version)
+        _publish_ticket_event("ticket_status_changed" if status_changed else "ticket_updated", ticket, version)
+
         return {"message": "Ticket updated successfully"}
     
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating ticket: {str(e)}")
+
+
+#-------------------------------------------- Upload Attachment API -----------------------------------------
+
+@router.post('/upload_attachment')
+async def upload_attachment(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    file: UploadFile = File(...),
+    ticket_id: Optional[int] = None,
+    db: Session = Depends(get_admin_db)
+    ):
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    # Optionally attach straight to an existing ticket
+    ticket = None
+    if ticket_id is not None:
+        ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+
+    # Copy the spooled upload into the blob store chunk by chunk, off the event loop
+    store = get_blob_store()
+    chunks = iter(lambda: file.file.read(settings.BLOB_CHUNK_BYTES), b"")
+
+    try:
+        blob = await run_in_threadpool(
+            store.write,
+            chunks,
+            file.content_type or "application/octet-stream",
+            file.filename,
+            settings.ATTACHMENT_MAX_BYTES
+        )
+    except BlobTooLarge:
+        raise HTTPException(status_code=413, detail=f"Attachment exceeds {settings.ATTACHMENT_MAX_BYTES} bytes")
+    finally:
+        await file.close()
+
+    if ticket:
+        try:
+            ticket.attachment = blob.key
+            etags.bump_version(db, etags.TICKETS)
+            version = work_queue.pending_version(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            store.delete(blob.key)
+            raise HTTPException(status_code=500, detail=f"Error attaching file: {str(e)}")
+
+        _publish_ticket_event("ticket_updated", ticket, version)
+
+    # The key goes in the `attachment` field of create_ticket / create_update
+    return {"message": "Attachment uploaded successfully", "attachment": blob.to_dict()}
+
+
+#-------------------------------------------- Download Attachment API -----------------------------------------
+
+@router.get('/download_attachment')
+async def download_attachment(
+    user_id: Annotated[int, Depends(get_user_id)],
+    token: Annotated[str, Depends(get_bearer_token)],
+    key: str,
+    db: Session = Depends(get_admin_db)
+    ):
+    # Validate the requested user
+    if not await verify_user(user_id, token, db):
+        raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    store = get_blob_store()
+    blob = store.info(key)
+
+    if not blob:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    headers = {"X-Content-Type-Options": "nosniff"}
+
+    # Local files support Range requests and zero-copy sending (ASGI pathsend) when the server offers it
+    path = store.local_path(key)
+    if path:
+        return FileResponse(
+            path,
+            media_type=blob.content_type,
+            filename=blob.filename or key,
+            content_disposition_type="attachment",
+            headers=headers
+        )
+
+    headers["Content-Length"] = str(blob.size)
+    headers["Content-Disposition"] = f'attachment; filename="{key}"'
+    return StreamingResponse(store.iter_chunks(key), media_type=blob.content_type, headers=headers)
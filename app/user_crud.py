@@ -1,16 +1,27 @@
 from datetime import datetime
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from database.session import  get_admin_db
 from database.db_users import User
 from schema.s_users import UserBase
-from core.security import get_user_id, get_bearer_token, verify_user
+from core.security import get_user_id, get_bearer_token, invalidate_user, verify_user
+from utils import etags, fieldsets
 import bcrypt
 import secrets
 
 router = APIRouter(prefix="/admin-api/user", tags=["User CRUD Account"])
 
+# get_users response fields and the columns they are read from
+USER_FIELDS = {
+    "user_id": User.user_id,
+    "user_name": User.user_name,
+    "email": User.email,
+    "status": User.is_active,
+    "permissions": User.permissions,
+    "token": User.token
+}
+
 #----------------------------------------------------- Create User API ------------------------------------------------
 
 @router.post('/create_user')
@@ -23,7 +34,7 @@ async def create_user(
 
     try: 
         # Validate the requested user
-        if not verify_user(user_id, token, db):
+        if not await verify_user(user_id, token, db):
             raise HTTPException(status_code=401, detail="Unauthorized user")
         
         # Check if the email already exists
@@ -57,6 +68,7 @@ async def create_user(
 
         # Add the new user to the session and commit
         db.add(user)
+        etags.bump_version(db, etags.USERS)
         db.commit()
         db.refresh(user)
 
@@ -86,7 +98,7 @@ async def update_user(
 
     try: 
         # Validate the requested user
-        if not verify_user(user_id, token, db):
+        if not await verify_user(user_id, token, db):
             raise HTTPException(status_code=401, detail="Unauthorized user")
         
         # Find the user to update
@@ -105,10 +117,12 @@ async def update_user(
         user.user_name = updatedUser.user_name
         user.email = updatedUser.email
         user.permissions = updatedUser.permissions or []
+        etags.bump_version(db, etags.USERS)
 
         # Commit the changes to the database
         db.commit()
         db.refresh(user)
+        invalidate_user(user.user_id)
 
 
         return {"message": "User updated successfully"}
@@ -128,7 +142,7 @@ async def delete_user(
 
     try: 
         # Validate the requested user
-        if not verify_user(user_id, token, db):
+        if not await verify_user(user_id, token, db):
             raise HTTPException(status_code=401, detail="Unauthorized user")
         
         # Find the user to delete
@@ -139,7 +153,9 @@ async def delete_user(
 
         # Delete the user
         user.is_active = 0  
+        etags.bump_version(db, etags.USERS)
         db.commit()
+        invalidate_user(user_to_delete)
 
         return {"message": "User deleted successfully"}
     
@@ -152,27 +168,47 @@ async def delete_user(
 async def get_users(
     user_id: Annotated[int, Depends(get_user_id)],
     token: Annotated[str, Depends(get_bearer_token)],
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
     db: Session = Depends(get_admin_db)
     ):
     
     # Validate the requested user
-    if not verify_user(user_id, token, db):
+    if not await verify_user(user_id, token, db):
         raise HTTPException(status_code=401, detail="Unauthorized user")
+
+    try:
+        selected = fieldsets.parse_fields(fields, USER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    wanted = selected or list(USER_FIELDS)
+
+    # Answer polling dashboards with 304 when nothing changed
+    etag = etags.make_etag(etags.USERS, etags.get_version(db, etags.USERS), ",".join(wanted))
+    not_modified = etags.check_not_modified(request, response, "get_users", etag)
+    if not_modified:
+        return not_modified
     
-    # Retrieve all active users
-    users = db.query(User).all()
+    # Retrieve all active users, selecting only the requested columns
+    users = db.query(*fieldsets.select_columns(USER_FIELDS, wanted, User)).all()
 
     if not users:
         raise HTTPException(status_code=404, detail="No active users found")
     
     # Convert users to UserBase schema
-    user_list = [UserBase(
-        user_id=user.user_id,
-        user_name=user.user_name,
-        email=user.email,
-        status=user.is_active,
-        permissions=user.permissions or [],
-        token=user.token
-    ).to_dict() for user in users]
+    user_list = []
+
+    for user in users:
+        values = dict(user._mapping)
+
+        if "permissions" in values:
+            values["permissions"] = values["permissions"] or []
+
+        if selected:
+            user_list.append(fieldsets.pick(values, selected))
+        else:
+            user_list.append(UserBase(**values).to_dict())
 
     return {"users": user_list}
\ No newline at end of file
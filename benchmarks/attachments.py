@@ -0,0 +1,98 @@
+"""
+Attachment Throughput Benchmark
+Uploads a large attachment through /admin-api/tickets/upload_attachment and
+downloads it back in full and in ranged chunks, reporting MB/s and the
+server's peak RSS so it can be checked that memory stays flat as file size grows.
+
+Usage:
+    python benchmarks/attachments.py --size-mb 200 --range-mb 4
+"""
+import argparse
+import os
+import sys
+import time
+import httpx
+from common import (
+    AUTH_HEADERS, WORKDIR, create_schema, free_port, seed_admin_user,
+    server_env, start_server, stop_server
+)
+
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident set size of a process (Linux only; 0 elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def make_file(path: str, size_mb: int) -> None:
+    chunk = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--range-mb", type=int, default=4)
+    args = parser.parse_args()
+
+    create_schema()
+    seed_admin_user()
+
+    source = os.path.join(WORKDIR, "attachment.bin")
+    make_file(source, args.size_mb)
+
+    port = free_port()
+    env = server_env(
+        BLOB_STORE_PATH=os.path.join(WORKDIR, "blobs"),
+        ATTACHMENT_MAX_BYTES=(args.size_mb + 1) * 1024 * 1024,
+        BACKGROUND_JOBS_ENABLED="false"
+    )
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    process = start_server(command, port, env)
+    base = f"http://127.0.0.1:{port}/admin-api/tickets"
+
+    try:
+        with httpx.Client(headers=AUTH_HEADERS, timeout=None) as client:
+            started = time.perf_counter()
+            with open(source, "rb") as f:
+                response = client.post(f"{base}/upload_attachment", files={"file": ("attachment.bin", f, "application/octet-stream")})
+            response.raise_for_status()
+            upload_seconds = time.perf_counter() - started
+            key = response.json()["attachment"]["key"]
+
+            started = time.perf_counter()
+            received = 0
+            with client.stream("GET", f"{base}/download_attachment", params={"key": key}) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes():
+                    received += len(chunk)
+            download_seconds = time.perf_counter() - started
+            assert received == args.size_mb * 1024 * 1024
+
+            range_bytes = args.range_mb * 1024 * 1024
+            started = time.perf_counter()
+            for offset in range(0, received, range_bytes):
+                headers = {"Range": f"bytes={offset}-{min(offset + range_bytes, received) - 1}"}
+                response = client.get(f"{base}/download_attachment", params={"key": key}, headers=headers)
+                assert response.status_code == 206
+            ranged_seconds = time.perf_counter() - started
+
+        print(f"{'operation':<18} {'seconds':>9} {'MB/s':>9}")
+        print(f"{'upload':<18} {upload_seconds:>9.2f} {args.size_mb / upload_seconds:>9.1f}")
+        print(f"{'download':<18} {download_seconds:>9.2f} {args.size_mb / download_seconds:>9.1f}")
+        print(f"{f'ranged ({args.range_mb} MB)':<18} {ranged_seconds:>9.2f} {args.size_mb / ranged_seconds:>9.1f}")
+        print(f"server peak RSS: {peak_rss_mb(process.pid):.0f} MB")
+    finally:
+        stop_server(process)
+
+
+if __name__ == "__main__":
+    main()
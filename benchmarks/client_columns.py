@@ -0,0 +1,102 @@
+"""
+Client Column Projection Benchmark
+Compares loading full Client rows (logo included, the previous behaviour)
+with the projected/deferred queries used by the client endpoints:
+bytes pulled from the database, peak Python memory and time per request.
+
+Usage:
+    python benchmarks/client_columns.py --clients 2000 --logo-kb 40
+"""
+import argparse
+import base64
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from common import create_schema
+from sqlalchemy.orm import undefer
+
+
+def seed_clients(count: int, logo_kb: int) -> None:
+    from database.session import new_app_session
+    from database.db_customer import Client, ClientMain, ClientSubscription
+
+    logo = base64.b64encode(os.urandom(logo_kb * 1024 * 3 // 4)).decode("ascii")
+    db = new_app_session()
+    try:
+        db.add_all([
+            Client(
+                account_id=i, business_name=f"Business {i}", business_logo=logo, manager="Manager",
+                phone=9000000000 + i, street1="Street", address="Address", state="State", country_code=91,
+                postcode="560001", industry_type=1, onboarded_by="bench", onboarded_date=datetime.now()
+            )
+            for i in range(1, count + 1)
+        ])
+        db.add_all([ClientMain(account_id=i, business_email=f"client{i}@example.com", password="x" * 60) for i in range(1, count + 1)])
+        db.add_all([ClientSubscription(account_id=i, package_id=1, active_modules=[1, 2], additional_modules=[]) for i in range(1, count + 1)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _row_bytes(rows) -> int:
+    total = 0
+    for row in rows:
+        values = row.__dict__.values() if hasattr(row, "__table__") else tuple(row)
+        for value in values:
+            if isinstance(value, (str, bytes)):
+                total += len(value)
+            elif isinstance(value, (int, float, datetime)):
+                total += 8
+    return total
+
+
+def full_rows(db):
+    from database.db_customer import Client, ClientSubscription
+    clients = db.query(Client).options(undefer(Client.business_logo)).all()
+    subscriptions = db.query(ClientSubscription).all()
+    return clients + subscriptions
+
+
+def projected_rows(db):
+    from database.db_customer import Client, ClientSubscription
+    clients = db.query(Client.account_id, Client.business_name, Client.phone, Client.onboarded_date).all()
+    subscriptions = db.query(ClientSubscription.account_id, ClientSubscription.subscribed, ClientSubscription.package_id).all()
+    return clients + subscriptions
+
+
+def measure(label: str, loader, runs: int) -> None:
+    from database.session import new_app_session
+
+    timings, peaks, transferred = [], [], 0
+    for _ in range(runs):
+        db = new_app_session()
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = loader(db)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        transferred = _row_bytes(rows)
+        db.close()
+
+    print(f"{label:<12} {transferred / 1024:>12.0f} {max(peaks) / 1024:>12.0f} {sum(timings) / runs * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--logo-kb", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    seed_clients(args.clients, args.logo_kb)
+
+    print(f"{'query':<12} {'fetched KB':>12} {'peak KB':>12} {'avg ms':>10}")
+    measure("full rows", full_rows, args.runs)
+    measure("projected", projected_rows, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Client Detail Latency Benchmark
+Compares the previous four-query client detail lookup with the single joined
+query and with the per-account cache, reporting p50/p99 latency.
+
+SQLite runs in-process, so `--rtt-ms` adds a simulated network round trip to
+every statement to approximate a remote database.
+
+Usage:
+    python benchmarks/client_detail.py --clients 2000 --requests 2000 --rtt-ms 1
+"""
+import argparse
+import random
+import time
+from common import create_schema, percentile
+from client_columns import seed_clients
+from sqlalchemy import event
+
+
+def four_queries(db, account_id: int):
+    from database.db_customer import Client, ClientMain, ClientSettings, ClientSubscription
+    client = db.query(Client).filter(Client.account_id == account_id).first()
+    client_main = db.query(ClientMain).filter(ClientMain.account_id == account_id).first()
+    client_settings = db.query(ClientSettings).filter(ClientSettings.account_id == account_id).first()
+    client_subscription = db.query(ClientSubscription).filter(ClientSubscription.account_id == account_id).first()
+    return client, client_main, client_settings, client_subscription
+
+
+def joined_query(db, account_id: int):
+    from app.clients import _fetch_client_details
+    return _fetch_client_details(db, [account_id]).get(account_id)
+
+
+def cached(db, account_id: int):
+    from app.clients import client_detail_cache
+    return client_detail_cache.get_or_load(account_id, lambda: joined_query(db, account_id))
+
+
+def measure(label: str, loader, account_ids: list) -> None:
+    from database.session import new_app_session
+
+    timings = []
+    for account_id in account_ids:
+        db = new_app_session()
+        started = time.perf_counter()
+        loader(db, account_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+
+    print(f"{label:<14} {percentile(timings, 50):>9.2f} {percentile(timings, 99):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hot-accounts", type=int, default=200, help="Accounts the requests are drawn from")
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    create_schema()
+    seed_clients(args.clients, logo_kb=40)
+
+    from core.database import get_pos_engine
+
+    if args.rtt_ms:
+        @event.listens_for(get_pos_engine(), "before_cursor_execute")
+        def simulate_round_trip(*_):
+            time.sleep(args.rtt_ms / 1000)
+
+    account_ids = [random.randint(1, min(args.hot_accounts, args.clients)) for _ in range(args.requests)]
+
+    print(f"{'lookup':<14} {'p50 ms':>9} {'p99 ms':>9}")
+    measure("four queries", four_queries, account_ids)
+    measure("joined query", joined_query, account_ids)
+    measure("cached", cached, account_ids)
+
+
+if __name__ == "__main__":
+    main()
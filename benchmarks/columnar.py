@@ -0,0 +1,76 @@
+"""
+Columnar List Format Benchmark
+Compares the default dict-per-row list body with the columnar format
+(`format=columnar`) for client and ticket lists: JSON size, gzip size and
+serialization time through FastAPI's default path versus JSONResponse.
+
+Usage:
+    python benchmarks/columnar.py --rows 10000
+"""
+import argparse
+import gzip
+import time
+from datetime import datetime
+from common import ROOT  # noqa: F401  (puts the project on sys.path)
+from fastapi.encoders import jsonable_encoder
+
+
+def client_rows(count: int) -> list:
+    from schema.s_client_list_base import ClientListBase
+    return [
+        ClientListBase(
+            account_id=i, business_name=f"Business {i}", phone=9000000000 + i, email=f"client{i}@example.com",
+            subscribed=1, package=i % 5, account_status=1, onboarding=datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+        ).to_dict()
+        for i in range(1, count + 1)
+    ]
+
+
+def ticket_rows(count: int) -> list:
+    from schema.s_tickets import TicketSchema
+    return [
+        TicketSchema(
+            ticket_id=i, account_id=i % 500, user_id=1, subject=f"Printer not working {i}",
+            description="The receipt printer stops after the first order of the day. " * 3,
+            status=1, priority=i % 3 + 1, created_at=datetime.now().isoformat(), contact_mode=1,
+            client_name=f"Business {i % 500}", client_phone="9000000000", client_email="client@example.com"
+        ).to_dict()
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(label: str, body: dict, runs: int) -> None:
+    from fastapi.responses import JSONResponse
+
+    # Default path for dict return values: jsonable_encoder, then JSONResponse rendering
+    started = time.perf_counter()
+    for _ in range(runs):
+        payload = JSONResponse(jsonable_encoder(body)).body
+    encoded_ms = (time.perf_counter() - started) / runs * 1000
+
+    # Columnar bodies are returned as a JSONResponse directly
+    started = time.perf_counter()
+    for _ in range(runs):
+        JSONResponse(body).body
+    direct_ms = (time.perf_counter() - started) / runs * 1000
+
+    print(f"{label:<18} {len(payload) / 1024:>10.0f} {len(gzip.compress(payload)) / 1024:>10.0f} {encoded_ms:>12.1f} {direct_ms:>11.1f}")
+
+
+def main():
+    from utils.columnar import to_columnar
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'body':<18} {'JSON KB':>10} {'gzip KB':>10} {'encoder ms':>12} {'direct ms':>11}")
+    for name, rows in (("clients", client_rows(args.rows)), ("tickets", ticket_rows(args.rows))):
+        columns = list(rows[0])
+        measure(f"{name} rows", {name: rows}, args.runs)
+        measure(f"{name} columnar", {name: to_columnar(rows, columns)}, args.runs)
+
+
+if __name__ == "__main__":
+    main()
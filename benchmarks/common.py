@@ -0,0 +1,106 @@
+"""
+Shared benchmark helpers: throwaway SQLite databases, seeding and server processes.
+
+Import this module before anything from `core` so the SQLite URLs are picked
+up by the settings object.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="admin-api-bench-")
+
+os.environ.setdefault("APP_DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'pos.db')}")
+os.environ.setdefault("ADMIN_DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'admin.db')}")
+os.environ.setdefault("LEADER_LOCK_FILE", os.path.join(WORKDIR, "leader.lock"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BENCH_USER_ID = 1
+BENCH_TOKEN = "benchmark-token"
+AUTH_HEADERS = {"Authorization": f"Bearer {BENCH_TOKEN}", "X-User-Id": str(BENCH_USER_ID)}
+
+
+def server_env(**overrides) -> dict:
+    """Environment for a server subprocess pointed at the benchmark databases."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT
+    env.update({key: str(value) for key, value in overrides.items()})
+    return env
+
+
+def create_schema() -> None:
+    """Create all tables in the benchmark databases."""
+    from core.schema import create_all
+    create_all()
+
+
+def seed_admin_user() -> None:
+    """Insert the admin user used for authenticated benchmark requests."""
+    from database.session import new_admin_session
+    from database.db_users import User
+
+    db = new_admin_session()
+    try:
+        if not db.query(User).filter(User.user_id == BENCH_USER_ID).first():
+            db.add(User(
+                user_id=BENCH_USER_ID,
+                user_name="benchmark",
+                email="benchmark@example.com",
+                password="",
+                is_active=1,
+                created_at=datetime.now(),
+                created_by=BENCH_USER_ID,
+                permissions=[],
+                token=BENCH_TOKEN
+            ))
+            db.commit()
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command: list, port: int, env: dict, timeout: float = 30.0) -> subprocess.Popen:
+    """Start a server subprocess and wait until /health answers."""
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        time.sleep(0.05)
+    process.terminate()
+    raise TimeoutError("Server did not become ready")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
@@ -0,0 +1,97 @@
+"""
+Worker Scaling Load Test
+Starts `serve.py` with 1, 2, 4... workers and measures authenticated request
+throughput against each, to show how throughput scales with worker count.
+
+Usage:
+    python benchmarks/load_test.py --workers 1 2 4 --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import sys
+import time
+import httpx
+from common import (
+    AUTH_HEADERS, create_schema, free_port, percentile, seed_admin_user,
+    server_env, start_server, stop_server
+)
+
+
+def seed_packages(count: int) -> None:
+    from datetime import datetime
+    from database.session import new_admin_session
+    from database.db_packages import Package
+
+    db = new_admin_session()
+    try:
+        if db.query(Package).count() == 0:
+            db.add_all([
+                Package(
+                    id=i, name=f"Package {i}", active_modules=list(range(10)), device_limit=5,
+                    status=1, notes="benchmark", price=1000, created_at=datetime.now(), created_by=1
+                )
+                for i in range(1, count + 1)
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+async def drive(url: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(headers=AUTH_HEADERS, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--packages", type=int, default=200)
+    parser.add_argument("--path", default="/admin-api/packages/get_packages")
+    args = parser.parse_args()
+
+    create_schema()
+    seed_admin_user()
+    seed_packages(args.packages)
+
+    print(f"{'workers':>7} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        port = free_port()
+        env = server_env(WEB_CONCURRENCY=workers, SERVER_PORT=port, SERVER_HOST="127.0.0.1")
+        process = start_server([sys.executable, "serve.py"], port, env)
+        try:
+            result = asyncio.run(drive(f"http://127.0.0.1:{port}{args.path}", args.concurrency, args.duration))
+        finally:
+            stop_server(process)
+        print(f"{workers:>7} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
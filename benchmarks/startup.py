@@ -0,0 +1,86 @@
+"""
+Cold Start Benchmark
+Measures how long `import main` takes and how long a fresh uvicorn process
+needs before it serves its first request.
+
+Runs against throwaway SQLite databases so no remote database is touched.
+
+Usage:
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["APP_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'pos.db')}"
+    env["ADMIN_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'admin.db')}"
+    env["PYTHONPATH"] = ROOT
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    """Seconds spent importing the application module in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_request(env: dict, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until GET /health returns 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("Server did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _summary(label: str, values: list) -> str:
+    return f"{label:<22} median {statistics.median(values) * 1000:8.1f} ms   min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = _env(workdir)
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first_requests = [measure_first_request(env) for _ in range(args.runs)]
+
+    print(_summary("import main", imports))
+    print(_summary("first served request", first_requests))
+
+
+if __name__ == "__main__":
+    main()
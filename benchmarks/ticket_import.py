@@ -0,0 +1,96 @@
+"""
+Ticket Import Benchmark
+Compares importing tickets and updates one record at a time (what calling
+create_ticket / create_update per record does: existence check, max-id scan
+and a commit each) with the bulk import used by import_tickets.
+
+Usage:
+    python benchmarks/ticket_import.py --tickets 5000 --updates-per-ticket 3
+"""
+import argparse
+import time
+from datetime import datetime
+from common import create_schema
+
+
+def make_records(tickets: int, updates_per_ticket: int, first_id: int):
+    created_at = datetime(2024, 1, 1).isoformat()
+    ticket_records = [
+        {
+            "ticket_id": first_id + i, "account_id": i % 500 + 1, "user_id": 1, "subject": f"Imported {i}",
+            "description": "Migrated from the previous helpdesk", "status": 3, "priority": i % 3 + 1,
+            "created_at": created_at, "contact_mode": 1, "client_name": "Client",
+            "client_phone": "9000000000", "client_email": "client@example.com"
+        }
+        for i in range(tickets)
+    ]
+    update_records = [
+        {"ticket_id": first_id + i, "description": "Reply", "created_at": created_at, "updated_by": 1, "contact_mode": 1}
+        for i in range(tickets) for _ in range(updates_per_ticket)
+    ]
+    return ticket_records, update_records
+
+
+def row_by_row(ticket_records, update_records) -> None:
+    from database.session import new_admin_session
+    from database.db_tickets import Ticket
+    from database.db_ticket_updates import TicketUpdate
+
+    db = new_admin_session()
+    try:
+        for record in ticket_records:
+            if db.query(Ticket).filter(Ticket.ticket_id == record["ticket_id"]).first():
+                continue
+            db.query(Ticket).order_by(Ticket.ticket_id.desc()).first()
+            db.add(Ticket(
+                ticket_id=record["ticket_id"], account_id=record["account_id"], user_id=record["user_id"],
+                subject=record["subject"], description=record["description"], status=record["status"],
+                priority=record["priority"], created_at=datetime.fromisoformat(record["created_at"]),
+                contact_mode=record["contact_mode"], clinet_name=record["client_name"],
+                client_phone=record["client_phone"], clinet_email=record["client_email"]
+            ))
+            db.commit()
+
+        for record in update_records:
+            db.query(Ticket).filter(Ticket.ticket_id == record["ticket_id"]).first()
+            db.add(TicketUpdate(
+                ticket_id=record["ticket_id"], user_id=record["updated_by"], description=record["description"],
+                created_at=datetime.fromisoformat(record["created_at"]), contact_mode=record["contact_mode"]
+            ))
+            db.commit()
+    finally:
+        db.close()
+
+
+def bulk(ticket_records, update_records) -> None:
+    from database.session import new_admin_session
+    from utils.ticket_import import import_records
+
+    db = new_admin_session()
+    try:
+        result = import_records(db, ticket_records, update_records)
+        assert not result["errors"], result["errors"][:3]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--updates-per-ticket", type=int, default=3)
+    args = parser.parse_args()
+
+    create_schema()
+    records = args.tickets * (1 + args.updates_per_ticket)
+
+    print(f"{'import':<12} {'records':>10} {'seconds':>10} {'records/s':>12}")
+    for label, importer, first_id in (("row by row", row_by_row, 1), ("bulk", bulk, args.tickets + 1)):
+        ticket_records, update_records = make_records(args.tickets, args.updates_per_ticket, first_id)
+        started = time.perf_counter()
+        importer(ticket_records, update_records)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<12} {records:>10} {elapsed:>10.2f} {records / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,10 @@
 Core module - Application configuration and setup
 """
 from core.config import settings
-from core.database import pos_engine, admin_engine, AppBase, AdminBase
+from core.database import get_pos_engine, get_admin_engine, init_engines, dispose_engines, AppBase, AdminBase
 from core.logging import setup_logging, get_logger
 
-__all__ = ["settings", "pos_engine", "admin_engine", "AppBase", "AdminBase", "setup_logging", "get_logger"]
-
+__all__ = [
+    "settings", "get_pos_engine", "get_admin_engine", "init_engines", "dispose_engines",
+    "AppBase", "AdminBase", "setup_logging", "get_logger"
+]
@@ -0,0 +1,492 @@
+"""
+Caching
+Bounded, expiring LRU caches with hit/miss counters, and namespaced caches
+that can share entries between workers and tasks through Redis.
+
+Each worker process has its own LRU caches, so entries are sized per worker and
+carry a TTL: writes made through this API invalidate the local entry, while
+changes made elsewhere (the POS fleet, other workers) age out within the TTL.
+
+With CACHE_BACKEND=redis, `Cache` keeps a short-lived local copy in front of
+Redis. Writes and deletes are published on an invalidation channel so other
+workers drop their local copies, and `get_or_load` lets only one caller per
+key (per worker, and across workers through a Redis lock) run the loader.
+"""
+import json
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from core.config import settings
+from core.logging import get_logger
+from core.workers import per_worker
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the in-process backend needs nothing
+    redis = None
+
+logger = get_logger(__name__)
+
+_registry: Dict[str, "LRUCache"] = {}
+_registry_lock = threading.Lock()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Every key carries a generation counter that `set`, `invalidate` and `clear`
+    advance. A reader that records `generation(key)` before loading from the
+    database and passes it to `set` cannot overwrite a newer write-through or
+    invalidation with the stale value it loaded.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "stale_sets": 0, "invalidations": 0, "evictions": 0, "expired": 0}
+
+        with _registry_lock:
+            _registry[name] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Token to pass to `set` when filling the cache from a read."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None, ttl: Optional[float] = None) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache; callers must not mutate it afterwards.
+            generation: Token from `generation(key)` taken before the value was loaded.
+                The value is discarded if the key was written or invalidated since.
+            ttl: Lifetime of this entry if shorter than the cache's TTL.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        if self.maxsize <= 0:
+            return False
+
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                self.stats["stale_sets"] += 1
+                return False
+
+            self._bump(key)
+            self._entries[key] = (value, time.monotonic() + min(ttl or self.ttl, self.ttl))
+            self._entries.move_to_end(key)
+            self.stats["sets"] += 1
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._bump(key)
+            self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+            self.stats["invalidations"] += 1
+
+    def _bump(self, key: Hashable) -> None:
+        # Generations of uncached keys are pruned once they outnumber the entries;
+        # advancing the epoch makes any token taken before the prune stale
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if len(self._generations) > 2 * max(self.maxsize, 1):
+            for stale in [k for k in self._generations if k not in self._entries]:
+                del self._generations[stale]
+            self._epoch += 1
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                **self.stats,
+                "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+
+
+#------------------------------------------------------------------------------
+# Shared backend
+#------------------------------------------------------------------------------
+
+# Identifies this worker's own invalidation messages
+_WORKER_ID = uuid.uuid4().hex
+_STRIPES = 64
+
+_backend: Optional["RedisBackend"] = None
+_backend_lock = threading.Lock()
+_caches: Dict[str, "Cache"] = {}
+
+
+class RedisBackend:
+    """
+    Shared cache store on a redis-py compatible client.
+
+    Errors are logged and treated as misses so a Redis outage degrades to
+    per-worker caching instead of failing requests.
+    """
+
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "errors": 0, "lock_waits": 0, "invalidations_received": 0}
+        self._pubsub = None
+        self._listener = None
+
+    def _call(self, operation: str, func: Callable, default=None):
+        try:
+            return func()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Redis cache {operation} failed: {str(e)}")
+            return default
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        values = self._call("get", lambda: self.client.mget(keys), [None] * len(keys))
+        for value in values:
+            self.stats["hits" if value is not None else "misses"] += 1
+        return [value.decode("utf-8") if isinstance(value, bytes) else value for value in values]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.stats["sets"] += 1
+        self._call("set", lambda: self.client.set(key, value, px=max(1, int(ttl * 1000))))
+
+    def delete(self, keys: List[str]) -> None:
+        if keys:
+            self._call("delete", lambda: self.client.delete(*keys))
+
+    def delete_prefix(self, prefix: str) -> None:
+        def delete_matching():
+            batch = []
+            for key in self.client.scan_iter(match=f"{prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+
+        self._call("delete", delete_matching)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        """Set-if-absent lock with an expiry, so a crashed holder never blocks the key for long."""
+        return bool(self._call("lock", lambda: self.client.set(key, _WORKER_ID, nx=True, px=max(1, int(ttl * 1000))), True))
+
+    def release_lock(self, key: str) -> None:
+        def release():
+            holder = self.client.get(key)
+            if holder in (_WORKER_ID, _WORKER_ID.encode("ascii")):
+                self.client.delete(key)
+
+        self._call("unlock", release)
+
+    def publish(self, namespace: str, key: Optional[str]) -> None:
+        message = json.dumps({"origin": _WORKER_ID, "namespace": namespace, "key": key})
+        self._call("publish", lambda: self.client.publish(self.channel, message))
+
+    def _on_message(self, message) -> None:
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+
+        if data.get("origin") == _WORKER_ID:
+            return
+
+        cache = _caches.get(data.get("namespace"))
+        if cache is not None:
+            self.stats["invalidations_received"] += 1
+            if data.get("key") is None:
+                cache.local.clear()
+            else:
+                cache.local.invalidate(data["key"])
+
+    def start_listener(self) -> None:
+        """Drop local copies when another worker publishes a change."""
+        def subscribe():
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_message})
+            self._listener = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+        self._call("subscribe", subscribe)
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            self._call("unsubscribe", self._pubsub.close)
+            self._pubsub = None
+
+
+def configure_cache(backend: Optional[RedisBackend]) -> None:
+    """Install a shared backend (or None for per-worker caching only), e.g. one built on a fake client."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = backend
+        if backend is not None:
+            backend.start_listener()
+
+
+def get_backend() -> Optional[RedisBackend]:
+    return _backend
+
+
+def connect_redis(purpose: str):
+    """Client for CACHE_REDIS_URL when it answers, else None; for features that need Redis without CACHE_BACKEND=redis."""
+    if redis is None:
+        return None
+
+    client = redis.Redis.from_url(
+        settings.CACHE_REDIS_URL,
+        socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS
+    )
+    try:
+        client.ping()
+    except Exception as e:
+        logger.warning(f"Redis for {purpose} unavailable at {settings.CACHE_REDIS_URL}: {str(e)}")
+        return None
+    return client
+
+
+def init_cache() -> None:
+    """Connect the shared backend selected by CACHE_BACKEND (called from the application lifespan)."""
+    if settings.CACHE_BACKEND == "local":
+        configure_cache(None)
+        return
+
+    if settings.CACHE_BACKEND != "redis":
+        raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+
+    if redis is None:
+        raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+
+    client = redis.Redis.from_url(
+        settings.CACHE_REDIS_URL,
+        socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS
+    )
+    configure_cache(RedisBackend(client, settings.CACHE_KEY_PREFIX))
+    logger.info("Shared cache backend connected", extra={"backend": "redis"})
+
+
+def close_cache() -> None:
+    configure_cache(None)
+
+
+class Cache:
+    """
+    Namespaced cache of JSON-serializable values.
+
+    Entries live in a per-worker LRUCache and, when a shared backend is
+    configured, in Redis under `<prefix>:<namespace>:<key>`. Local copies are
+    kept for at most CACHE_LOCAL_TTL_SECONDS when shared, because missed
+    invalidation messages must not keep them alive for the full TTL.
+    """
+
+    def __init__(self, namespace: str, ttl: float, local_size: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(namespace, per_worker(local_size), ttl)
+        self._locks = [threading.Lock() for _ in range(_STRIPES)]
+        _caches[namespace] = self
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        if isinstance(key, tuple):
+            return ":".join(str(part) for part in key)
+        return str(key)
+
+    def _shared_key(self, backend: RedisBackend, key: str) -> str:
+        return f"{backend.prefix}:{self.namespace}:{key}"
+
+    def _store_local(self, key: str, value: Any, generation: Optional[Tuple[int, int]] = None) -> bool:
+        # Shorter local lifetime while a shared copy exists
+        ttl = settings.CACHE_LOCAL_TTL_SECONDS if _backend is not None else None
+        return self.local.set(key, value, generation, ttl)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached values among `keys`: local copies first, then one MGET for the rest."""
+        found = {}
+        misses = {}
+        for key in keys:
+            value = self.local.get(self._key(key))
+            if value is None:
+                misses[key] = self._key(key)
+            else:
+                found[key] = value
+
+        backend = _backend
+        if misses and backend is not None:
+            generations = {key: self.local.generation(name) for key, name in misses.items()}
+            shared_keys = [self._shared_key(backend, name) for name in misses.values()]
+            for (key, name), raw in zip(misses.items(), backend.get_many(shared_keys)):
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._store_local(name, value, generations[key])
+                    found[key] = value
+        return found
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Token to take before loading a value from the database (see `store_loaded`)."""
+        return self.local.generation(self._key(key))
+
+    def store_loaded(self, key: Hashable, value: Any, generation: Tuple[int, int], ttl: Optional[float] = None) -> bool:
+        """
+        Cache a value read from the database, unless the key was written or deleted
+        in this worker since `generation` was taken. Nothing is broadcast.
+        """
+        name = self._key(key)
+        if not self._store_local(name, value, generation):
+            return False
+
+        backend = _backend
+        if backend is not None:
+            backend.set(self._shared_key(backend, name), json.dumps(value), ttl or self.ttl)
+        return True
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Write through both tiers and tell other workers to drop their local copy."""
+        name = self._key(key)
+        self._store_local(name, value)
+
+        backend = _backend
+        if backend is not None:
+            backend.set(self._shared_key(backend, name), json.dumps(value), ttl or self.ttl)
+            backend.publish(self.namespace, name)
+
+    def delete(self, key: Hashable) -> None:
+        name = self._key(key)
+        self.local.invalidate(name)
+
+        backend = _backend
+        if backend is not None:
+            backend.delete([self._shared_key(backend, name)])
+            backend.publish(self.namespace, name)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+        backend = _backend
+        if backend is not None:
+            backend.delete_prefix(f"{backend.prefix}:{self.namespace}:")
+            backend.publish(self.namespace, None)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value, or run `loader` once and cache its result.
+
+        Concurrent callers in this worker wait on a per-key lock; other workers
+        wait up to CACHE_LOCK_WAIT_SECONDS for the Redis lock holder to publish
+        the value before loading it themselves. None results are not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        name = self._key(key)
+        generation = self.generation(key)
+
+        with self._locks[zlib.crc32(name.encode("utf-8")) % _STRIPES]:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            backend = _backend
+            lock_key = None
+            if backend is not None:
+                lock_key = self._shared_key(backend, f"lock:{name}")
+                if not backend.acquire_lock(lock_key, settings.CACHE_LOCK_TIMEOUT_SECONDS):
+                    backend.stats["lock_waits"] += 1
+                    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+                    while time.monotonic() < deadline:
+                        time.sleep(0.02)
+                        value = self.get(key)
+                        if value is not None:
+                            return value
+                    lock_key = None
+
+            try:
+                value = loader()
+                if value is not None:
+                    self.store_loaded(key, value, generation, ttl)
+                return value
+            finally:
+                if lock_key is not None:
+                    backend.release_lock(lock_key)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        `get_or_load` for async handlers. Local hits are answered on the event loop; a miss
+        (Redis read, lock wait, loader) runs in the threadpool, so the per-key locks and
+        the Redis lock wait never block other requests of the worker.
+        """
+        value = self.local.get(self._key(key))
+        if value is not None:
+            return value
+        return await run_in_threadpool(self.get_or_load, key, loader, ttl)
+
+    def info(self) -> Dict[str, Any]:
+        return self.local.info()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Counters of every cache created in this worker, plus the shared backend's."""
+    with _registry_lock:
+        caches = list(_registry.values())
+
+    stats: Dict[str, Any] = {cache.name: cache.info() for cache in caches}
+    backend = _backend
+    stats["shared_backend"] = dict(backend.stats, worker_id=_WORKER_ID) if backend is not None else None
+    return stats
@@ -2,6 +2,7 @@
 Application Configuration
 Centralized configuration management using environment variables.
 """
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,6 +15,101 @@ class Settings(BaseSettings):
     DB_HOST: str = "shopos-db.cj8uqe0gmqvq.ap-south-1.rds.amazonaws.com"
     APP_DATABASE: str = "pos"
     ADMIN_DATABASE: str = "posAdmin"
+    APP_DATABASE_URL: Optional[str] = None  # Full URL override, e.g. sqlite:///pos.db for local runs
+    ADMIN_DATABASE_URL: Optional[str] = None
+    CREATE_SCHEMA_ON_STARTUP: bool = False  # Prefer `python -m core.schema` in production
+    DB_POOL_SIZE_TOTAL: int = 10  # Connections per engine per task, split across workers
+    DB_MAX_OVERFLOW_TOTAL: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # Read Replica Configuration (pos database)
+    APP_REPLICA_DATABASE_URL: Optional[str] = None  # Unset means all reads use the primary
+    REPLICA_MAX_LAG_SECONDS: int = 5
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    READ_YOUR_WRITES_SECONDS: int = 30  # Reads stay on the primary this long after a write
+
+    # Serving Configuration
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 80
+    WEB_CONCURRENCY: Optional[int] = None  # Worker processes; defaults to the CPU quota
+    MAX_WORKERS: int = 8
+    LEADER_LOCK_FILE: str = "/tmp/admin-api-leader.lock"
+
+    # Conditional GET Configuration
+    ETAG_MAX_STALENESS_SECONDS: int = 60  # Bound for changes made outside this API (POS fleet)
+
+    # Client Logo Configuration
+    LOGO_CACHE_MAX_AGE_SECONDS: int = 86400  # Browser cache lifetime before revalidation
+    LOGO_HASH_CACHE_SIZE: int = 10000  # Known logo hashes per task, split across workers
+    LOGO_HASH_TTL_SECONDS: int = 300  # Logos change in the POS apps, so known hashes expire
+    LOGO_THUMBNAIL_DIR: str = "/tmp/admin-api-logo-thumbnails"
+
+    # Cache Configuration
+    CACHE_BACKEND: str = "local"  # "local" (per worker) or "redis" (shared across workers and tasks)
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+    CACHE_KEY_PREFIX: str = "admin-api"
+    CACHE_LOCAL_TTL_SECONDS: float = 10  # Local copies of shared entries, in case an invalidation is missed
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 10  # Expiry of the cross-worker loader lock
+    CACHE_LOCK_WAIT_SECONDS: float = 1.0  # How long to wait for another worker's load before loading
+    AUTH_CACHE_SIZE: int = 1000
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    PACKAGE_CACHE_TTL_SECONDS: int = 300
+    LIST_SNAPSHOT_CACHE_SIZE: int = 32  # Serialized list bodies per task, keyed by ETag
+
+    # Client Detail Cache Configuration
+    CLIENT_DETAIL_CACHE_SIZE: int = 5000  # Accounts per task, split across workers; 0 disables
+    CLIENT_DETAIL_CACHE_TTL_SECONDS: int = 60  # Bound for changes made outside this API (POS fleet)
+    CLIENT_BATCH_MAX_IDS: int = 1000  # Largest account_ids list accepted by get_clients_batch
+    CLIENT_BATCH_CHUNK_SIZE: int = 500  # Account ids per IN (...) query
+    CLIENT_SUMMARY_RECONCILE_SECONDS: int = 300  # Bound for POS-side changes to reach the client list
+    CLIENT_SEARCH_MAX_LIMIT: int = 100
+
+    # Dashboard Stats Configuration
+    DASHBOARD_STATS_RECONCILE_SECONDS: int = 300  # Bound for POS-side changes (account status) to reach the counters
+    DASHBOARD_STATS_CACHE_TTL_SECONDS: int = 3600  # Entries are keyed by version; this only bounds memory
+
+    # Client Rollups Configuration
+    CLIENT_ROLLUP_INTERVAL_SECONDS: int = 300  # How often new accounts and TrackUpdates are appended
+    CLIENT_ROLLUP_BATCH_SIZE: int = 1000  # Source rows per transaction
+    CLIENT_ROLLUP_SETTLE_SECONDS: int = 60  # TrackUpdates this recent wait for lower ids that may still commit
+    CLIENT_ROLLUP_MAX_BUCKETS: int = 1000  # Largest range served by client_rollups
+
+    # Ticket Queue Configuration
+    TICKET_QUEUE_MAX_LIMIT: int = 200  # Largest page served by ticket_queue
+    TICKET_SLA_HOURS_HIGH: int = 4  # next_ticket orders by created_at + SLA hours of the priority
+    TICKET_SLA_HOURS_MEDIUM: int = 24
+    TICKET_SLA_HOURS_LOW: int = 72
+    TICKET_CLAIM_TTL_SECONDS: int = 1800  # Unreleased claims expire and the ticket is handed out again
+    TICKET_QUEUE_REBUILD_SECONDS: int = 60  # Per-worker heap rebuild (picks up expired and released claims)
+    TICKET_IMPORT_MAX_RECORDS: int = 100000  # Tickets plus updates accepted by one import_tickets call
+    TICKET_IMPORT_CHUNK_SIZE: int = 1000  # Rows per executemany / ids per IN (...) query
+    TICKET_SEARCH_BACKEND: str = "auto"  # "fulltext" (MySQL FULLTEXT), "index" (in-process) or "auto"
+    TICKET_SEARCH_MAX_LIMIT: int = 100
+    TICKET_ARCHIVE_AFTER_DAYS: int = 180  # Closed tickets without activity for this long move to the archive tables
+    TICKET_ARCHIVE_BATCH_SIZE: int = 500  # Tickets moved per transaction
+    TICKET_ARCHIVE_MAX_BATCHES: int = 200  # Per job run, so a large backlog is spread over several runs
+    TICKET_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    TICKET_ANALYTICS_CACHE_SECONDS: int = 300  # How long a computed SLA report is served before recomputing
+    TICKET_ANALYTICS_MAX_DAYS: int = 730
+
+    # Ticket Events Configuration
+    EVENT_QUEUE_SIZE: int = 100  # Events buffered per SSE connection before it is dropped
+    EVENT_BUFFER_SIZE: int = 1000  # Recent events kept per worker for Last-Event-ID resume
+    EVENT_HEARTBEAT_SECONDS: float = 15  # Comment line sent on idle streams (keeps proxies from closing them)
+    EVENT_RETRY_MS: int = 3000  # Reconnect delay advertised to clients
+
+    # Attachment Storage Configuration
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_PATH: str = "/tmp/admin-api-blobs"  # Mount a persistent volume here in production
+    BLOB_CHUNK_BYTES: int = 1024 * 1024
+    ATTACHMENT_MAX_BYTES: int = 100 * 1024 * 1024
+
+    # Background Jobs Configuration
+    BACKGROUND_JOBS_ENABLED: bool = True
+    JOB_SCHEDULER_TICK_SECONDS: float = 5.0
+    TRACK_UPDATE_RETENTION_DAYS: int = 45
+    RETENTION_JOB_INTERVAL_SECONDS: int = 3600
     
     # Application Configuration
     APP_NAME: str = "Admin Server API"
@@ -28,7 +124,13 @@ class Settings(BaseSettings):
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
-    
+
+    # Memory Diagnostics Configuration
+    DIAGNOSTICS_SAMPLE_RATE: float = 0.01  # Fraction of requests measured while tracing
+    DIAGNOSTICS_TRACE_FRAMES: int = 10
+    DIAGNOSTICS_MAX_SNAPSHOTS: int = 10
+    DIAGNOSTICS_MAX_SAMPLES: int = 200
+
     # Pydantic v2 configuration
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -49,11 +151,15 @@ class Settings(BaseSettings):
     @property
     def app_database_url(self) -> str:
         """Construct application database connection URL."""
+        if self.APP_DATABASE_URL:
+            return self.APP_DATABASE_URL
         return f"mysql+pymysql://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_HOST}/{self.APP_DATABASE}"
     
     @property
     def admin_database_url(self) -> str:
         """Construct admin database connection URL."""
+        if self.ADMIN_DATABASE_URL:
+            return self.ADMIN_DATABASE_URL
         return f"mysql+pymysql://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_HOST}/{self.ADMIN_DATABASE}"
 
 
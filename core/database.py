@@ -1,16 +1,75 @@
 """
 Database Configuration
 SQLAlchemy engine and declarative base setup.
+Engines are created lazily on first use so importing the application never
+opens a connection to the database.
 """
+import threading
+from typing import Dict, Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from core.config import settings
+from core.workers import per_worker
 
-# Create database engines using settings
-pos_engine = create_engine(settings.app_database_url)
-admin_engine = create_engine(settings.admin_database_url)
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
 
 # Declarative bases for models
 AppBase = declarative_base()
 AdminBase = declarative_base()
 
+
+def _engine_options(url: str) -> dict:
+    """Pool options sized so all workers together stay within the per-task connection budget."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": per_worker(settings.DB_POOL_SIZE_TOTAL),
+        "max_overflow": per_worker(settings.DB_MAX_OVERFLOW_TOTAL, minimum=0),
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+
+def _get_engine(name: str, url: str) -> Engine:
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = create_engine(url, **_engine_options(url))
+                _engines[name] = engine
+    return engine
+
+
+def get_pos_engine() -> Engine:
+    """Return the application (pos) database engine, creating it on first use."""
+    return _get_engine("pos", settings.app_database_url)
+
+
+def get_pos_replica_engine() -> Optional[Engine]:
+    """Return the pos read-replica engine, or None when no replica is configured."""
+    if not settings.APP_REPLICA_DATABASE_URL:
+        return None
+    return _get_engine("pos_replica", settings.APP_REPLICA_DATABASE_URL)
+
+
+def get_admin_engine() -> Engine:
+    """Return the admin (posAdmin) database engine, creating it on first use."""
+    return _get_engine("admin", settings.admin_database_url)
+
+
+def init_engines() -> None:
+    """Create both engines up front. Engines connect lazily, so this does no I/O."""
+    get_pos_engine()
+    get_pos_replica_engine()
+    get_admin_engine()
+
+
+def dispose_engines() -> None:
+    """Close all pooled connections and forget the engines."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
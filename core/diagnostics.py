@@ -0,0 +1,215 @@
+"""
+Memory Diagnostics
+tracemalloc control, snapshot storage and per-request allocation sampling.
+
+tracemalloc keeps one traced peak per process, so a request sample's peak also
+counts whatever other requests allocated while it ran. Samples record whether
+another request was in flight (`overlapped`); only samples without overlap
+are exact. Background jobs are not tracked and can still inflate a peak.
+"""
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from core.config import settings
+
+# Frames from these files are noise in every snapshot
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+_lock = threading.Lock()
+_snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+_request_samples: Deque[Dict[str, Any]] = deque(maxlen=settings.DIAGNOSTICS_MAX_SAMPLES)
+_sample_rate: float = settings.DIAGNOSTICS_SAMPLE_RATE
+_sampling_lock = threading.Lock()
+_in_flight_lock = threading.Lock()
+_in_flight = 0
+_sample_overlapped = False
+
+
+def is_tracing() -> bool:
+    """Return True when tracemalloc is currently tracing allocations."""
+    return tracemalloc.is_tracing()
+
+
+def start_tracing(frames: Optional[int] = None, sample_rate: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Start tracing allocations.
+
+    Args:
+        frames: Number of stack frames stored per allocation.
+        sample_rate: Fraction of requests (0.0 - 1.0) whose peak allocation is recorded.
+
+    Returns:
+        dict: Current tracing status.
+    """
+    global _sample_rate
+
+    if sample_rate is not None:
+        _sample_rate = max(0.0, min(1.0, sample_rate))
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames or settings.DIAGNOSTICS_TRACE_FRAMES)
+
+    return status()
+
+
+def stop_tracing() -> Dict[str, Any]:
+    """Stop tracing allocations and drop all stored snapshots."""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    with _lock:
+        _snapshots.clear()
+
+    return status()
+
+
+def status() -> Dict[str, Any]:
+    """Return tracing state, traced memory and stored snapshot names of this worker process."""
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    with _lock:
+        snapshot_names = list(_snapshots.keys())
+
+    return {
+        "worker_pid": os.getpid(),  # Tracing and snapshots are per process; calls must reach the same worker
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else 0,
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "sample_rate": _sample_rate,
+        "snapshots": snapshot_names,
+    }
+
+
+def current_snapshot() -> tracemalloc.Snapshot:
+    """
+    Take a filtered snapshot without storing it (so it never evicts a named one).
+
+    Raises:
+        RuntimeError: If tracing is not active.
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("Tracing is not active")
+
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+    )
+
+
+def take_snapshot(name: Optional[str] = None) -> str:
+    """
+    Take a filtered snapshot and store it under a name.
+
+    The oldest snapshot is evicted once DIAGNOSTICS_MAX_SNAPSHOTS is reached.
+
+    Raises:
+        RuntimeError: If tracing is not active.
+    """
+    snapshot = current_snapshot()
+    name = name or datetime.utcnow().strftime("%Y%m%dT%H%M%S.%f")
+
+    with _lock:
+        _snapshots.pop(name, None)
+        _snapshots[name] = snapshot
+        while len(_snapshots) > settings.DIAGNOSTICS_MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+    return name
+
+
+def get_snapshot(name: str) -> Optional[tracemalloc.Snapshot]:
+    """Return a stored snapshot by name, or None."""
+    with _lock:
+        return _snapshots.get(name)
+
+
+def _format_stat(stat) -> Dict[str, Any]:
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {
+        "location": frames[0] if frames else None,
+        "traceback": frames,
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+
+
+def _format_diff(stat) -> Dict[str, Any]:
+    data = _format_stat(stat)
+    data["size_diff_bytes"] = stat.size_diff
+    data["count_diff"] = stat.count_diff
+    return data
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+    """Return the largest allocation sites of a snapshot."""
+    return [_format_stat(stat) for stat in snapshot.statistics(group_by)[:limit]]
+
+
+def compare_snapshots(old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+    """Return the allocation sites that grew (or shrank) the most between two snapshots."""
+    return [_format_diff(stat) for stat in new.compare_to(old, group_by)[:limit]]
+
+
+def should_sample(draw: float) -> bool:
+    """Decide whether a request should be sampled given a uniform random draw."""
+    return tracemalloc.is_tracing() and draw < _sample_rate
+
+
+def request_started() -> None:
+    """Count a request in flight while tracing, marking the running sample as overlapped."""
+    global _in_flight, _sample_overlapped
+    with _in_flight_lock:
+        _in_flight += 1
+        if _sampling_lock.locked():
+            _sample_overlapped = True
+
+
+def request_finished() -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def begin_request_sample() -> bool:
+    """
+    Reset the tracemalloc peak for a sampled request.
+
+    tracemalloc keeps a single process-wide peak, so only one request is
+    measured at a time; concurrent requests are skipped rather than
+    producing overlapping measurements.
+
+    Returns:
+        bool: True if this request owns the sampler and must call end_request_sample().
+    """
+    global _sample_overlapped
+
+    if not _sampling_lock.acquire(blocking=False):
+        return False
+    with _in_flight_lock:
+        _sample_overlapped = _in_flight > 1
+    tracemalloc.reset_peak()
+    return True
+
+
+def end_request_sample(method: str, path: str, status_code: Optional[int], started_bytes: int) -> None:
+    """Record the peak allocation of the request that owns the sampler."""
+    try:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        _request_samples.append({
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "peak_bytes": max(peak - started_bytes, 0),
+            "retained_bytes": current - started_bytes,
+            "overlapped": _sample_overlapped,  # Another request ran meanwhile; its allocations are in the peak
+        })
+    finally:
+        _sampling_lock.release()
+
+
+def request_samples(limit: int = 50) -> List[Dict[str, Any]]:
+    """Return the most recent per-request allocation samples, newest first."""
+    return list(_request_samples)[::-1][:limit]
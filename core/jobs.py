@@ -0,0 +1,94 @@
+"""
+Background Jobs
+Periodic maintenance jobs run inside the application process.
+
+Jobs registered with `leader_only=True` (the default) run in exactly one
+worker: the one holding the leader lock from core/workers.py. Other workers
+keep retrying the lock so a replacement takes over if the leader exits.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from core.logging import get_logger
+from core.workers import try_acquire_leadership, release_leadership
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Job:
+    """A periodic job. `func` is synchronous and runs in the threadpool."""
+    name: str
+    interval_seconds: float
+    func: Callable[[], None]
+    leader_only: bool = True
+    run_at_startup: bool = True
+    next_run: float = field(default=0.0)
+
+
+_jobs: Dict[str, Job] = {}
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+def register_job(name: str, interval_seconds: float, func: Callable[[], None], leader_only: bool = True, run_at_startup: bool = True) -> None:
+    """Register (or replace) a periodic job."""
+    _jobs[name] = Job(name, interval_seconds, func, leader_only, run_at_startup)
+
+
+def _due_jobs(now: float, leader: bool):
+    for job in _jobs.values():
+        if job.leader_only and not leader:
+            continue
+        if job.next_run <= now:
+            yield job
+
+
+async def _run_job(job: Job) -> None:
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(job.func)
+        logger.info(f"Job {job.name} completed", extra={"job": job.name, "duration_ms": round((time.perf_counter() - started) * 1000, 1)})
+    except Exception as e:
+        logger.error(f"Job {job.name} failed: {str(e)}", extra={"job": job.name}, exc_info=True)
+
+
+async def _scheduler() -> None:
+    now = time.monotonic()
+    for job in _jobs.values():
+        job.next_run = now if job.run_at_startup else now + job.interval_seconds
+
+    while True:
+        leader = try_acquire_leadership()
+        now = time.monotonic()
+
+        for job in list(_due_jobs(now, leader)):
+            await _run_job(job)
+            job.next_run = time.monotonic() + job.interval_seconds
+
+        await asyncio.sleep(settings.JOB_SCHEDULER_TICK_SECONDS)
+
+
+def start_jobs() -> None:
+    """Start the scheduler task on the running event loop."""
+    global _scheduler_task
+
+    if settings.BACKGROUND_JOBS_ENABLED and _scheduler_task is None:
+        _scheduler_task = asyncio.get_running_loop().create_task(_scheduler())
+
+
+async def stop_jobs() -> None:
+    """Cancel the scheduler task and give up leadership."""
+    global _scheduler_task
+
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+        _scheduler_task = None
+
+    release_leadership()
@@ -0,0 +1,76 @@
+"""
+Schema Management
+Explicit table creation for both databases.
+
+Usage:
+    python -m core.schema
+"""
+from sqlalchemy import inspect
+from core.database import get_pos_engine, get_admin_engine, AppBase, AdminBase
+from core.logging import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+def import_models() -> None:
+    """Import every model module so its tables are registered on the metadata."""
+    import database.db_client_rollups  # noqa: F401
+    import database.db_client_summary  # noqa: F401
+    import database.db_customer  # noqa: F401
+    import database.db_dashboard_counters  # noqa: F401
+    import database.db_packages  # noqa: F401
+    import database.db_ticket_claims  # noqa: F401
+    import database.db_tickets  # noqa: F401
+    import database.db_ticket_updates  # noqa: F401
+    import database.db_updates  # noqa: F401
+    import database.db_users  # noqa: F401
+    import database.db_versions  # noqa: F401
+
+
+def _applies_to(index, dialect_name: str) -> bool:
+    """False for indexes restricted to other dialects with `ddl_if` (e.g. MySQL FULLTEXT)."""
+    ddl_if = getattr(index, "_ddl_if", None)
+    if ddl_if is None or ddl_if.dialect is None:
+        return True
+    dialects = (ddl_if.dialect,) if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+    return dialect_name in dialects
+
+
+def create_missing_indexes(base, engine) -> int:
+    """
+    Create indexes declared on existing tables that the database does not have yet.
+    `create_all` only creates indexes together with new tables.
+
+    Returns:
+        int: Number of indexes created
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = 0
+
+    for table in base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes and _applies_to(index, engine.dialect.name):
+                index.create(bind=engine)
+                logger.info(f"Created index {index.name} on {table.name}")
+                created += 1
+
+    return created
+
+
+def create_all() -> None:
+    """Create any missing tables and indexes in the pos and admin databases."""
+    import_models()
+    AppBase.metadata.create_all(bind=get_pos_engine())
+    AdminBase.metadata.create_all(bind=get_admin_engine())
+    create_missing_indexes(AdminBase, get_admin_engine())
+    logger.info("Database schema created")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    create_all()
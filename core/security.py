@@ -2,9 +2,16 @@
 Security utilities for API authentication.
 Provides Bearer token authentication compatible with Swagger UI and Postman.
 """
+import hashlib
+import hmac
 from fastapi import HTTPException, status, Depends, Query, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from typing import Optional, Annotated
+from core.cache import Cache
+from core.config import settings
+
+# user_id -> SHA-256 of the user's token; tokens themselves are never cached
+auth_cache = Cache("auth", settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_SIZE)
 
 # Create HTTPBearer security scheme
 # This will be automatically recognized by FastAPI's OpenAPI generation
@@ -123,7 +130,7 @@ async def get_user_id(
     )
 
 
-def verify_user(user_id: int, token: str, db) -> bool:
+async def verify_user(user_id: int, token: str, db) -> bool:
     """
     Verify if the user exists and the token is valid.
 
@@ -136,14 +143,28 @@ def verify_user(user_id: int, token: str, db) -> bool:
         bool: True if the user exists and the token is valid, False otherwise.
     """
     from database.db_users import User
-    
-    user = db.query(User).filter(User.user_id == user_id).first()
 
-    if not user:
+    def load_token_digest() -> Optional[str]:
+        stored_token = db.query(User.token).filter(User.user_id == user_id).scalar()
+        return _token_digest(stored_token) if stored_token is not None else None
+
+    # Cached briefly so most requests skip the AdminUsers lookup
+    token_digest = await auth_cache.get_or_load_async(user_id, load_token_digest)
+
+    if token_digest is None:
         return False
 
-    if user.token != token:
+    if not hmac.compare_digest(token_digest, _token_digest(token)):
         return False
 
     return True
 
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached token after the user is changed or deleted."""
+    auth_cache.delete(user_id)
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
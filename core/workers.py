@@ -0,0 +1,135 @@
+"""
+Worker Process Configuration
+CPU quota detection, per-worker resource sizing and leader election.
+
+When the application runs under a process manager every worker is a separate
+interpreter with its own engines, caches and background jobs. Shared budgets
+(database connections, cache entries) are divided by the worker count, and
+singleton jobs only run in the worker holding the leader lock.
+"""
+import math
+import os
+from typing import Optional
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+_leader_lock_handle = None
+
+
+def cpu_quota() -> Optional[float]:
+    """
+    Return the number of CPUs this container may use, from the cgroup quota.
+
+    Returns:
+        float: CPUs allowed by the cgroup (v2 or v1), or None if unlimited/unknown.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+            if quota != "max":
+                return int(quota) / int(period)
+            return None
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def available_cpus() -> int:
+    """Return the CPUs usable by this process, honouring cgroup quota and affinity."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    """
+    Return the number of worker processes to run.
+
+    WEB_CONCURRENCY wins when set (the serving entrypoint exports it to the
+    workers), otherwise one worker per available CPU, capped at MAX_WORKERS.
+    """
+    if settings.WEB_CONCURRENCY:
+        return max(1, settings.WEB_CONCURRENCY)
+    return max(1, min(available_cpus(), settings.MAX_WORKERS))
+
+
+def per_worker(total: int, minimum: int = 1) -> int:
+    """Split a per-task budget evenly across worker processes."""
+    return max(minimum, total // worker_count())
+
+
+def try_acquire_leadership() -> bool:
+    """
+    Try to become the leader worker by taking an exclusive lock on LEADER_LOCK_FILE.
+
+    The lock is held for the lifetime of the process and released by the OS
+    when it exits, so another worker can take over on its next attempt.
+
+    Returns:
+        bool: True if this process is (or just became) the leader.
+    """
+    global _leader_lock_handle
+
+    if _leader_lock_handle is not None:
+        return True
+
+    # Without flock (non-POSIX dev machines) there is only ever one worker
+    if fcntl is None:
+        _leader_lock_handle = True
+        return True
+
+    handle = open(settings.LEADER_LOCK_FILE, "a+")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _leader_lock_handle = handle
+    return True
+
+
+def is_leader() -> bool:
+    """Return True if this process currently holds the leader lock."""
+    return _leader_lock_handle is not None
+
+
+def release_leadership() -> None:
+    """Release the leader lock so another worker can take over immediately."""
+    global _leader_lock_handle
+
+    handle = _leader_lock_handle
+    _leader_lock_handle = None
+    if handle is None or handle is True:
+        return
+
+    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    handle.close()
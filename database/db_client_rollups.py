@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Date, Integer, String
+from core.database import AdminBase
+
+class ClientRollup(AdminBase):
+    __tablename__ = "ClientRollups"
+
+    # Primary key order serves range queries: one metric and period, a span of buckets
+    metric = Column(String(20), primary_key=True)  # "onboarded", "subscribed", "unsubscribed", "package_changed"
+    period = Column(String(10), primary_key=True)  # "day", "week" or "month"
+    bucket = Column(Date, primary_key=True)  # First day of the period
+    package_id = Column(Integer, primary_key=True)  # 0 for no package
+    onboarded_by = Column(String(75), primary_key=True)  # "" when unknown
+    count = Column(Integer, nullable=False, default=0)
+
+class ClientRollupAccount(AdminBase):
+    __tablename__ = "ClientRollupAccounts"
+
+    # What each account currently contributes to the "onboarded" rollups
+    account_id = Column(Integer, primary_key=True)
+    onboarded_day = Column(Date, nullable=True)  # NULL while the account has no onboarded_date
+    package_id = Column(Integer, nullable=False, default=0)
+    onboarded_by = Column(String(75), nullable=False, default="")
+
+class RollupWatermark(AdminBase):
+    __tablename__ = "RollupWatermarks"
+
+    name = Column(String(50), primary_key=True)  # Source stream, e.g. "onboarding", "track_updates"
+    position = Column(Integer, nullable=False, default=0)  # Last source id folded into the rollups
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from core.database import AdminBase
+
+class ClientSummary(AdminBase):
+    __tablename__ = "ClientSummaries"
+
+    # ClientListBase fields, copied from BusinessDetails, Customers and BusinessSubscription
+    account_id = Column(Integer, primary_key=True)
+    business_name = Column(String(100), index=True)
+    phone = Column(BigInteger, index=True)
+    email = Column(String(100), index=True)
+    subscribed = Column(Integer, default=0)
+    package = Column(Integer, default=0)
+    onboarding = Column(DateTime)
+    account_status = Column(Integer)
+
+    # Derived counters
+    open_tickets = Column(Integer, nullable=False, default=0)  # Tickets with status open or under review
+    device_limit = Column(Integer, nullable=False, default=0)
+    module_count = Column(Integer, nullable=False, default=0)  # Number of active modules
+
+    refreshed_at = Column(DateTime, nullable=False)
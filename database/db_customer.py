@@ -1,4 +1,5 @@
 from sqlalchemy import Column,  Integer, String, BigInteger, Text, DateTime, JSON, Boolean, Float
+from sqlalchemy.orm import deferred
 from core.database import AppBase 
 
 class Client(AppBase):
@@ -7,7 +8,7 @@ class Client(AppBase):
 
     account_id = Column(Integer, primary_key= True)
     business_name = Column(String(100))
-    business_logo = Column(Text)
+    business_logo = deferred(Column(Text))  # Encoded image; only loaded when accessed
     manager = Column(String(50))
     phone = Column(BigInteger)
     street1 = Column(String(100))
@@ -28,7 +29,7 @@ class ClientMain(AppBase):
     account_id = Column(Integer, primary_key=True)
     account_status = Column(Integer, default= 1)
     business_email = Column(String(100), unique= True)
-    password = Column(Text)
+    password = deferred(Column(Text))
     account_token = Column(String(255))
     web_token = Column(String(255))
 
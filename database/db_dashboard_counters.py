@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from core.database import AdminBase
+
+class DashboardCounter(AdminBase):
+    __tablename__ = "DashboardCounters"
+
+    metric = Column(String(50), primary_key=True)  # e.g. "clients_by_package", "tickets_by_status"
+    bucket = Column(Integer, primary_key=True)  # Grouped value: package id, subscribed flag, status, ...
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, DATETIME
+from core.database import AdminBase
+
+class TicketClaim(AdminBase):
+    __tablename__ = 'client_ticket_claims'
+
+    ticket_id = Column(Integer, primary_key=True)  # One claim per ticket; the insert is the atomic claim
+    user_id = Column(Integer, nullable=False)
+    claimed_at = Column(DATETIME, nullable=False)
+    expires_at = Column(DATETIME, nullable=False, index=True)  # Unreleased claims return the ticket to the queue
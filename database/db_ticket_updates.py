@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, DATETIME, Text
+from sqlalchemy import Column, Index, Integer, String, DATETIME, Text
 from core.database import AdminBase
 
-class TicketUpdate(AdminBase):
-    __tablename__ = 'client_ticket_updates'
+class TicketUpdateColumns(AdminBase):
+    __abstract__ = True  # Shared by the live and archive tables
 
     update_id = Column(Integer, primary_key=True)
     ticket_id = Column(Integer, nullable=False)
@@ -12,3 +12,19 @@ class TicketUpdate(AdminBase):
     created_at = Column(DATETIME, nullable=False)
     contact_mode = Column(Integer, nullable=False) # 1 for email, 2 for phone, 3 for chat
     notes = Column(Text, nullable= True)  
+
+class TicketUpdate(TicketUpdateColumns):
+    __tablename__ = 'client_ticket_updates'
+    __table_args__ = (
+        # Ticket timelines in order (get_ticket_detail)
+        Index('ix_client_ticket_updates_ticket_created', 'ticket_id', 'created_at'),
+        # search_tickets on MySQL; other databases use the in-process index (utils/ticket_search.py)
+        Index('ft_client_ticket_updates_description', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+class ArchivedTicketUpdate(TicketUpdateColumns):
+    __tablename__ = 'client_ticket_updates_archive'  # Updates of archived tickets
+    __table_args__ = (
+        Index('ix_client_ticket_updates_archive_ticket_created', 'ticket_id', 'created_at'),
+        Index('ft_client_ticket_updates_archive_description', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
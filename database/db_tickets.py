@@ -1,8 +1,12 @@
-from sqlalchemy import  Column, Integer, String, DATETIME, Text
+from sqlalchemy import  Column, Index, Integer, String, DATETIME, Text
 from core.database import AdminBase
 
-class Ticket(AdminBase):
-    __tablename__ = 'client_tickets'
+# Statuses counted as open: 1 (open) and 2 (under review)
+OPEN_TICKET_STATUSES = (1, 2)
+CLOSED_TICKET_STATUS = 3
+
+class TicketColumns(AdminBase):
+    __abstract__ = True  # Shared by the live and archive tables
 
     ticket_id = Column(Integer, primary_key=True)
     account_id = Column(Integer, nullable=False)
@@ -18,3 +22,26 @@ class Ticket(AdminBase):
     clinet_email = Column(String(100), nullable=False)
     attachment = Column(String(50), nullable=True) 
     notes = Column(Text, nullable=True)  
+
+class Ticket(TicketColumns):
+    __tablename__ = 'client_tickets'
+    __table_args__ = (
+        # Queue order (priority, then age) within the open statuses
+        Index('ix_client_tickets_status_priority_created', 'status', 'priority', 'created_at'),
+        # Per-assignee and per-account queues
+        Index('ix_client_tickets_user_status', 'user_id', 'status'),
+        Index('ix_client_tickets_account_status_created', 'account_id', 'status', 'created_at'),
+        # Reporting windows (utils/ticket_analytics.py)
+        Index('ix_client_tickets_created', 'created_at'),
+        # search_tickets on MySQL; other databases use the in-process index (utils/ticket_search.py)
+        Index('ft_client_tickets_subject_description', 'subject', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+class ArchivedTicket(TicketColumns):
+    __tablename__ = 'client_tickets_archive'  # Closed tickets moved out by the archive job
+    __table_args__ = (
+        Index('ix_client_tickets_archive_account_created', 'account_id', 'created_at'),
+        Index('ft_client_tickets_archive_subject_description', 'subject', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    archived_at = Column(DATETIME, nullable=False)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String
+from core.database import AdminBase
+
+class ResourceVersion(AdminBase):
+    __tablename__ = "ResourceVersions"
+
+    name = Column(String(50), primary_key=True)  # e.g. "clients", "packages", "users", "tickets"
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every write to the resource
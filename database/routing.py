@@ -0,0 +1,192 @@
+"""
+Read Replica Routing
+Sends read-only pos queries to a replica when it is healthy and caught up,
+and back to the primary on lag, failure, or right after the caller wrote.
+
+Read-your-writes deadlines are shared through Redis (the shared cache's
+connection, or CACHE_REDIS_URL when several workers serve), so a read that
+lands on another worker or task than the write still goes to the primary.
+"""
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+from core.cache import connect_redis, get_backend
+from core.config import settings
+from core.database import get_pos_engine, get_pos_replica_engine
+from core.logging import get_logger
+from core.workers import worker_count
+
+logger = get_logger(__name__)
+
+
+class ReplicaRouter:
+    """Tracks replica health and per-user read-your-writes stickiness."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sticky_until: Dict[int, float] = {}
+        self._healthy = False
+        self._checked_at = 0.0
+        self._redis = None
+        self._prefix = ""
+        self.stats = {"replica_reads": 0, "primary_reads": 0, "sticky_reads": 0, "fallbacks": 0}
+
+    def configure(self, client, prefix: str) -> None:
+        """Share stickiness through a redis-py compatible client, or keep it per process with None."""
+        self._redis = client
+        self._prefix = prefix
+
+    def _sticky_key(self, user_id: int) -> str:
+        return f"{self._prefix}:replica_sticky:{user_id}"
+
+    def mark_write(self, user_id: int) -> None:
+        """Pin a user's reads to the primary for READ_YOUR_WRITES_SECONDS, in every worker sharing Redis."""
+        with self._lock:
+            self._sticky_until[user_id] = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+
+        client = self._redis
+        if client is not None and settings.READ_YOUR_WRITES_SECONDS > 0:
+            try:
+                client.set(self._sticky_key(user_id), "1", px=settings.READ_YOUR_WRITES_SECONDS * 1000)
+            except Exception as e:
+                logger.warning(f"Could not share read-your-writes stickiness: {str(e)}")
+
+    def is_sticky(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._sticky_until.get(user_id)
+            if until is not None:
+                if until > time.monotonic():
+                    return True
+                del self._sticky_until[user_id]
+
+        client = self._redis
+        if client is None:
+            return False
+        try:
+            return bool(client.exists(self._sticky_key(user_id)))
+        except Exception as e:
+            # Without the shared deadline a recent write can't be ruled out
+            logger.warning(f"Could not check read-your-writes stickiness, reading from the primary: {str(e)}")
+            return True
+
+    def mark_unhealthy(self) -> None:
+        """Stop using the replica until the next health check passes."""
+        with self._lock:
+            self._healthy = False
+            self._checked_at = time.monotonic()
+            self.stats["fallbacks"] += 1
+
+    def _replica_lag(self, connection) -> Optional[float]:
+        """Return replication lag in seconds, 0 for engines without replication, None if stopped."""
+        if connection.dialect.name != "mysql":
+            return 0
+
+        for statement, column in (("SHOW REPLICA STATUS", "Seconds_Behind_Source"), ("SHOW SLAVE STATUS", "Seconds_Behind_Master")):
+            try:
+                row = connection.execute(text(statement)).mappings().first()
+            except DBAPIError:
+                continue
+            if row is None:
+                return 0  # Not a replica (e.g. a plain copy used in staging)
+            return row.get(column)
+
+        # Lag is unknown without the REPLICATION CLIENT privilege; rely on stickiness
+        return 0
+
+    def replica_available(self, replica: Engine) -> bool:
+        """Return cached replica health, re-checking every REPLICA_HEALTH_CHECK_SECONDS."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < settings.REPLICA_HEALTH_CHECK_SECONDS:
+                return self._healthy
+
+        healthy = False
+        try:
+            with replica.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                lag = self._replica_lag(connection)
+            healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                logger.warning(f"Read replica lagging ({lag}s), routing reads to primary")
+        except DBAPIError as e:
+            logger.warning(f"Read replica unavailable, routing reads to primary: {str(e)}")
+
+        with self._lock:
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+        return healthy
+
+    def choose_engine(self, user_id: Optional[int] = None) -> Engine:
+        """Pick the engine for a read-only session."""
+        replica = get_pos_replica_engine()
+
+        if replica is None:
+            self.stats["primary_reads"] += 1
+            return get_pos_engine()
+
+        if self.is_sticky(user_id):
+            self.stats["sticky_reads"] += 1
+            return get_pos_engine()
+
+        if not self.replica_available(replica):
+            self.stats["primary_reads"] += 1
+            return get_pos_engine()
+
+        self.stats["replica_reads"] += 1
+        return replica
+
+
+replica_router = ReplicaRouter()
+
+
+def init_routing() -> None:
+    """
+    Share read-your-writes stickiness between workers: through the shared cache's Redis
+    when CACHE_BACKEND=redis, otherwise CACHE_REDIS_URL whenever more than one worker serves.
+    """
+    if not settings.APP_REPLICA_DATABASE_URL:
+        return
+
+    backend = get_backend()
+    if backend is not None:
+        replica_router.configure(backend.client, backend.prefix)
+    elif worker_count() > 1:
+        client = connect_redis("read-your-writes stickiness")
+        if client is None:
+            logger.warning(
+                f"Running {worker_count()} workers without Redis: a read served by another worker than "
+                f"the write may use a lagging replica. Make CACHE_REDIS_URL reachable or run a single worker"
+            )
+            return
+        replica_router.configure(client, settings.CACHE_KEY_PREFIX)
+
+
+def close_routing() -> None:
+    replica_router.configure(None, "")
+
+
+class ReadSession(Session):
+    """
+    Session for read-only handlers.
+
+    If a statement fails on the replica with a connection-level error, the
+    replica is marked unhealthy and the statement is retried once on the primary.
+    """
+
+    def execute(self, *args, **kwargs):
+        try:
+            return super().execute(*args, **kwargs)
+        except OperationalError:
+            primary = get_pos_engine()
+            if self.bind is primary:
+                raise
+            replica_router.mark_unhealthy()
+            self.rollback()
+            self.bind = primary
+            return super().execute(*args, **kwargs)
@@ -2,16 +2,45 @@
 Database Session Management
 SQLAlchemy session factories and dependency injection.
 """
+from typing import Annotated
+from fastapi import Depends
 from sqlalchemy.orm import sessionmaker
-from core.database import pos_engine, admin_engine
+from core.database import get_pos_engine, get_admin_engine
+from core.security import get_user_id
+from database.routing import ReadSession, replica_router
 
-AppSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=pos_engine)
+AppSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-AdminSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=admin_engine)
+AppReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
+
+AdminSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+def new_app_session():
+    """Open an application database session outside of a request (jobs, scripts)."""
+    return AppSessionLocal(bind=get_pos_engine())
+
+def new_app_read_session(engine):
+    """Open a read session on a given pos engine (primary or replica) outside of a request."""
+    return AppReadSessionLocal(bind=engine)
+
+def new_admin_session():
+    """Open an admin database session outside of a request (jobs, scripts)."""
+    return AdminSessionLocal(bind=get_admin_engine())
 
 def get_app_db():
     """Dependency for application database session."""
-    db = AppSessionLocal()
+    db = new_app_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_app_read_db(user_id: Annotated[int, Depends(get_user_id)]):
+    """
+    Dependency for read-only application database sessions.
+    Uses the pos replica when configured and healthy, unless the user wrote recently.
+    """
+    db = AppReadSessionLocal(bind=replica_router.choose_engine(user_id))
     try:
         yield db
     finally:
@@ -19,8 +48,8 @@ def get_app_db():
 
 def get_admin_db():
     """Dependency for admin database session."""
-    db = AdminSessionLocal()
+    db = new_admin_session()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
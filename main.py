@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -5,13 +6,18 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.exc import SQLAlchemyError
 
 # Core imports
-from core import settings, pos_engine, admin_engine, AppBase, AdminBase, setup_logging
+from core import settings, init_engines, dispose_engines, setup_logging
+from core.jobs import register_job, start_jobs, stop_jobs
+from core.cache import init_cache, close_cache
+from utils.events import init_events, close_events
+from database.routing import init_routing, close_routing
 from middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
     database_exception_handler,
     general_exception_handler
 )
+from middleware.allocation_sampler import AllocationSamplerMiddleware
 
 # API route imports
 from app.user_login import router as user_login_router
@@ -19,16 +25,60 @@ from app.user_crud import router as user_crud_router
 from app.clients import router as client_router
 from app.tickets import router as tickets_router
 from app.packages import router as packages_router
+from app.diagnostics import router as diagnostics_router
+from app.stats import router as stats_router
 
 # Setup logging
 setup_logging()
 
-# Initialize database tables
-AppBase.metadata.create_all(bind=pos_engine)
-AdminBase.metadata.create_all(bind=admin_engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines are built here rather than at import; neither step connects to the database
+    init_engines()
+
+    # Shared cache backend (Redis) when CACHE_BACKEND=redis; per-worker caches otherwise
+    init_cache()
+
+    # Read-your-writes stickiness for the pos replica, shared between workers through Redis
+    init_routing()
+
+    # Ticket event broker for SSE streams, bridged across workers through the shared cache's Redis
+    init_events()
+
+    # Table creation is an explicit command (`python -m core.schema`); opt-in here for local runs
+    if settings.CREATE_SCHEMA_ON_STARTUP:
+        from core.schema import create_all
+        create_all()
+
+    # Singleton maintenance jobs run only in the leader worker
+    from utils.maintenance import purge_track_updates
+    from utils.client_summary import reconcile_client_summaries
+    from utils.ticket_archive import archive_closed_tickets
+    from utils.dashboard_stats import reconcile_dashboard_stats
+    from utils.client_rollups import append_client_rollups
+    register_job("track_update_retention", settings.RETENTION_JOB_INTERVAL_SECONDS, purge_track_updates)
+    register_job("client_summary_reconcile", settings.CLIENT_SUMMARY_RECONCILE_SECONDS, reconcile_client_summaries)
+    register_job("ticket_archive", settings.TICKET_ARCHIVE_INTERVAL_SECONDS, archive_closed_tickets)
+    register_job("dashboard_stats_reconcile", settings.DASHBOARD_STATS_RECONCILE_SECONDS, reconcile_dashboard_stats)
+    register_job("client_rollups", settings.CLIENT_ROLLUP_INTERVAL_SECONDS, append_client_rollups)
+
+    # Every worker keeps its own next_ticket heap, built at startup and refreshed periodically
+    from utils.ticket_queue import rebuild_ticket_queue
+    register_job("ticket_queue_rebuild", settings.TICKET_QUEUE_REBUILD_SECONDS, rebuild_ticket_queue, leader_only=False)
+    start_jobs()
+
+    yield
+
+    await stop_jobs()
+    close_events()
+    close_routing()
+    close_cache()
+    dispose_engines()
 
 # Create FastAPI app with enhanced OpenAPI documentation
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="""
@@ -74,6 +124,14 @@ app = FastAPI(
             "name": "Package",
             "description": "Subscription package management"
         },
+        {
+            "name": "Diagnostics",
+            "description": "Memory tracing and allocation diagnostics"
+        },
+        {
+            "name": "Stats",
+            "description": "Admin home page counters"
+        },
     ]
 )
 
@@ -182,6 +240,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request allocation sampling (inactive until tracing is started)
+app.add_middleware(AllocationSamplerMiddleware)
+
 # Register exception handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -195,3 +256,5 @@ app.include_router(user_crud_router)
 app.include_router(client_router)
 app.include_router(tickets_router)
 app.include_router(packages_router)
+app.include_router(diagnostics_router)
+app.include_router(stats_router)
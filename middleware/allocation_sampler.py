@@ -0,0 +1,49 @@
+"""
+Allocation Sampling Middleware
+Records peak memory allocated while serving a sampled fraction of requests.
+Sampling is only active while tracemalloc is running (see core/diagnostics.py).
+
+The traced peak is process-wide: requests served concurrently by the same worker
+add to it. Every request is counted in flight while tracing so samples can be
+flagged as `overlapped`; run a single worker with low traffic for exact peaks.
+"""
+import random
+import tracemalloc
+from core import diagnostics
+
+
+class AllocationSamplerMiddleware:
+    """ASGI middleware that measures per-request peak allocation for sampled requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not diagnostics.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        diagnostics.request_started()
+        try:
+            await self._serve(scope, receive, send)
+        finally:
+            diagnostics.request_finished()
+
+    async def _serve(self, scope, receive, send):
+        if not diagnostics.should_sample(random.random()) or not diagnostics.begin_request_sample():
+            await self.app(scope, receive, send)
+            return
+
+        started_bytes, _ = tracemalloc.get_traced_memory()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            diagnostics.end_request_sample(scope["method"], scope["path"], status_code, started_bytes)
@@ -0,0 +1,11 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class ClientBatchRequest(BaseModel):
+    account_ids: List[int]
+
+    def to_dict(self) -> Dict:
+        return {
+            "account_ids": self.account_ids
+        }
@@ -0,0 +1,15 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel
+
+
+class TicketImportRequest(BaseModel):
+    # Records are validated one by one against TicketSchema / TicketUpdateSchema,
+    # so a bad record is reported instead of rejecting the whole batch
+    tickets: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "tickets": self.tickets,
+            "updates": self.updates
+        }
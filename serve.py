@@ -0,0 +1,36 @@
+"""
+Production Entrypoint
+Runs the API under uvicorn's process manager with one worker per available CPU.
+
+The worker count is exported as WEB_CONCURRENCY before the workers start so
+each worker sizes its connection pools and caches to its share of the task
+budget (see core/workers.py).
+
+Usage:
+    python serve.py
+"""
+import os
+import uvicorn
+from core.config import settings
+from core.workers import worker_count
+
+
+def main():
+    workers = worker_count()
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="auto",  # uvloop when installed (uvicorn[standard])
+        http="auto",  # httptools when installed
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Test configuration: point both databases and the pos replica at SQLite files
+in a temporary directory before any application module reads the settings.
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="pos-admin-tests-")
+PRIMARY = os.path.join(DATA_DIR, "pos.db")
+REPLICA = os.path.join(DATA_DIR, "pos_replica.db")
+HEADERS = {"Authorization": "Bearer token-1", "X-User-Id": "1"}
+
+os.environ.update(
+    APP_DATABASE_URL=f"sqlite:///{PRIMARY}",
+    APP_REPLICA_DATABASE_URL=f"sqlite:///{REPLICA}",
+    ADMIN_DATABASE_URL=f"sqlite:///{DATA_DIR}/admin.db",
+    CREATE_SCHEMA_ON_STARTUP="false",
+    BACKGROUND_JOBS_ENABLED="false",
+    LEADER_LOCK_FILE=f"{DATA_DIR}/leader.lock",
+    LOG_LEVEL="WARNING",
+)
+
+
+def seed(n_clients: int) -> None:
+    """One admin user (id 1, token `token-1`), one package and `n_clients` subscribed accounts."""
+    from database.db_customer import Client, ClientMain, ClientSettings, ClientSubscription
+    from database.db_packages import Package
+    from database.db_users import User
+    from database.session import new_admin_session, new_app_session
+
+    admin = new_admin_session()
+    admin.add(User(user_id=1, user_name="admin", email="admin@example.com", password="x",
+                   created_at=datetime.now(), created_by=1, token="token-1", permissions=[]))
+    admin.add(Package(id=1, name="Basic", active_modules=[1, 2], device_limit=3, status=1, price=10,
+                      created_at=datetime.now(), created_by=1))
+    admin.commit()
+    admin.close()
+
+    app = new_app_session()
+    for account_id in range(1, n_clients + 1):
+        app.add(Client(account_id=account_id, business_name=f"Business {account_id}", business_logo="",
+                       manager="m", phone=123, street1="s", address="a", state="st", country_code=1,
+                       postcode="p", industry_type=1, onboarded_by="admin",
+                       onboarded_date=datetime(2025, 1, account_id)))
+        app.add(ClientMain(account_id=account_id, account_status=1, business_email=f"b{account_id}@example.com",
+                           password="p"))
+        app.add(ClientSettings(account_id=account_id))
+        app.add(ClientSubscription(account_id=account_id, subscribed=1, active_modules=[1], device_limit=2,
+                                   package_id=1, additional_modules=[]))
+    app.commit()
+    app.close()
+
+
+@pytest.fixture(autouse=True)
+def databases():
+    """Fresh, seeded primary and admin databases with an up-to-date replica copy and empty caches."""
+    from core import cache
+    from core.database import dispose_engines
+    from core.schema import create_all
+    from database.routing import replica_router
+
+    dispose_engines()
+    for name in os.listdir(DATA_DIR):
+        if name.endswith(".db"):
+            os.remove(os.path.join(DATA_DIR, name))
+
+    create_all()
+    seed(5)
+    dispose_engines()
+    shutil.copyfile(PRIMARY, REPLICA)
+
+    for shared in cache._caches.values():
+        shared.clear()
+
+    # Start every test with no stickiness and a replica health check due
+    replica_router._sticky_until.clear()
+    replica_router._healthy = False
+    replica_router._checked_at = 0.0
+    for key in replica_router.stats:
+        replica_router.stats[key] = 0
+
+    yield
+    dispose_engines()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """TestClient on the app with device update notifications stubbed out."""
+    from fastapi.testclient import TestClient
+    from app import clients
+    from main import app
+
+    async def no_device_update(*args, **kwargs):
+        return {}
+
+    monkeypatch.setattr(clients, "send_device1_update", no_device_update)
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,55 @@
+"""
+Client rollups: TrackUpdates whose ids commit out of order are each counted once.
+"""
+from datetime import datetime, timedelta, timezone
+
+from database.db_client_rollups import ClientRollup, RollupWatermark
+from database.db_updates import TrackUpdate
+from database.session import new_admin_session
+from utils import client_rollups
+
+
+def _add_unsubscribe(update_id, account_id, updated_at):
+    adminDb = new_admin_session()
+    adminDb.add(TrackUpdate(
+        id=update_id,
+        account_id=account_id,
+        updated_at=updated_at,
+        updated_by="1",
+        update_data={"subscribed": 0, "package_id": 1, "previous_subscribed": 1, "previous_package_id": 1}
+    ))
+    adminDb.commit()
+    adminDb.close()
+
+
+def _state():
+    adminDb = new_admin_session()
+    try:
+        unsubscribed = adminDb.query(ClientRollup.count).filter(
+            ClientRollup.metric == client_rollups.UNSUBSCRIBED, ClientRollup.period == "day"
+        ).all()
+        position = adminDb.query(RollupWatermark.position).filter(
+            RollupWatermark.name == client_rollups.TRACK_UPDATES_STREAM
+        ).scalar()
+        return sum(count for count, in unsubscribed), position
+    finally:
+        adminDb.close()
+
+
+def test_lower_id_committed_late_is_counted(monkeypatch):
+    now = datetime.now(timezone.utc)
+    _add_unsubscribe(1, 1, now - timedelta(minutes=10))
+
+    # Id 3 commits while id 2 is still in flight
+    _add_unsubscribe(3, 3, now)
+    client_rollups.append_client_rollups()
+    assert _state() == (1, 1)
+
+    _add_unsubscribe(2, 2, now)
+    client_rollups.append_client_rollups()
+    assert _state() == (1, 1)
+
+    # Once both have settled they are folded together
+    monkeypatch.setattr(client_rollups.settings, "CLIENT_ROLLUP_SETTLE_SECONDS", 0)
+    client_rollups.append_client_rollups()
+    assert _state() == (3, 3)
@@ -0,0 +1,43 @@
+"""
+ClientSummaries readiness: writes before the first full reconcile must not
+make list and search endpoints read a partially built table.
+"""
+from conftest import HEADERS
+from database.session import new_admin_session
+from utils import client_summary, etags
+
+
+def _client_ids(client):
+    response = client.get("/admin-api/customers/get_all_clients", headers=HEADERS)
+    assert response.status_code == 200, response.text
+    return sorted(row["account_id"] for row in response.json()["clients"])
+
+
+def test_write_before_first_reconcile_keeps_full_list(client):
+    assert _client_ids(client) == [1, 2, 3, 4, 5]
+
+    response = client.post("/admin-api/customers/update_client_subscription", headers=HEADERS,
+                           json={"account_id": 4, "package_id": 1, "subscribed": 0})
+    assert response.status_code == 200, response.text
+
+    adminDb = new_admin_session()
+    try:
+        assert not client_summary.is_ready(adminDb)
+        assert etags.get_version(adminDb, etags.CLIENT_SUMMARIES) == 0
+    finally:
+        adminDb.close()
+
+    assert _client_ids(client) == [1, 2, 3, 4, 5]
+    assert client.get("/admin-api/customers/search_clients", headers=HEADERS, params={"q": "Business"}).status_code == 503
+
+
+def test_reconcile_builds_summary_then_writes_refresh_it(client):
+    assert client_summary.reconcile_client_summaries() == 5
+
+    response = client.post("/admin-api/customers/update_client_subscription", headers=HEADERS,
+                           json={"account_id": 4, "package_id": 1, "subscribed": 0})
+    assert response.status_code == 200, response.text
+
+    assert _client_ids(client) == [1, 2, 3, 4, 5]
+    response = client.get("/admin-api/customers/search_clients", headers=HEADERS, params={"q": "Business"})
+    assert response.status_code == 200, response.text
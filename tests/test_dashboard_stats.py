@@ -0,0 +1,49 @@
+"""
+Dashboard counters: writes before the first rebuild must not leave delta-only
+rows behind or mark the counters as built.
+"""
+from conftest import HEADERS
+from database.db_dashboard_counters import DashboardCounter
+from database.session import new_admin_session
+from utils import dashboard_stats
+
+
+def _dashboard(client):
+    response = client.get("/admin-api/stats/dashboard", headers=HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()["clients"]
+
+
+def _unsubscribe(client, account_id):
+    response = client.post("/admin-api/customers/update_client_subscription", headers=HEADERS,
+                           json={"account_id": account_id, "package_id": 0, "subscribed": 0})
+    assert response.status_code == 200, response.text
+
+
+def test_write_before_first_rebuild_is_counted_by_rebuild(client):
+    _unsubscribe(client, 4)
+
+    adminDb = new_admin_session()
+    try:
+        assert not dashboard_stats.is_ready(adminDb)
+        assert adminDb.query(DashboardCounter).count() == 0
+    finally:
+        adminDb.close()
+
+    clients = _dashboard(client)
+    assert clients["total"] == 5
+    assert clients["subscribed"] == 4
+    assert clients["unsubscribed"] == 1
+    assert clients["by_package"] == {"0": 1, "1": 4}
+
+
+def test_writes_after_rebuild_adjust_counters(client):
+    assert _dashboard(client)["subscribed"] == 5
+
+    _unsubscribe(client, 2)
+
+    clients = _dashboard(client)
+    assert clients["total"] == 5
+    assert clients["unsubscribed"] == 1
+    assert clients["by_package"] == {"0": 1, "1": 4}
+    assert dashboard_stats.reconcile_dashboard_stats() == 0
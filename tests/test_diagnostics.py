@@ -0,0 +1,53 @@
+"""
+Memory diagnostics endpoints and request allocation samples.
+"""
+import pytest
+
+from conftest import HEADERS
+from core import diagnostics
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    """Trace allocations and sample every request."""
+    monkeypatch.setattr(diagnostics, "_sample_rate", 1.0)
+    diagnostics.start_tracing()
+    yield
+    diagnostics.stop_tracing()
+
+
+def test_top_allocations_of_current_heap(client, tracing):
+    response = client.get("/admin-api/diagnostics/top_allocations", headers=HEADERS, params={"limit": 5})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["snapshot"] == "current"
+    assert 0 < len(body["allocations"]) <= 5
+    assert diagnostics.status()["snapshots"] == []
+
+
+def test_compare_snapshots(client, tracing):
+    for name in ("before", "after"):
+        response = client.post("/admin-api/diagnostics/take_snapshot", headers=HEADERS, params={"name": name})
+        assert response.status_code == 200, response.text
+
+    response = client.get("/admin-api/diagnostics/compare_snapshots", headers=HEADERS,
+                          params={"first": "before", "second": "after", "limit": 3})
+    assert response.status_code == 200, response.text
+    assert len(response.json()["differences"]) <= 3
+
+
+def test_samples_flag_concurrent_requests(client, tracing):
+    response = client.get("/admin-api/diagnostics/memory_status", headers=HEADERS)
+    assert response.status_code == 200, response.text
+
+    sample = diagnostics.request_samples(1)[0]
+    assert sample["path"] == "/admin-api/diagnostics/memory_status"
+    assert sample["overlapped"] is False
+
+    # Another request already in flight when the sample starts
+    diagnostics.request_started()
+    try:
+        client.get("/admin-api/diagnostics/memory_status", headers=HEADERS)
+    finally:
+        diagnostics.request_finished()
+    assert diagnostics.request_samples(1)[0]["overlapped"] is True
@@ -0,0 +1,143 @@
+"""
+Read replica routing against two local SQLite files: the pos database as the
+primary and a copy of it as the replica.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from conftest import DATA_DIR, HEADERS, REPLICA
+from core.config import settings
+from core.database import dispose_engines, get_pos_engine, get_pos_replica_engine
+from database.db_customer import Client
+from database.routing import ReadSession, ReplicaRouter, replica_router
+from database.session import get_app_read_db
+
+def _business_name(db) -> str:
+    return db.query(Client.business_name).filter(Client.account_id == 1).scalar()
+
+
+@pytest.fixture(autouse=True)
+def marked_replica(databases):
+    """Give the replica copy a different name for account 1 so reads show which database answered."""
+    with sqlite3.connect(REPLICA) as connection:
+        connection.execute("UPDATE BusinessDetails SET business_name = 'Replica' WHERE account_id = 1")
+
+
+def _read_session(user_id):
+    dependency = get_app_read_db(user_id)
+    return dependency, next(dependency)
+
+
+def test_reads_use_healthy_replica():
+    dependency, db = _read_session(1)
+    try:
+        assert db.bind is get_pos_replica_engine()
+        assert _business_name(db) == "Replica"
+    finally:
+        dependency.close()
+    assert replica_router.stats["replica_reads"] == 1
+
+
+def test_reads_use_primary_without_replica(monkeypatch):
+    monkeypatch.setattr(settings, "APP_REPLICA_DATABASE_URL", None)
+    dependency, db = _read_session(1)
+    try:
+        assert db.bind is get_pos_engine()
+        assert _business_name(db) == "Business 1"
+    finally:
+        dependency.close()
+
+
+def test_unreachable_replica_routes_to_primary(monkeypatch):
+    monkeypatch.setattr(settings, "APP_REPLICA_DATABASE_URL", f"sqlite:///{DATA_DIR}/missing/pos_replica.db")
+    dependency, db = _read_session(1)
+    try:
+        assert db.bind is get_pos_engine()
+        assert _business_name(db) == "Business 1"
+    finally:
+        dependency.close()
+    assert replica_router.replica_available(get_pos_replica_engine()) is False
+
+
+def test_failed_replica_statement_retries_on_primary():
+    # Passes the health check, then fails at query time
+    assert replica_router.replica_available(get_pos_replica_engine()) is True
+    broken = create_engine(f"sqlite:///{DATA_DIR}/missing/pos_replica.db")
+
+    db = ReadSession(bind=broken)
+    try:
+        assert _business_name(db) == "Business 1"
+        assert db.bind is get_pos_engine()
+    finally:
+        db.close()
+        broken.dispose()
+
+    assert replica_router.stats["fallbacks"] == 1
+    # Later reads stay on the primary until the next health check
+    dependency, db = _read_session(2)
+    try:
+        assert db.bind is get_pos_engine()
+    finally:
+        dependency.close()
+
+
+def test_subscription_update_pins_reads_to_primary(client):
+    response = client.post("/admin-api/customers/update_client_subscription", headers=HEADERS,
+                           json={"account_id": 1, "package_id": 1, "subscribed": 0})
+    assert response.status_code == 200, response.text
+
+    assert replica_router.is_sticky(1)
+    dependency, db = _read_session(1)
+    try:
+        assert db.bind is get_pos_engine()
+        assert _business_name(db) == "Business 1"
+    finally:
+        dependency.close()
+    assert replica_router.stats["sticky_reads"] == 1
+
+    # Other users keep reading from the replica
+    dependency, db = _read_session(2)
+    try:
+        assert db.bind is get_pos_replica_engine()
+    finally:
+        dependency.close()
+
+
+def test_stickiness_expires(monkeypatch):
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0)
+    replica_router.mark_write(1)
+    assert not replica_router.is_sticky(1)
+
+    dependency, db = _read_session(1)
+    try:
+        assert db.bind is get_pos_replica_engine()
+    finally:
+        dependency.close()
+
+
+def test_stickiness_is_shared_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    shared = fakeredis.FakeRedis()
+
+    # One router per worker process, both on the same Redis
+    writer, reader = ReplicaRouter(), ReplicaRouter()
+    writer.configure(shared, "test")
+    reader.configure(shared, "test")
+
+    writer.mark_write(1)
+    assert reader.is_sticky(1)
+    assert reader.choose_engine(1) is get_pos_engine()
+    assert not reader.is_sticky(2)
+    assert reader.choose_engine(2) is get_pos_replica_engine()
+
+
+def test_unreachable_stickiness_store_reads_from_primary():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    server.connected = False
+
+    router = ReplicaRouter()
+    router.configure(fakeredis.FakeRedis(server=server), "test")
+    assert router.choose_engine(1) is get_pos_engine()
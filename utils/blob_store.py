@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+from core.config import settings
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class BlobTooLarge(Exception):
+    """Raised when a blob exceeds the configured maximum size."""
+
+
+@dataclass
+class BlobInfo:
+    key: str
+    size: int
+    content_type: str
+    filename: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.key,
+            "size": self.size,
+            "content_type": self.content_type,
+            "filename": self.filename
+        }
+
+
+def is_valid_key(key: str) -> bool:
+    """Keys are generated uuid4 hex strings; anything else is rejected before touching storage."""
+    return bool(_KEY_PATTERN.match(key or ""))
+
+
+class BlobStore:
+    """Storage backend for ticket attachments."""
+
+    def write(self, chunks: Iterable[bytes], content_type: str, filename: Optional[str] = None, max_bytes: Optional[int] = None) -> BlobInfo:
+        """Store a blob from an iterable of chunks without holding it in memory."""
+        raise NotImplementedError
+
+    def info(self, key: str) -> Optional[BlobInfo]:
+        """Return blob metadata, or None if the key does not exist."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of the blob when the backend has one (enables sendfile/range serving)."""
+        return None
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def iter_chunks(self, key: str, chunk_size: int = None) -> Iterator[bytes]:
+        chunk_size = chunk_size or settings.BLOB_CHUNK_BYTES
+        with self.open(key) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory, sharded by the first two key characters."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _meta_path(self, key: str) -> str:
+        return self._path(key) + ".json"
+
+    def write(self, chunks: Iterable[bytes], content_type: str, filename: Optional[str] = None, max_bytes: Optional[int] = None) -> BlobInfo:
+        key = uuid.uuid4().hex
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        size = 0
+        tmp_path = path + ".part"
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BlobTooLarge(f"Blob exceeds {max_bytes} bytes")
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        blob = BlobInfo(key=key, size=size, content_type=content_type, filename=filename)
+        with open(self._meta_path(key), "w") as f:
+            json.dump(blob.to_dict(), f)
+        return blob
+
+    def info(self, key: str) -> Optional[BlobInfo]:
+        if not is_valid_key(key):
+            return None
+        try:
+            with open(self._meta_path(key)) as f:
+                return BlobInfo(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key) if is_valid_key(key) else None
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        for path in (self._path(key), self._meta_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the configured blob store (BLOB_STORE_BACKEND)."""
+    global _blob_store
+
+    if _blob_store is None:
+        if settings.BLOB_STORE_BACKEND == "local":
+            _blob_store = LocalBlobStore(settings.BLOB_STORE_PATH)
+        else:
+            raise ValueError(f"Unknown blob store backend: {settings.BLOB_STORE_BACKEND}")
+
+    return _blob_store
@@ -0,0 +1,347 @@
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_client_rollups import ClientRollup, ClientRollupAccount, RollupWatermark
+from database.db_customer import Client, ClientSubscription
+from database.db_updates import TrackUpdate
+from database.session import new_admin_session, new_app_session
+
+logger = get_logger(__name__)
+
+ONBOARDED = "onboarded"
+SUBSCRIBED = "subscribed"
+UNSUBSCRIBED = "unsubscribed"
+PACKAGE_CHANGED = "package_changed"
+METRICS = (ONBOARDED, SUBSCRIBED, UNSUBSCRIBED, PACKAGE_CHANGED)
+
+PERIODS = ("day", "week", "month")
+GROUP_BY_OPTIONS = ("package_id", "onboarded_by")
+
+# Watermark names; accounts are re-read in account_id order on every pass, TrackUpdates appended in id order
+ONBOARDING_STREAM = "onboarding"
+TRACK_UPDATES_STREAM = "track_updates"
+
+
+def bucket_start(day: date, period: str) -> date:
+    """First day of the period containing `day` (weeks start on Monday)."""
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period: {period}. Allowed periods: {', '.join(PERIODS)}")
+
+
+def next_bucket(bucket: date, period: str) -> date:
+    if period == "day":
+        return bucket + timedelta(days=1)
+    if period == "week":
+        return bucket + timedelta(days=7)
+    return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def iter_buckets(start: date, end: date, period: str) -> Iterator[date]:
+    """Bucket starts covering start..end inclusive."""
+    bucket = bucket_start(start, period)
+    while bucket <= end:
+        yield bucket
+        bucket = next_bucket(bucket, period)
+
+
+def _get_watermark(adminDb: Session, name: str) -> int:
+    """Current position of a source, creating its watermark row on first use."""
+    position = adminDb.query(RollupWatermark.position).filter(RollupWatermark.name == name).scalar()
+    if position is not None:
+        return position
+
+    try:
+        adminDb.add(RollupWatermark(name=name, position=0))
+        adminDb.commit()
+    except IntegrityError:
+        adminDb.rollback()  # Another task created it first
+    return adminDb.query(RollupWatermark.position).filter(RollupWatermark.name == name).scalar()
+
+
+def _advance_watermark(adminDb: Session, name: str, old: int, new: int) -> bool:
+    """
+    Claim a batch by moving its watermark from `old` to `new` inside the caller's transaction.
+
+    The leader lock is per container, so every task runs this job. Only one of them can move
+    the watermark off `old` (the others block on the row, then match nothing); they get False
+    and must roll back instead of counting the batch again.
+    """
+    result = adminDb.execute(
+        update(RollupWatermark)
+        .where(RollupWatermark.name == name, RollupWatermark.position == old)
+        .values(position=new)
+    )
+    return result.rowcount == 1
+
+
+def _count_event(counts: Counter, metric: str, day: date, package_id: Optional[int], onboarded_by: Optional[str], delta: int = 1) -> None:
+    for period in PERIODS:
+        counts[(metric, period, bucket_start(day, period), package_id or 0, onboarded_by or "")] += delta
+
+
+def _apply(adminDb: Session, counts: Counter) -> None:
+    """Add bucket counts to the rollup rows, incrementing in SQL so no other writer's count is overwritten."""
+    for (metric, period, bucket, package_id, onboarded_by), count in counts.items():
+        if not count:
+            continue
+        result = adminDb.execute(
+            update(ClientRollup)
+            .where(
+                ClientRollup.metric == metric,
+                ClientRollup.period == period,
+                ClientRollup.bucket == bucket,
+                ClientRollup.package_id == package_id,
+                ClientRollup.onboarded_by == onboarded_by
+            )
+            .values(count=ClientRollup.count + count)
+        )
+        if result.rowcount == 0:
+            adminDb.add(ClientRollup(metric=metric, period=period, bucket=bucket, package_id=package_id, onboarded_by=onboarded_by, count=count))
+
+
+def _append_onboarding(appDb: Session, adminDb: Session, batch_size: int) -> int:
+    """
+    Reconcile the next batch of accounts (by account_id) with the onboarding rollups; the caller commits.
+
+    ClientRollupAccounts records what each account contributes, so an onboarded_date that is
+    set, backfilled or changed after the account was first seen moves its count to the right
+    bucket, and removed accounts are subtracted. A pass covers every account and the next
+    run starts over, so such changes are picked up within CLIENT_ROLLUP_INTERVAL_SECONDS.
+    """
+    position = _get_watermark(adminDb, ONBOARDING_STREAM)
+
+    rows = appDb.query(
+        Client.account_id, Client.onboarded_date, Client.onboarded_by, ClientSubscription.package_id
+    ).outerjoin(
+        ClientSubscription, ClientSubscription.account_id == Client.account_id
+    ).filter(
+        Client.account_id > position
+    ).order_by(Client.account_id).limit(batch_size).all()
+
+    # A short batch ends the pass; the watermark returns to the start for the next run
+    end = rows[-1].account_id if len(rows) == batch_size else 0
+    if not _advance_watermark(adminDb, ONBOARDING_STREAM, position, end):
+        adminDb.rollback()
+        return 0
+
+    ledger_query = adminDb.query(ClientRollupAccount).filter(ClientRollupAccount.account_id > position)
+    if end:
+        ledger_query = ledger_query.filter(ClientRollupAccount.account_id <= end)
+    ledger = {entry.account_id: entry for entry in ledger_query.all()}
+
+    counts = Counter()
+    for row in rows:
+        day = row.onboarded_date.date() if row.onboarded_date is not None else None
+        onboarded_by = row.onboarded_by or ""
+        entry = ledger.pop(row.account_id, None)
+
+        if entry is None:
+            # Package is the account's package when its onboarding is first counted
+            entry = ClientRollupAccount(account_id=row.account_id, onboarded_day=None, package_id=row.package_id or 0, onboarded_by=onboarded_by)
+            adminDb.add(entry)
+        elif (entry.onboarded_day, entry.onboarded_by) == (day, onboarded_by):
+            continue
+        elif entry.onboarded_day is not None:
+            _count_event(counts, ONBOARDED, entry.onboarded_day, entry.package_id, entry.onboarded_by, -1)
+        else:
+            entry.package_id = row.package_id or 0
+
+        if day is not None:
+            _count_event(counts, ONBOARDED, day, entry.package_id, onboarded_by)
+        entry.onboarded_day = day
+        entry.onboarded_by = onboarded_by
+
+    # Accounts no longer in the pos database
+    for entry in ledger.values():
+        if entry.onboarded_day is not None:
+            _count_event(counts, ONBOARDED, entry.onboarded_day, entry.package_id, entry.onboarded_by, -1)
+        adminDb.delete(entry)
+
+    _apply(adminDb, counts)
+
+    # End the read transaction so the next batch sees the POS apps' latest writes
+    appDb.rollback()
+    return len(rows)
+
+
+def _previous_states(adminDb: Session, account_ids: List[int], before_id: int) -> Dict[int, Dict]:
+    """Latest TrackUpdate data of each account written before `before_id`."""
+    latest = adminDb.query(
+        func.max(TrackUpdate.id)
+    ).filter(
+        TrackUpdate.account_id.in_(account_ids), TrackUpdate.id < before_id
+    ).group_by(TrackUpdate.account_id)
+
+    return {
+        account_id: update_data or {}
+        for account_id, update_data in adminDb.query(TrackUpdate.account_id, TrackUpdate.update_data).filter(TrackUpdate.id.in_(latest)).all()
+    }
+
+
+def _append_track_updates(appDb: Session, adminDb: Session, batch_size: int) -> int:
+    """
+    Fold the next batch of TrackUpdates (by id) into the subscription rollups; the caller commits.
+
+    Ids are assigned before commit, so a lower id can become visible after a higher one. The
+    batch stops below the first update newer than CLIENT_ROLLUP_SETTLE_SECONDS, giving every
+    transaction that long to commit before the watermark passes its id.
+    """
+    position = _get_watermark(adminDb, TRACK_UPDATES_STREAM)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.CLIENT_ROLLUP_SETTLE_SECONDS)
+    first_unsettled = adminDb.query(func.min(TrackUpdate.id)).filter(
+        TrackUpdate.id > position,
+        TrackUpdate.updated_at >= cutoff
+    ).scalar()
+
+    query = adminDb.query(
+        TrackUpdate.id, TrackUpdate.account_id, TrackUpdate.updated_at, TrackUpdate.update_data
+    ).filter(
+        TrackUpdate.id > position
+    )
+    if first_unsettled is not None:
+        query = query.filter(TrackUpdate.id < first_unsettled)
+    rows = query.order_by(TrackUpdate.id).limit(batch_size).all()
+
+    if not rows:
+        return 0
+
+    if not _advance_watermark(adminDb, TRACK_UPDATES_STREAM, position, rows[-1].id):
+        adminDb.rollback()
+        return 0
+
+    account_ids = list({row.account_id for row in rows})
+    onboarded_by = dict(appDb.query(Client.account_id, Client.onboarded_by).filter(Client.account_id.in_(account_ids)).all())
+
+    # Updates written before previous values were recorded are compared with the account's prior update
+    states = _previous_states(adminDb, account_ids, rows[0].id)
+
+    counts = Counter()
+    for row in rows:
+        data = row.update_data or {}
+        prior = states.get(row.account_id)
+        states[row.account_id] = data
+
+        if "previous_subscribed" in data:
+            previous_subscribed, previous_package = data["previous_subscribed"], data.get("previous_package_id")
+        elif prior is not None:
+            previous_subscribed, previous_package = prior.get("subscribed"), prior.get("package_id")
+        else:
+            continue  # First known update of the account: no transition to count
+
+        subscribed, package_id = data.get("subscribed"), data.get("package_id")
+        day = row.updated_at.date()
+
+        if subscribed and not previous_subscribed:
+            _count_event(counts, SUBSCRIBED, day, package_id, onboarded_by.get(row.account_id))
+        elif previous_subscribed and not subscribed:
+            _count_event(counts, UNSUBSCRIBED, day, previous_package, onboarded_by.get(row.account_id))
+
+        if (package_id or 0) != (previous_package or 0):
+            _count_event(counts, PACKAGE_CHANGED, day, package_id, onboarded_by.get(row.account_id))
+
+    _apply(adminDb, counts)
+    return len(rows)
+
+
+def append_client_rollups() -> int:
+    """
+    Bring the onboarding rollups in line with the accounts and fold TrackUpdates added
+    since the last run into the subscription rollups.
+
+    Each source is read past its watermark in batches of CLIENT_ROLLUP_BATCH_SIZE; a
+    batch's counts and its conditional watermark advance are committed together, so
+    every row is counted exactly once even when several tasks run the job. Runs as a
+    leader-only background job, before TrackUpdate retention removes the history.
+
+    Returns:
+        int: Number of source rows processed
+    """
+    appDb = new_app_session()
+    adminDb = new_admin_session()
+    try:
+        processed = 0
+        for append in (_append_onboarding, _append_track_updates):
+            while True:
+                count = append(appDb, adminDb, settings.CLIENT_ROLLUP_BATCH_SIZE)
+                adminDb.commit()
+                processed += count
+                if count < settings.CLIENT_ROLLUP_BATCH_SIZE:
+                    break
+
+        if processed:
+            logger.info(f"Rolled up {processed} accounts and track updates")
+        return processed
+
+    except Exception:
+        adminDb.rollback()
+        raise
+    finally:
+        appDb.close()
+        adminDb.close()
+
+
+def query_series(
+    adminDb: Session,
+    metric: str,
+    period: str,
+    start: date,
+    end: date,
+    group_by: Optional[str] = None,
+    package_id: Optional[int] = None,
+    onboarded_by: Optional[str] = None
+) -> List[Dict]:
+    """
+    Counts per bucket from start to end (inclusive), with empty buckets filled in.
+
+    Raises:
+        ValueError: If an argument is unknown or the range spans more than CLIENT_ROLLUP_MAX_BUCKETS buckets.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}. Allowed metrics: {', '.join(METRICS)}")
+    if group_by is not None and group_by not in GROUP_BY_OPTIONS:
+        raise ValueError(f"Unknown group_by: {group_by}. Allowed values: {', '.join(GROUP_BY_OPTIONS)}")
+    if start > end:
+        raise ValueError("start must not be after end")
+
+    buckets = []
+    for bucket in iter_buckets(start, end, period):
+        buckets.append(bucket)
+        if len(buckets) > settings.CLIENT_ROLLUP_MAX_BUCKETS:
+            raise ValueError(f"Range spans more than {settings.CLIENT_ROLLUP_MAX_BUCKETS} {period} buckets")
+
+    group_column = getattr(ClientRollup, group_by) if group_by else None
+    columns = [ClientRollup.bucket] + ([group_column] if group_column is not None else [])
+
+    query = adminDb.query(*columns, func.sum(ClientRollup.count)).filter(
+        ClientRollup.metric == metric,
+        ClientRollup.period == period,
+        ClientRollup.bucket.between(buckets[0], buckets[-1])
+    )
+    if package_id is not None:
+        query = query.filter(ClientRollup.package_id == package_id)
+    if onboarded_by is not None:
+        query = query.filter(ClientRollup.onboarded_by == onboarded_by)
+
+    series = {bucket: {"bucket": bucket.isoformat(), "count": 0} for bucket in buckets}
+    if group_by:
+        for point in series.values():
+            point["groups"] = {}
+
+    for row in query.group_by(*columns).all():
+        point = series[row[0]]
+        point["count"] += int(row[-1])
+        if group_by:
+            point["groups"][str(row[1])] = int(row[-1])
+
+    return list(series.values())
@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_client_summary import ClientSummary
+from database.db_customer import Client, ClientMain, ClientSubscription
+from database.db_tickets import OPEN_TICKET_STATUSES, Ticket
+from database.session import new_admin_session, new_app_session
+from utils import etags
+
+logger = get_logger(__name__)
+
+# Summary columns compared when deciding whether a row changed
+_SUMMARY_FIELDS = (
+    "business_name", "phone", "email", "subscribed", "package", "onboarding",
+    "account_status", "open_tickets", "device_limit", "module_count"
+)
+
+
+def is_ready(adminDb: Session) -> bool:
+    """True once the summary table has been built at least once."""
+    return etags.get_version(adminDb, etags.CLIENT_SUMMARIES) > 0
+
+
+def _source_rows(appDb: Session, account_ids: Optional[List[int]]) -> Dict[int, Dict]:
+    """Summary values from the pos tables, one joined query per chunk of accounts."""
+    query = appDb.query(
+        Client.account_id,
+        Client.business_name,
+        Client.phone,
+        Client.onboarded_date,
+        ClientMain.business_email,
+        ClientMain.account_status,
+        ClientSubscription.subscribed,
+        ClientSubscription.package_id,
+        ClientSubscription.device_limit,
+        ClientSubscription.active_modules
+    ).outerjoin(
+        ClientMain, ClientMain.account_id == Client.account_id
+    ).outerjoin(
+        ClientSubscription, ClientSubscription.account_id == Client.account_id
+    )
+
+    if account_ids is None:
+        chunks = [query.all()]
+    else:
+        chunk_size = settings.CLIENT_BATCH_CHUNK_SIZE
+        chunks = [
+            query.filter(Client.account_id.in_(account_ids[start:start + chunk_size])).all()
+            for start in range(0, len(account_ids), chunk_size)
+        ]
+
+    return {
+        row.account_id: {
+            "business_name": row.business_name,
+            "phone": row.phone,
+            "email": row.business_email or "",
+            "subscribed": row.subscribed or 0,
+            "package": row.package_id or 0,
+            "onboarding": row.onboarded_date,
+            "account_status": row.account_status,
+            "device_limit": row.device_limit or 0,
+            "module_count": len(row.active_modules or []),
+        }
+        for rows in chunks for row in rows
+    }
+
+
+def _open_ticket_counts(adminDb: Session, account_ids: Optional[Iterable[int]]) -> Dict[int, int]:
+    query = adminDb.query(Ticket.account_id, func.count(Ticket.ticket_id)).filter(Ticket.status.in_(OPEN_TICKET_STATUSES))
+    if account_ids is not None:
+        query = query.filter(Ticket.account_id.in_(list(account_ids)))
+    return dict(query.group_by(Ticket.account_id).all())
+
+
+def refresh_accounts(appDb: Session, adminDb: Session, account_ids: Optional[List[int]] = None) -> int:
+    """
+    Bring summary rows in line with the pos tables and open ticket counts.
+
+    Only rows whose values differ are written; rows of accounts that no longer
+    exist are removed. A partial refresh before the first full reconcile does
+    nothing, so readers keep using the pos tables until the whole table is built.
+    The caller commits `adminDb`.
+
+    Args:
+        appDb: Session on the pos database (use the primary right after a write).
+        adminDb: Session on the admin database.
+        account_ids: Accounts to refresh, or None for a full reconcile.
+
+    Returns:
+        int: Number of summary rows inserted, updated or deleted.
+    """
+    # A handful of rows must not mark the summary as built; the first reconcile writes every account
+    if account_ids is not None and not is_ready(adminDb):
+        return 0
+
+    # Sessions don't autoflush; make pending writes visible to the queries below
+    appDb.flush()
+    adminDb.flush()
+
+    source = _source_rows(appDb, account_ids)
+    open_tickets = _open_ticket_counts(adminDb, account_ids)
+
+    existing_query = adminDb.query(ClientSummary)
+    if account_ids is not None:
+        existing_query = existing_query.filter(ClientSummary.account_id.in_(account_ids))
+    existing = {summary.account_id: summary for summary in existing_query.all()}
+
+    now = datetime.now()
+    changed = 0
+
+    for account_id, values in source.items():
+        values["open_tickets"] = open_tickets.get(account_id, 0)
+        summary = existing.pop(account_id, None)
+
+        if summary is None:
+            adminDb.add(ClientSummary(account_id=account_id, refreshed_at=now, **values))
+            changed += 1
+        elif any(getattr(summary, field) != values[field] for field in _SUMMARY_FIELDS):
+            for field in _SUMMARY_FIELDS:
+                setattr(summary, field, values[field])
+            summary.refreshed_at = now
+            changed += 1
+
+    # Whatever is left no longer exists in the pos database
+    for summary in existing.values():
+        adminDb.delete(summary)
+        changed += 1
+
+    if changed or (account_ids is None and not is_ready(adminDb)):
+        etags.bump_version(adminDb, etags.CLIENT_SUMMARIES)
+    return changed
+
+
+def refresh_open_tickets(adminDb: Session, account_ids: Iterable[int]) -> None:
+    """
+    Recount open tickets of the given accounts after ticket writes; the caller commits.
+    Accounts without a summary row yet are picked up by the next reconcile.
+    """
+    account_ids = set(account_ids)
+    adminDb.flush()
+    counts = _open_ticket_counts(adminDb, account_ids)
+
+    changed = False
+    for summary in adminDb.query(ClientSummary).filter(ClientSummary.account_id.in_(account_ids)).all():
+        count = counts.get(summary.account_id, 0)
+        if summary.open_tickets != count:
+            summary.open_tickets = count
+            summary.refreshed_at = datetime.now()
+            changed = True
+
+    if changed:
+        etags.bump_version(adminDb, etags.CLIENT_SUMMARIES)
+
+
+def reconcile_client_summaries() -> int:
+    """
+    Full pass over all accounts; picks up changes the POS apps make outside this API.
+    Runs as a leader-only background job.
+
+    Returns:
+        int: Number of summary rows changed
+    """
+    appDb = new_app_session()
+    adminDb = new_admin_session()
+    try:
+        changed = refresh_accounts(appDb, adminDb)
+        adminDb.commit()
+
+        if changed:
+            logger.info(f"Reconciled {changed} client summaries")
+        return changed
+
+    except Exception:
+        adminDb.rollback()
+        raise
+    finally:
+        appDb.close()
+        adminDb.close()
@@ -0,0 +1,32 @@
+from typing import Dict, List, Optional
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# Opt-in compact list format: {"columns": [...], "rows": [[...], ...]}
+COLUMNAR_MEDIA_TYPE = "application/vnd.admin.columnar+json"
+COLUMNAR_FORMAT = "columnar"
+
+
+def wants_columnar(request: Request, response: Response, format: Optional[str]) -> bool:
+    """
+    Negotiate the list format from `?format=columnar` or an Accept header naming the columnar media type.
+    Sets `Vary: Accept` because the same URL can return either format.
+    """
+    response.headers["Vary"] = "Accept"
+
+    if format:
+        return format == COLUMNAR_FORMAT
+    return COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def to_columnar(rows: List[Dict], columns: List[str]) -> Dict:
+    """Column names once, then one value array per row in the same order."""
+    return {
+        "columns": columns,
+        "rows": [[row[column] for column in columns] for row in rows]
+    }
+
+
+def columnar_response(content: Dict, response: Response) -> JSONResponse:
+    """Serialize a columnar body with its media type, keeping headers set on `response` (ETag, Vary)."""
+    return JSONResponse(content, media_type=COLUMNAR_MEDIA_TYPE, headers=dict(response.headers))
@@ -0,0 +1,209 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from core.cache import Cache
+from core.config import settings
+from core.logging import get_logger
+from database.db_customer import Client, ClientMain, ClientSubscription
+from database.db_dashboard_counters import DashboardCounter
+from database.db_tickets import OPEN_TICKET_STATUSES, ArchivedTicket, Ticket
+from database.session import new_admin_session, new_app_session
+from utils import etags
+
+logger = get_logger(__name__)
+
+CLIENTS_BY_PACKAGE = "clients_by_package"
+CLIENTS_BY_SUBSCRIBED = "clients_by_subscribed"
+CLIENTS_BY_ACCOUNT_STATUS = "clients_by_account_status"
+TICKETS_BY_STATUS = "tickets_by_status"
+TICKETS_BY_PRIORITY = "tickets_by_priority"
+
+ACTIVE_ACCOUNT_STATUS = 1
+
+# Dashboard bodies keyed by the DASHBOARD_STATS version, so writes never need to invalidate them
+stats_cache = Cache("dashboard_stats", settings.DASHBOARD_STATS_CACHE_TTL_SECONDS, local_size=4)
+
+
+def is_ready(adminDb: Session) -> bool:
+    """True once the counters have been built at least once."""
+    return etags.get_version(adminDb, etags.DASHBOARD_STATS) > 0
+
+
+def _grouped_counts(appDb: Session, adminDb: Session) -> Counter:
+    """
+    Every counter from GROUP BY queries: one over clients (package, subscribed, account status)
+    and one per ticket table (status, priority). Archived tickets are included, so archiving
+    moves no counts.
+    """
+    counts = Counter()
+
+    # Accounts without a subscription count as unsubscribed with no package, as in the client lists
+    package = func.coalesce(ClientSubscription.package_id, 0)
+    subscribed = func.coalesce(ClientSubscription.subscribed, 0)
+    account_status = func.coalesce(ClientMain.account_status, 0)
+    client_rows = appDb.query(
+        package, subscribed, account_status, func.count(Client.account_id)
+    ).outerjoin(
+        ClientMain, ClientMain.account_id == Client.account_id
+    ).outerjoin(
+        ClientSubscription, ClientSubscription.account_id == Client.account_id
+    ).group_by(package, subscribed, account_status).all()
+
+    for package_id, subscribed_flag, status, count in client_rows:
+        counts[(CLIENTS_BY_PACKAGE, package_id)] += count
+        counts[(CLIENTS_BY_SUBSCRIBED, 1 if subscribed_flag else 0)] += count
+        counts[(CLIENTS_BY_ACCOUNT_STATUS, status)] += count
+
+    for model in (Ticket, ArchivedTicket):
+        ticket_rows = adminDb.query(
+            model.status, model.priority, func.count(model.ticket_id)
+        ).group_by(model.status, model.priority).all()
+
+        for status, priority, count in ticket_rows:
+            counts[(TICKETS_BY_STATUS, status)] += count
+            counts[(TICKETS_BY_PRIORITY, priority)] += count
+
+    return counts
+
+
+def rebuild(appDb: Session, adminDb: Session) -> int:
+    """
+    Recompute every counter and write the ones that differ; the caller commits `adminDb`.
+
+    Returns:
+        int: Number of counter rows inserted, updated or deleted.
+    """
+    adminDb.flush()
+    counts = _grouped_counts(appDb, adminDb)
+    existing = {(row.metric, row.bucket): row for row in adminDb.query(DashboardCounter).all()}
+
+    changed = 0
+    for key, count in counts.items():
+        row = existing.pop(key, None)
+        if row is None:
+            adminDb.add(DashboardCounter(metric=key[0], bucket=key[1], count=count))
+            changed += 1
+        elif row.count != count:
+            row.count = count
+            changed += 1
+
+    # Buckets that no longer exist; rows already at zero (left by write adjustments) change nothing visible
+    for row in existing.values():
+        adminDb.delete(row)
+        if row.count:
+            changed += 1
+
+    if changed or not is_ready(adminDb):
+        etags.bump_version(adminDb, etags.DASHBOARD_STATS)
+    return changed
+
+
+def _apply(adminDb: Session, deltas: Counter) -> None:
+    """
+    Add deltas to counter rows inside the caller's transaction.
+    Before the first rebuild there is nothing to adjust; the rebuild counts the write.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas or not is_ready(adminDb):
+        return
+
+    # Sessions don't autoflush; rows added earlier in this transaction must be visible to the updates
+    adminDb.flush()
+    for (metric, bucket), delta in deltas.items():
+        result = adminDb.execute(
+            update(DashboardCounter)
+            .where(DashboardCounter.metric == metric, DashboardCounter.bucket == bucket)
+            .values(count=DashboardCounter.count + delta)
+        )
+        if result.rowcount == 0:
+            adminDb.add(DashboardCounter(metric=metric, bucket=bucket, count=delta))
+
+    etags.bump_version(adminDb, etags.DASHBOARD_STATS)
+
+
+def tickets_changed(adminDb: Session, before: Iterable[Tuple[int, int]], after: Iterable[Tuple[int, int]]) -> None:
+    """
+    Move ticket counts from the (status, priority) pairs in `before` to those in `after`.
+    Pass an empty `before` for new tickets. The caller commits.
+    """
+    deltas = Counter()
+    for sign, pairs in ((-1, before), (1, after)):
+        for status, priority in pairs:
+            deltas[(TICKETS_BY_STATUS, status)] += sign
+            deltas[(TICKETS_BY_PRIORITY, priority)] += sign
+    _apply(adminDb, deltas)
+
+
+def subscription_changed(adminDb: Session, before: Tuple[int, int], after: Tuple[int, int]) -> None:
+    """
+    Move one account between (subscribed, package_id) buckets; (0, 0) stands for no subscription.
+    The caller commits.
+    """
+    deltas = Counter()
+    for sign, (subscribed, package_id) in ((-1, before), (1, after)):
+        deltas[(CLIENTS_BY_SUBSCRIBED, 1 if subscribed else 0)] += sign
+        deltas[(CLIENTS_BY_PACKAGE, package_id or 0)] += sign
+    _apply(adminDb, deltas)
+
+
+def _load(adminDb: Session) -> Dict:
+    counters: Dict[str, Dict[str, int]] = {}
+    for row in adminDb.query(DashboardCounter).filter(DashboardCounter.count != 0).order_by(DashboardCounter.metric, DashboardCounter.bucket).all():
+        # String keys so local and Redis-cached copies are identical
+        counters.setdefault(row.metric, {})[str(row.bucket)] = row.count
+
+    by_subscribed = counters.get(CLIENTS_BY_SUBSCRIBED, {})
+    by_account_status = counters.get(CLIENTS_BY_ACCOUNT_STATUS, {})
+    by_status = counters.get(TICKETS_BY_STATUS, {})
+    clients_total = sum(by_subscribed.values())
+    active = by_account_status.get(str(ACTIVE_ACCOUNT_STATUS), 0)
+
+    return {
+        "clients": {
+            "total": clients_total,
+            "by_package": counters.get(CLIENTS_BY_PACKAGE, {}),
+            "subscribed": by_subscribed.get("1", 0),
+            "unsubscribed": by_subscribed.get("0", 0),
+            "active": active,
+            "suspended": clients_total - active,
+            "by_account_status": by_account_status,
+        },
+        "tickets": {
+            "total": sum(by_status.values()),
+            "open": sum(by_status.get(str(status), 0) for status in OPEN_TICKET_STATUSES),
+            "by_status": by_status,
+            "by_priority": counters.get(TICKETS_BY_PRIORITY, {}),
+        },
+    }
+
+
+async def get_stats(adminDb: Session, version: int) -> Dict:
+    """Dashboard counters as of `version`, read from the counter table once per version."""
+    return await stats_cache.get_or_load_async(version, lambda: _load(adminDb))
+
+
+def reconcile_dashboard_stats() -> int:
+    """
+    Full recount; picks up changes the POS apps make outside this API (account status,
+    subscriptions) and any drift. Runs as a leader-only background job.
+
+    Returns:
+        int: Number of counter rows changed
+    """
+    appDb = new_app_session()
+    adminDb = new_admin_session()
+    try:
+        changed = rebuild(appDb, adminDb)
+        adminDb.commit()
+
+        if changed:
+            logger.info(f"Reconciled {changed} dashboard counters")
+        return changed
+
+    except Exception:
+        adminDb.rollback()
+        raise
+    finally:
+        appDb.close()
+        adminDb.close()
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from fastapi import Request, Response
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from core.cache import Cache
+from core.config import settings
+from database.db_versions import ResourceVersion
+
+# Resources whose list endpoints support conditional GET
+CLIENTS = "clients"
+PACKAGES = "packages"
+USERS = "users"
+TICKETS = "tickets"
+CLIENT_SUMMARIES = "client_summaries"  # Also marks that the summary table has been built
+DASHBOARD_STATS = "dashboard_stats"  # Also marks that the dashboard counters have been built
+
+# Serialized list bodies keyed by their ETag; a new version means a new key, so nothing is invalidated
+list_snapshots = Cache("list_snapshots", settings.ETAG_MAX_STALENESS_SECONDS, settings.LIST_SNAPSHOT_CACHE_SIZE)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "not_modified": 0})
+
+
+def get_version(db: Session, name: str) -> int:
+    """Return the current version counter of a resource (0 if it was never written)."""
+    version = db.query(ResourceVersion.version).filter(ResourceVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_version(db: Session, name: str) -> None:
+    """
+    Increment a resource's version counter inside the caller's transaction.
+    The caller is responsible for committing.
+    """
+    result = db.execute(
+        update(ResourceVersion)
+        .where(ResourceVersion.name == name)
+        .values(version=ResourceVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(ResourceVersion(name=name, version=1))
+
+
+def watermark(db: Session, column) -> tuple:
+    """Return (row count, max value) of an indexed column; catches inserts made outside this API."""
+    return tuple(db.query(func.count(column), func.max(column)).one())
+
+
+def staleness_bucket() -> int:
+    """
+    Time bucket folded into ETags of data that can change outside this API
+    (the POS fleet writes the pos database), so such changes are picked up
+    within ETAG_MAX_STALENESS_SECONDS.
+    """
+    return int(time.time() // settings.ETAG_MAX_STALENESS_SECONDS)
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the version inputs and request parameters."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def check_not_modified(request: Request, response: Response, endpoint: str, etag: str) -> Optional[Response]:
+    """
+    Answer a conditional GET.
+
+    Returns:
+        Response: A 304 response when If-None-Match matches the ETag.
+        None: Otherwise; the ETag is set on `response` and the caller builds the body.
+    """
+    not_modified = etag_matches(request.headers.get("if-none-match"), etag)
+
+    with _stats_lock:
+        _stats[endpoint]["requests"] += 1
+        if not_modified:
+            _stats[endpoint]["not_modified"] += 1
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not_modified:
+        if "vary" in response.headers:
+            headers["Vary"] = response.headers["vary"]
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def etag_stats() -> Dict[str, Dict[str, float]]:
+    """Per-endpoint conditional GET counters and 304 ratio."""
+    with _stats_lock:
+        return {
+            endpoint: {
+                "requests": counts["requests"],
+                "not_modified": counts["not_modified"],
+                "not_modified_ratio": round(counts["not_modified"] / counts["requests"], 4) if counts["requests"] else 0.0,
+            }
+            for endpoint, counts in _stats.items()
+        }
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from core.cache import connect_redis, get_backend
+from core.config import settings
+from core.logging import get_logger
+from core.workers import worker_count
+
+logger = get_logger(__name__)
+
+_ORIGIN = uuid.uuid4().hex
+
+
+@dataclass
+class Event:
+    id: int  # The tickets version committed by the write, so ids are ordered across workers
+    type: str
+    data: Dict[str, Any]
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "type": self.type, "data": self.data}
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBroker:
+    """
+    In-process fan-out of ticket events to connected SSE streams.
+
+    Every subscriber has a bounded queue. A subscriber that falls behind is
+    disconnected rather than buffered without limit; its client reconnects with
+    Last-Event-ID and catches up from the ring buffer of recent events.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[_Subscriber] = set()
+        self._recent: deque = deque(maxlen=settings.EVENT_BUFFER_SIZE)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "received": 0, "delivered": 0, "dropped_subscribers": 0}
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def publish(self, event: Event) -> None:
+        """Deliver an event to this worker's subscribers; safe to call from any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._deliver(event)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Event) -> None:
+        with self._lock:
+            self._recent.append(event)
+
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # Too slow: close the stream and let the client resume from the ring buffer
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+                self.stats["dropped_subscribers"] += 1
+                self._wake(subscriber)
+
+    @staticmethod
+    def _wake(subscriber: _Subscriber) -> None:
+        # Make room for the end-of-stream marker
+        while True:
+            try:
+                subscriber.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        subscriber.queue.put_nowait(None)
+
+    def replay(self, last_event_id: int) -> Optional[List[Event]]:
+        """
+        Events after `last_event_id`, or None when the ring buffer no longer
+        reaches back that far (the client has to reload its lists).
+        """
+        with self._lock:
+            recent = list(self._recent)
+
+        if recent and min(event.id for event in recent) > last_event_id + 1:
+            return None
+        return sorted((event for event in recent if event.id > last_event_id), key=lambda event: event.id)
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """SSE body: replayed events, then live events with heartbeat comments while idle."""
+        subscriber = _Subscriber()
+        self._subscribers.add(subscriber)
+
+        try:
+            yield f"retry: {settings.EVENT_RETRY_MS}\n\n"
+
+            if last_event_id is not None:
+                missed = self.replay(last_event_id)
+                if missed is None:
+                    yield Event(last_event_id, "reset", {"reason": "Events were missed; reload ticket lists"}).encode()
+                else:
+                    for event in missed:
+                        yield event.encode()
+                        last_event_id = event.id
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), settings.EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if event is None:
+                    break
+                # Already sent during the replay
+                if last_event_id is not None and event.id <= last_event_id:
+                    continue
+                yield event.encode()
+
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def close(self) -> None:
+        """End all streams (application shutdown)."""
+        for subscriber in list(self._subscribers):
+            self._subscribers.discard(subscriber)
+            self._wake(subscriber)
+
+    def info(self) -> Dict:
+        with self._lock:
+            buffered = len(self._recent)
+        return {"subscribers": len(self._subscribers), "buffered": buffered, **self.stats}
+
+
+broker = EventBroker()
+
+
+class RedisEventBridge:
+    """Relays events between workers and tasks over a Redis channel."""
+
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.channel = f"{prefix}:events"
+        self._pubsub = None
+        self._listener = None
+
+    def publish(self, event: Event) -> None:
+        message = json.dumps({"origin": _ORIGIN, **event.to_dict()})
+        try:
+            self.client.publish(self.channel, message)
+        except Exception as e:
+            logger.warning(f"Redis event publish failed: {str(e)}")
+
+    def _on_message(self, message) -> None:
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+
+        if data.get("origin") == _ORIGIN:
+            return
+
+        broker.stats["received"] += 1
+        broker.publish(Event(data["id"], data["type"], data["data"]))
+
+    def start(self) -> None:
+        try:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_message})
+            self._listener = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+        except Exception as e:
+            logger.warning(f"Redis event subscribe failed: {str(e)}")
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+
+
+_bridge: Optional[RedisEventBridge] = None
+
+
+def init_events() -> None:
+    """
+    Bind the broker to the running loop and bridge workers over Redis: the shared cache's
+    connection when CACHE_BACKEND=redis, otherwise CACHE_REDIS_URL whenever more than one
+    worker serves streams. Without a bridge, a stream only sees its own worker's writes.
+    """
+    global _bridge
+
+    broker.bind(asyncio.get_running_loop())
+
+    backend = get_backend()
+    if backend is not None:
+        client, prefix = backend.client, backend.prefix
+    elif worker_count() > 1:
+        client, prefix = connect_redis("ticket events"), settings.CACHE_KEY_PREFIX
+        if client is None:
+            logger.warning(
+                f"Running {worker_count()} workers without Redis: ticket_events streams only receive writes "
+                f"handled by their own worker. Make CACHE_REDIS_URL reachable or run a single worker"
+            )
+            return
+    else:
+        return
+
+    _bridge = RedisEventBridge(client, prefix)
+    _bridge.start()
+
+
+def close_events() -> None:
+    global _bridge
+
+    broker.close()
+    if _bridge is not None:
+        _bridge.close()
+        _bridge = None
+
+
+def publish(event_type: str, event_id: int, **data) -> None:
+    """
+    Publish a ticket event after its transaction committed.
+
+    Args:
+        event_type: e.g. "ticket_created", "ticket_updated", "ticket_status_changed".
+        event_id: The tickets version the write committed.
+        data: Small payload; clients load details with get_ticket_detail.
+    """
+    event = Event(event_id, event_type, data)
+    broker.stats["published"] += 1
+    broker.publish(event)
+
+    if _bridge is not None:
+        _bridge.publish(event)
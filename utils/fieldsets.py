@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List, Optional
+
+
+def parse_fields(fields: Optional[str], field_map: Dict) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` parameter against the fields an endpoint exposes.
+
+    Returns:
+        list: The requested fields in response order, or None when the full shape was requested.
+
+    Raises:
+        ValueError: If a requested field is not exposed by the endpoint.
+    """
+    if fields is None:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - set(field_map)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed fields: {', '.join(field_map)}")
+
+    return [field for field in field_map if field in requested]
+
+
+def select_columns(field_map: Dict, fields: Iterable[str], model, key=None) -> List:
+    """
+    Columns of `model` needed for the given fields, labelled with the response field names.
+
+    Args:
+        field_map: Response field name -> mapped column.
+        fields: Fields to fetch.
+        model: Only columns of this model are returned.
+        key: Column always fetched (e.g. the id used to join rows from other queries).
+
+    Returns:
+        list: Labelled columns.
+    """
+    fields = set(fields)
+    columns = [column.label(field) for field, column in field_map.items() if field in fields and column.class_ is model]
+
+    if key is not None and key.key not in {column.key for column in columns}:
+        columns.insert(0, key.label(key.key))
+    return columns
+
+
+def uses_model(field_map: Dict, fields: Iterable[str], model) -> bool:
+    """True when any of the fields is stored on `model` (i.e. its table must be queried)."""
+    return any(field_map[field].class_ is model for field in fields)
+
+
+def pick(values: Dict, fields: List[str]) -> Dict:
+    """Restrict a row to the requested fields."""
+    return {field: values[field] for field in fields}
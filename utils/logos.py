@@ -0,0 +1,141 @@
+import base64
+import binascii
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional, Tuple
+from core.config import settings
+from core.workers import per_worker
+
+try:
+    from PIL import Image
+except ImportError:  # Thumbnails are optional; originals are always served
+    Image = None
+
+_MAGIC_TYPES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+
+def decode_logo(encoded: str) -> Tuple[bytes, str]:
+    """
+    Decode a stored business_logo into raw bytes and a media type.
+
+    Accepts data URIs (data:image/png;base64,...) and bare base64.
+
+    Raises:
+        ValueError: If the value is not valid base64.
+    """
+    media_type = None
+    payload = encoded.strip()
+
+    if payload.startswith("data:"):
+        header, _, payload = payload.partition(",")
+        media_type = header[5:].split(";")[0] or None
+
+    try:
+        data = base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid logo encoding: {str(e)}")
+
+    return data, media_type or sniff_media_type(data)
+
+
+def sniff_media_type(data: bytes) -> str:
+    """Guess an image media type from its leading bytes."""
+    for magic, media_type in _MAGIC_TYPES:
+        if data.startswith(magic):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.lstrip()[:5] in (b"<?xml", b"<svg "):
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def logo_etag(digest: str, size: Optional[int] = None) -> str:
+    return f'"{digest}-{size}"' if size else f'"{digest}"'
+
+
+class KnownHashes:
+    """
+    Bounded, expiring map of account_id -> (content hash, media type).
+
+    Lets conditional requests be answered without reading BusinessDetails.
+    Entries expire after LOGO_HASH_TTL_SECONDS because logos are changed by
+    the POS apps, not through this API.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[str, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, account_id: int) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            entry = self._entries.get(account_id)
+            if entry is None:
+                return None
+            digest, media_type, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[account_id]
+                return None
+            self._entries.move_to_end(account_id)
+            return digest, media_type
+
+    def set(self, account_id: int, digest: str, media_type: str) -> None:
+        with self._lock:
+            self._entries[account_id] = (digest, media_type, time.monotonic() + self.ttl)
+            self._entries.move_to_end(account_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+known_hashes = KnownHashes(per_worker(settings.LOGO_HASH_CACHE_SIZE), settings.LOGO_HASH_TTL_SECONDS)
+
+
+def thumbnails_supported() -> bool:
+    return Image is not None
+
+
+def thumbnail_path(digest: str, size: int) -> str:
+    return os.path.join(settings.LOGO_THUMBNAIL_DIR, f"{digest}_{size}.png")
+
+
+def get_or_create_thumbnail(data: bytes, digest: str, size: int) -> Optional[str]:
+    """
+    Return the path of a cached PNG thumbnail no larger than size x size,
+    creating it on first use. Returns None for formats Pillow cannot read (e.g. SVG).
+    """
+    path = thumbnail_path(digest, size)
+    if os.path.exists(path):
+        return path
+
+    try:
+        image = Image.open(BytesIO(data))
+        if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            image = image.convert("RGBA")
+        image.thumbnail((size, size))
+    except (OSError, ValueError):
+        return None
+
+    os.makedirs(settings.LOGO_THUMBNAIL_DIR, exist_ok=True)
+
+    # Write to a temp file first so concurrent requests never read a partial file
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    image.save(tmp_path, format="PNG", optimize=True)
+    os.replace(tmp_path, path)
+    return path
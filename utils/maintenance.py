@@ -0,0 +1,36 @@
+from datetime import datetime, timezone, timedelta
+from core.config import settings
+from core.logging import get_logger
+from database.session import new_admin_session
+from database.db_updates import TrackUpdate
+
+logger = get_logger(__name__)
+
+
+def purge_track_updates():
+    """
+    Delete TrackUpdate rows older than TRACK_UPDATE_RETENTION_DAYS.
+
+    Runs as a leader-only background job instead of on every subscription update.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    adminDb = new_admin_session()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.TRACK_UPDATE_RETENTION_DAYS)
+
+        deleted = adminDb.query(TrackUpdate).filter(
+            TrackUpdate.updated_at < cutoff
+        ).delete(synchronize_session=False)
+        adminDb.commit()
+
+        if deleted:
+            logger.info(f"Purged {deleted} track updates older than {settings.TRACK_UPDATE_RETENTION_DAYS} days")
+        return deleted
+
+    except Exception:
+        adminDb.rollback()
+        raise
+    finally:
+        adminDb.close()
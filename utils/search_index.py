@@ -0,0 +1,79 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of at least two characters."""
+    return [token for token in _TOKEN_PATTERN.findall((text or "").lower()) if len(token) > 1]
+
+
+class InvertedIndex:
+    """
+    In-process inverted index: token -> {document id: weighted term frequency}.
+
+    Documents only grow (text is appended with `add`), which matches tickets:
+    subjects and descriptions are written once and updates are appended.
+    Results are ranked with BM25.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._lengths: Dict[int, float] = defaultdict(float)
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: int, text: str, weight: float = 1.0) -> None:
+        """Append text to a document; `weight` scales its term frequencies (e.g. subjects count more)."""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return
+
+        with self._lock:
+            for token, count in counts.items():
+                postings = self._postings[token]
+                postings[doc_id] = postings.get(doc_id, 0.0) + count * weight
+            length = sum(counts.values()) * weight
+            self._lengths[doc_id] += length
+            self._total_length += length
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._total_length = 0.0
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """All documents containing any query token as (doc_id, score), best first."""
+        tokens = set(tokenize(query))
+
+        with self._lock:
+            documents = len(self._lengths)
+            if not documents or not tokens:
+                return []
+
+            average_length = self._total_length / documents
+            scores: Dict[int, float] = defaultdict(float)
+
+            for token in tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.K1 * (1 - self.B + self.B * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.K1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {"documents": len(self._lengths), "tokens": len(self._postings)}
+
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable
+from starlette.concurrency import run_in_threadpool
+
+# Computations in flight in this worker, keyed by (endpoint, key)
+_inflight: Dict[Hashable, "asyncio.Future"] = {}
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"executions": 0, "coalesced": 0})
+
+
+def _finished(flight_key: Hashable, task: "asyncio.Future") -> None:
+    if _inflight.get(flight_key) is task:
+        del _inflight[flight_key]
+
+    # Mark a failure as retrieved even if every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def do(endpoint: str, key: Hashable, func: Callable[..., Any], *args) -> Any:
+    """
+    Run `func(*args)` in the threadpool, sharing the result with identical concurrent calls.
+
+    Callers with the same endpoint and key while a computation is in flight await
+    that computation instead of starting their own. The key must capture everything
+    the result depends on: request parameters, data version and authorization scope.
+    A caller that disconnects does not cancel the computation for the others, so `func`
+    must open and close its own database session rather than use a request's.
+    """
+    flight_key = (endpoint, key)
+    task = _inflight.get(flight_key)
+
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(func, *args))
+        _inflight[flight_key] = task
+        task.add_done_callback(lambda finished: _finished(flight_key, finished))
+        counter = "executions"
+    else:
+        counter = "coalesced"
+
+    with _stats_lock:
+        _stats[endpoint][counter] += 1
+
+    return await asyncio.shield(task)
+
+
+def singleflight_stats() -> Dict[str, Dict[str, float]]:
+    """Per-endpoint computations run and calls served by another call's computation (executions saved)."""
+    with _stats_lock:
+        return {
+            endpoint: {
+                "executions": counts["executions"],
+                "coalesced": counts["coalesced"],
+                "coalesced_ratio": round(counts["coalesced"] / (counts["executions"] + counts["coalesced"]), 4),
+            }
+            for endpoint, counts in _stats.items()
+        }
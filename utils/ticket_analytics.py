@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from core.cache import Cache
+from core.config import settings
+from database.db_ticket_updates import ArchivedTicketUpdate, TicketUpdate
+from database.db_tickets import CLOSED_TICKET_STATUS, OPEN_TICKET_STATUSES, ArchivedTicket, Ticket
+
+PERCENTILES = (50, 90, 99)
+
+# Computed reports keyed by window length; small and shared by every admin
+analytics_cache = Cache("ticket_analytics", settings.TICKET_ANALYTICS_CACHE_SECONDS, local_size=16)
+
+
+def _load_columns(db: Session, since: datetime) -> Dict[str, np.ndarray]:
+    """
+    Tickets created since `since` (live and archived) as column arrays, with the
+    first and last update time of each ticket aligned to them (NaT when none).
+    """
+    ticket_rows = []
+    update_rows = []
+
+    for ticket_model, update_model in ((Ticket, TicketUpdate), (ArchivedTicket, ArchivedTicketUpdate)):
+        ticket_rows += db.query(
+            ticket_model.ticket_id, ticket_model.created_at, ticket_model.status, ticket_model.priority, ticket_model.contact_mode
+        ).filter(ticket_model.created_at >= since).all()
+
+        update_rows += db.query(
+            update_model.ticket_id, func.min(update_model.created_at), func.max(update_model.created_at)
+        ).join(
+            ticket_model, ticket_model.ticket_id == update_model.ticket_id
+        ).filter(ticket_model.created_at >= since).group_by(update_model.ticket_id).all()
+
+    ticket_ids, created_at, status, priority, contact_mode = (list(column) for column in zip(*ticket_rows)) if ticket_rows else ([], [], [], [], [])
+
+    columns = {
+        "ticket_id": np.array(ticket_ids, dtype=np.int64),
+        "created_at": np.array(created_at, dtype="datetime64[s]"),
+        "status": np.array(status, dtype=np.int64),
+        "priority": np.array(priority, dtype=np.int64),
+        "contact_mode": np.array(contact_mode, dtype=np.int64),
+        "first_update": np.full(len(ticket_ids), np.datetime64("NaT"), dtype="datetime64[s]"),
+        "last_update": np.full(len(ticket_ids), np.datetime64("NaT"), dtype="datetime64[s]"),
+    }
+
+    if update_rows and ticket_ids:
+        update_ticket_ids, first, last = zip(*update_rows)
+
+        # Align update aggregates to ticket rows by binary search over the sorted ticket ids
+        order = np.argsort(columns["ticket_id"])
+        positions = order[np.searchsorted(columns["ticket_id"], np.array(update_ticket_ids, dtype=np.int64), sorter=order)]
+        columns["first_update"][positions] = np.array(first, dtype="datetime64[s]")
+        columns["last_update"][positions] = np.array(last, dtype="datetime64[s]")
+
+    return columns
+
+
+def _summary(hours: np.ndarray) -> Dict[str, Optional[float]]:
+    if hours.size == 0:
+        return {"count": 0, "mean": None, **{f"p{pct}": None for pct in PERCENTILES}}
+
+    values = np.percentile(hours, PERCENTILES)
+    return {
+        "count": int(hours.size),
+        "mean": round(float(hours.mean()), 2),
+        **{f"p{pct}": round(float(value), 2) for pct, value in zip(PERCENTILES, values)}
+    }
+
+
+def _metrics(columns: Dict[str, np.ndarray], mask: np.ndarray, now: np.datetime64) -> Dict:
+    hour = np.timedelta64(1, "h")
+    created = columns["created_at"]
+    first_update = columns["first_update"]
+    last_update = columns["last_update"]
+    status = columns["status"]
+
+    answered = mask & ~np.isnat(first_update)
+    # There is no closed_at column; a closed ticket's last update is when it was resolved
+    closed = mask & (status == CLOSED_TICKET_STATUS) & ~np.isnat(last_update)
+    backlog = mask & np.isin(status, OPEN_TICKET_STATUSES)
+
+    return {
+        "tickets": int(mask.sum()),
+        "time_to_first_update_hours": _summary((first_update[answered] - created[answered]) / hour),
+        "time_to_close_hours": _summary((last_update[closed] - created[closed]) / hour),
+        "backlog_age_hours": _summary((now - created[backlog]) / hour),
+    }
+
+
+def _breakdown(columns: Dict[str, np.ndarray], key: str, now: np.datetime64) -> Dict[str, Dict]:
+    values = columns[key]
+    return {str(int(value)): _metrics(columns, values == value, now) for value in np.unique(values)}
+
+
+def compute_sla_report(db: Session, days: int) -> Dict:
+    """
+    Time to first update, time to close and backlog age percentiles for tickets
+    created in the last `days` days, overall and by priority and contact mode.
+    """
+    now = datetime.now()
+    columns = _load_columns(db, now - timedelta(days=days))
+    now64 = np.datetime64(now, "s")
+
+    return {
+        "window_days": days,
+        "generated_at": now.isoformat(),
+        "overall": _metrics(columns, np.ones(len(columns["ticket_id"]), dtype=bool), now64),
+        "by_priority": _breakdown(columns, "priority", now64),
+        "by_contact_mode": _breakdown(columns, "contact_mode", now64),
+    }
+
+
+async def get_sla_report(db: Session, days: int) -> Dict:
+    """Cached report; recomputed (in the threadpool) at most every TICKET_ANALYTICS_CACHE_SECONDS per window."""
+    return await analytics_cache.get_or_load_async(days, lambda: compute_sla_report(db, days))
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import DATETIME, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_ticket_claims import TicketClaim
+from database.db_ticket_updates import ArchivedTicketUpdate, TicketUpdate
+from database.db_tickets import CLOSED_TICKET_STATUS, ArchivedTicket, Ticket
+from database.session import new_admin_session
+from utils import etags
+
+logger = get_logger(__name__)
+
+
+def max_ticket_id(db: Session) -> int:
+    """Highest ticket id in the live and archive tables; new ids must not reuse archived ones."""
+    live = db.query(func.max(Ticket.ticket_id)).with_for_update().scalar() or 0
+    archived = db.query(func.max(ArchivedTicket.ticket_id)).scalar() or 0
+    return max(live, archived)
+
+
+def _move(db: Session, source, target, key, ids: List[int], archived_at: datetime = None) -> None:
+    # INSERT ... SELECT into the archive table, then delete from the live table
+    columns = [column.name for column in source.__table__.columns]
+    selected = [source.__table__.c[name] for name in columns]
+    if archived_at is not None:
+        columns.append("archived_at")
+        selected.append(literal(archived_at, DATETIME))
+
+    db.execute(insert(target.__table__).from_select(columns, select(*selected).where(key.in_(ids))))
+    db.query(source).filter(key.in_(ids)).delete(synchronize_session=False)
+
+
+def archive_batch(db: Session, cutoff: datetime) -> int:
+    """
+    Move one batch of closed tickets without activity since `cutoff`, with their
+    updates, into the archive tables and commit.
+
+    Returns:
+        int: Number of tickets archived
+    """
+    recent_update = exists().where(TicketUpdate.ticket_id == Ticket.ticket_id, TicketUpdate.created_at >= cutoff)
+    # An id already in the archive (e.g. reused through an explicit create_ticket id before that was rejected)
+    # would fail the insert and block every later batch; such tickets stay live
+    already_archived = exists().where(ArchivedTicket.ticket_id == Ticket.ticket_id)
+
+    # Lock the batch so a ticket reopened meanwhile is not moved half-way
+    ticket_ids = [row[0] for row in db.query(Ticket.ticket_id).filter(
+        Ticket.status == CLOSED_TICKET_STATUS,
+        Ticket.created_at < cutoff,
+        ~recent_update,
+        ~already_archived
+    ).order_by(Ticket.ticket_id).limit(settings.TICKET_ARCHIVE_BATCH_SIZE).with_for_update().all()]
+
+    if not ticket_ids:
+        db.rollback()
+        return 0
+
+    _move(db, TicketUpdate, ArchivedTicketUpdate, TicketUpdate.ticket_id, ticket_ids)
+    _move(db, Ticket, ArchivedTicket, Ticket.ticket_id, ticket_ids, archived_at=datetime.now())
+    db.query(TicketClaim).filter(TicketClaim.ticket_id.in_(ticket_ids)).delete(synchronize_session=False)
+
+    etags.bump_version(db, etags.TICKETS)
+    db.commit()
+    return len(ticket_ids)
+
+
+def archive_closed_tickets() -> int:
+    """
+    Move closed tickets older than TICKET_ARCHIVE_AFTER_DAYS (by creation and
+    last update) into the archive tables, TICKET_ARCHIVE_BATCH_SIZE at a time
+    with a commit per batch, so locks and undo stay small.
+    Runs as a leader-only background job.
+
+    Returns:
+        int: Number of tickets archived
+    """
+    adminDb = new_admin_session()
+    try:
+        cutoff = datetime.now() - timedelta(days=settings.TICKET_ARCHIVE_AFTER_DAYS)
+        archived = 0
+
+        for _ in range(settings.TICKET_ARCHIVE_MAX_BATCHES):
+            moved = archive_batch(adminDb, cutoff)
+            archived += moved
+            if moved < settings.TICKET_ARCHIVE_BATCH_SIZE:
+                break
+
+        if archived:
+            logger.info(f"Archived {archived} closed tickets older than {settings.TICKET_ARCHIVE_AFTER_DAYS} days")
+        return archived
+
+    except Exception:
+        adminDb.rollback()
+        raise
+    finally:
+        adminDb.close()
@@ -0,0 +1,180 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_ticket_updates import TicketUpdate
+from database.db_tickets import ArchivedTicket, Ticket
+from schema.s_ticket_updates import TicketUpdateSchema
+from schema.s_tickets import TicketSchema
+from utils import client_summary, dashboard_stats, etags, events
+from utils.ticket_archive import max_ticket_id
+from utils.ticket_queue import pending_version
+
+logger = get_logger(__name__)
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+
+
+def _parse_created_at(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"created_at: invalid ISO datetime '{value}'")
+
+
+def _existing_ticket_ids(db: Session, ticket_ids: List[int], include_archived: bool = False) -> Set[int]:
+    """Which of the ids already exist, one IN (...) query per chunk and table."""
+    chunk_size = settings.TICKET_IMPORT_CHUNK_SIZE
+    existing = set()
+    for start in range(0, len(ticket_ids), chunk_size):
+        chunk = ticket_ids[start:start + chunk_size]
+        existing.update(row[0] for row in db.query(Ticket.ticket_id).filter(Ticket.ticket_id.in_(chunk)).all())
+        if include_archived:
+            existing.update(row[0] for row in db.query(ArchivedTicket.ticket_id).filter(ArchivedTicket.ticket_id.in_(chunk)).all())
+    return existing
+
+
+def _insert_chunks(db: Session, table, rows: List[Dict]) -> None:
+    # One executemany per chunk keeps statements and driver buffers bounded
+    chunk_size = settings.TICKET_IMPORT_CHUNK_SIZE
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(table), rows[start:start + chunk_size])
+
+
+def import_records(db: Session, tickets: List[Dict], updates: List[Dict], dry_run: bool = False) -> Dict:
+    """
+    Validate and insert a batch of tickets and ticket updates in one transaction.
+
+    Tickets with ticket_id 0 get ids allocated in one step after the current
+    maximum; explicit ids are kept (so updates in the same batch can refer to
+    them) and must not exist yet. Updates must refer to an existing ticket or
+    one imported in the same batch. Records that fail are reported by index
+    and skipped; all other records are inserted.
+
+    Args:
+        db: Admin database session; committed here unless `dry_run`.
+        tickets: Raw ticket records (TicketSchema fields).
+        updates: Raw ticket update records (TicketUpdateSchema fields).
+        dry_run: Validate only.
+
+    Returns:
+        dict: Imported counts, the ticket id of each ticket record (None when it failed) and errors.
+    """
+    errors = []
+    ticket_rows = []
+    ticket_row_indexes = []
+
+    # Validate tickets
+    for index, record in enumerate(tickets):
+        try:
+            ticket = TicketSchema.model_validate(record)
+            ticket_rows.append({
+                "ticket_id": ticket.ticket_id,
+                "account_id": ticket.account_id,
+                "user_id": ticket.user_id,
+                "subject": ticket.subject,
+                "description": ticket.description,
+                "status": ticket.status,
+                "priority": ticket.priority,
+                "created_at": _parse_created_at(ticket.created_at),
+                "contact_mode": ticket.contact_mode,
+                "clinet_name": ticket.client_name,
+                "client_phone": ticket.client_phone or "",
+                "clinet_email": ticket.client_email or "",
+                "attachment": ticket.attachment,
+                "notes": ticket.notes or None
+            })
+            ticket_row_indexes.append(index)
+        except ValidationError as e:
+            errors.append({"type": "ticket", "index": index, "error": _validation_message(e)})
+        except ValueError as e:
+            errors.append({"type": "ticket", "index": index, "error": str(e)})
+
+    # Explicit ids must be unique within the batch and not exist yet
+    explicit_ids = [row["ticket_id"] for row in ticket_rows if row["ticket_id"]]
+    taken = _existing_ticket_ids(db, explicit_ids, include_archived=True)
+    seen = set()
+    valid_tickets = []
+
+    for index, row in zip(ticket_row_indexes, ticket_rows):
+        ticket_id = row["ticket_id"]
+        if ticket_id and (ticket_id in taken or ticket_id in seen):
+            errors.append({"type": "ticket", "index": index, "error": f"Ticket ID {ticket_id} already exists"})
+            continue
+        seen.add(ticket_id)
+        valid_tickets.append((index, row))
+
+    # Allocate ids for the rest in one step (above archived ids too); the row lock keeps create_ticket from taking them meanwhile
+    max_id = max_ticket_id(db)
+    next_id = max(max_id, max(explicit_ids, default=0)) + 1
+
+    ticket_ids: List[Optional[int]] = [None] * len(tickets)
+    for index, row in valid_tickets:
+        if not row["ticket_id"]:
+            row["ticket_id"] = next_id
+            next_id += 1
+        ticket_ids[index] = row["ticket_id"]
+
+    # Validate updates; they may refer to tickets of this batch
+    batch_ticket_ids = {row["ticket_id"] for _, row in valid_tickets}
+    referenced = list({record.get("ticket_id") for record in updates if isinstance(record.get("ticket_id"), int)} - batch_ticket_ids)
+    known_ticket_ids = batch_ticket_ids | _existing_ticket_ids(db, referenced)
+
+    update_rows = []
+    for index, record in enumerate(updates):
+        try:
+            update = TicketUpdateSchema.model_validate(record)
+            if update.ticket_id not in known_ticket_ids:
+                raise ValueError(f"Ticket {update.ticket_id} not found")
+            update_rows.append({
+                "ticket_id": update.ticket_id,
+                "user_id": update.updated_by,
+                "description": update.description,
+                "attachment": update.attachment,
+                "created_at": _parse_created_at(update.created_at),
+                "contact_mode": update.contact_mode,
+                "notes": update.notes or None
+            })
+        except ValidationError as e:
+            errors.append({"type": "update", "index": index, "error": _validation_message(e)})
+        except ValueError as e:
+            errors.append({"type": "update", "index": index, "error": str(e)})
+
+    errors.sort(key=lambda error: (error["type"] != "ticket", error["index"]))
+
+    result = {
+        "tickets_imported": len(valid_tickets),
+        "updates_imported": len(update_rows),
+        "ticket_ids": ticket_ids,
+        "errors": errors,
+        "dry_run": dry_run
+    }
+
+    if dry_run:
+        db.rollback()
+        return result
+
+    _insert_chunks(db, Ticket.__table__, [row for _, row in valid_tickets])
+    _insert_chunks(db, TicketUpdate.__table__, update_rows)
+
+    version = None
+    if valid_tickets or update_rows:
+        etags.bump_version(db, etags.TICKETS)
+        version = pending_version(db)
+        account_ids = list({row["account_id"] for _, row in valid_tickets})
+        for start in range(0, len(account_ids), settings.TICKET_IMPORT_CHUNK_SIZE):
+            client_summary.refresh_open_tickets(db, account_ids[start:start + settings.TICKET_IMPORT_CHUNK_SIZE])
+        dashboard_stats.tickets_changed(db, [], [(row["status"], row["priority"]) for _, row in valid_tickets])
+
+    db.commit()
+
+    if version is not None:
+        events.publish("tickets_imported", version, tickets=len(valid_tickets), updates=len(update_rows))
+
+    logger.info(f"Imported {len(valid_tickets)} tickets and {len(update_rows)} updates ({len(errors)} rejected)")
+    return result
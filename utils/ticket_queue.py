@@ -0,0 +1,206 @@
+import heapq
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_ticket_claims import TicketClaim
+from database.db_tickets import OPEN_TICKET_STATUSES, Ticket
+from database.session import new_admin_session
+from utils import etags
+
+logger = get_logger(__name__)
+
+
+def sla_deadline(priority: int, created_at: datetime) -> datetime:
+    """Time by which a ticket should be picked up, from TICKET_SLA_HOURS_* by priority."""
+    hours = {
+        3: settings.TICKET_SLA_HOURS_HIGH,
+        2: settings.TICKET_SLA_HOURS_MEDIUM,
+    }.get(priority, settings.TICKET_SLA_HOURS_LOW)
+    return created_at + timedelta(hours=hours)
+
+
+def _queue_key(priority: int, created_at: datetime, ticket_id: int) -> Tuple:
+    # Earliest SLA deadline first; ties go to the higher priority, then the older ticket
+    return (sla_deadline(priority, created_at), -priority, created_at, ticket_id)
+
+
+class TicketQueue:
+    """
+    Open, unclaimed tickets of this worker in "next to work" order.
+
+    A binary heap with lazy deletion: updated or removed tickets leave stale
+    entries behind that are skipped when popped. The heap is only a local
+    ordering; claims are made atomic by the TicketClaim primary key, so
+    workers with slightly different heaps never hand out the same ticket.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple] = []
+        self._keys: Dict[int, Tuple] = {}
+        self._lock = threading.Lock()
+        self.synced_version: Optional[int] = None  # TICKETS version the heap reflects
+
+    def rebuild(self, entries: List[Tuple[int, int, datetime]], version: int) -> None:
+        """Replace the heap with (ticket_id, priority, created_at) entries read at `version`."""
+        keys = {ticket_id: _queue_key(priority, created_at, ticket_id) for ticket_id, priority, created_at in entries}
+        heap = [(key, ticket_id) for ticket_id, key in keys.items()]
+        heapq.heapify(heap)
+
+        with self._lock:
+            self._keys = keys
+            self._heap = heap
+            self.synced_version = version
+
+    def push(self, ticket_id: int, priority: int, created_at: datetime) -> None:
+        """Add a ticket or move it to its new position."""
+        key = _queue_key(priority, created_at, ticket_id)
+        with self._lock:
+            self._keys[ticket_id] = key
+            heapq.heappush(self._heap, (key, ticket_id))
+            self._compact()
+
+    def remove(self, ticket_id: int) -> None:
+        with self._lock:
+            self._keys.pop(ticket_id, None)
+            self._compact()
+
+    def pop(self) -> Optional[int]:
+        """Remove and return the next ticket id, or None when the queue is empty."""
+        with self._lock:
+            while self._heap:
+                key, ticket_id = heapq.heappop(self._heap)
+                if self._keys.get(ticket_id) == key:
+                    del self._keys[ticket_id]
+                    return ticket_id
+            return None
+
+    def apply(self, ticket: Ticket, version: int) -> None:
+        """
+        Reflect a ticket write committed at `version` by this worker.
+        The heap stays in sync only if no other worker wrote in between;
+        otherwise the next `next_ticket` rebuilds it.
+        """
+        if ticket.status in OPEN_TICKET_STATUSES:
+            self.push(ticket.ticket_id, ticket.priority, ticket.created_at)
+        else:
+            self.remove(ticket.ticket_id)
+
+        with self._lock:
+            if self.synced_version == version - 1:
+                self.synced_version = version
+
+    def _compact(self) -> None:
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._keys) + 64:
+            self._heap = [(key, ticket_id) for ticket_id, key in self._keys.items()]
+            heapq.heapify(self._heap)
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {"waiting": len(self._keys), "heap_entries": len(self._heap), "synced_version": self.synced_version}
+
+
+queue = TicketQueue()
+
+
+def pending_version(db: Session) -> int:
+    """TICKETS version the caller's transaction will commit; call after `etags.bump_version`."""
+    db.flush()
+    return etags.get_version(db, etags.TICKETS)
+
+
+def load_queue(db: Session) -> int:
+    """
+    Rebuild the heap from open tickets without a live claim.
+
+    Returns:
+        int: Number of tickets in the queue
+    """
+    # Read the version first so writes made during the query trigger another rebuild
+    version = etags.get_version(db, etags.TICKETS)
+
+    entries = db.query(
+        Ticket.ticket_id, Ticket.priority, Ticket.created_at
+    ).outerjoin(
+        TicketClaim, and_(TicketClaim.ticket_id == Ticket.ticket_id, TicketClaim.expires_at > datetime.now())
+    ).filter(
+        Ticket.status.in_(OPEN_TICKET_STATUSES),
+        TicketClaim.ticket_id.is_(None)
+    ).all()
+
+    queue.rebuild([tuple(entry) for entry in entries], version)
+    return len(entries)
+
+
+def claim_next(db: Session, user_id: int) -> Optional[Tuple[Ticket, TicketClaim]]:
+    """
+    Claim the next ticket for `user_id` and commit the claim.
+
+    Tickets another worker claimed or closed since the heap was built are
+    dropped as they are popped.
+
+    Returns:
+        tuple: (ticket, claim), or None when no unclaimed open ticket is waiting
+    """
+    if queue.synced_version != etags.get_version(db, etags.TICKETS):
+        load_queue(db)
+
+    while True:
+        ticket_id = queue.pop()
+        if ticket_id is None:
+            return None
+
+        now = datetime.now()
+
+        # An expired claim no longer holds the ticket
+        db.query(TicketClaim).filter(
+            TicketClaim.ticket_id == ticket_id,
+            TicketClaim.expires_at <= now
+        ).delete(synchronize_session=False)
+
+        claim = TicketClaim(
+            ticket_id=ticket_id,
+            user_id=user_id,
+            claimed_at=now,
+            expires_at=now + timedelta(seconds=settings.TICKET_CLAIM_TTL_SECONDS)
+        )
+        db.add(claim)
+
+        try:
+            db.flush()
+        except IntegrityError:
+            # Claimed by someone else first
+            db.rollback()
+            continue
+
+        ticket = db.query(Ticket).filter(
+            Ticket.ticket_id == ticket_id,
+            Ticket.status.in_(OPEN_TICKET_STATUSES)
+        ).first()
+
+        if ticket is None:
+            db.rollback()
+            continue
+
+        db.commit()
+        return ticket, claim
+
+
+def rebuild_ticket_queue() -> int:
+    """
+    Periodic rebuild in every worker; returns tickets whose claims expired or
+    were released in other workers to this worker's heap.
+
+    Returns:
+        int: Number of tickets in the queue
+    """
+    adminDb = new_admin_session()
+    try:
+        return load_queue(adminDb)
+    finally:
+        adminDb.close()
@@ -0,0 +1,128 @@
+import threading
+from typing import Dict, List, Tuple
+from sqlalchemy import desc, func, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+from database.db_ticket_updates import ArchivedTicketUpdate, TicketUpdate
+from database.db_tickets import ArchivedTicket, Ticket
+from utils import etags
+from utils.search_index import InvertedIndex
+
+logger = get_logger(__name__)
+
+# Subject words count double in the in-process index
+SUBJECT_WEIGHT = 2.0
+
+
+def use_fulltext(db: Session) -> bool:
+    """FULLTEXT indexes on MySQL; the in-process index elsewhere (SQLite for local runs and tests)."""
+    if settings.TICKET_SEARCH_BACKEND == "auto":
+        return db.get_bind().dialect.name == "mysql"
+    return settings.TICKET_SEARCH_BACKEND == "fulltext"
+
+
+def _fulltext_search(db: Session, query: str, limit: int, offset: int, include_archived: bool) -> Tuple[List[Tuple[int, float]], int]:
+    tables = [(Ticket, TicketUpdate)]
+    if include_archived:
+        tables.append((ArchivedTicket, ArchivedTicketUpdate))
+
+    # Relevance of the ticket text plus the summed relevance of its updates
+    selects = []
+    for ticket_model, update_model in tables:
+        ticket_relevance = match(ticket_model.subject, ticket_model.description, against=query)
+        update_relevance = match(update_model.description, against=query)
+        selects.append(db.query(ticket_model.ticket_id.label("ticket_id"), ticket_relevance.label("score")).filter(ticket_relevance > 0))
+        selects.append(db.query(update_model.ticket_id.label("ticket_id"), update_relevance.label("score")).filter(update_relevance > 0))
+
+    scores = union_all(*selects).subquery()
+
+    ranked = db.query(scores.c.ticket_id, func.sum(scores.c.score).label("score")).group_by(scores.c.ticket_id)
+    total = ranked.count()
+    page = ranked.order_by(desc("score"), scores.c.ticket_id).offset(offset).limit(limit).all()
+    return [(row.ticket_id, float(row.score)) for row in page], total
+
+
+class TicketTextIndex:
+    """
+    Per-worker inverted index over ticket subjects, descriptions and update
+    descriptions of one pair of tables (live or archive).
+
+    Before each search the index catches up with rows whose id is above the
+    last indexed id, which covers tickets and updates created by any worker or
+    import. If the row counts still differ (rows archived, or inserted below the
+    current maximum id, as the archive job does) the index is rebuilt.
+    """
+
+    def __init__(self, ticket_model, update_model):
+        self.ticket_model = ticket_model
+        self.update_model = update_model
+        self.index = InvertedIndex()
+        self._lock = threading.Lock()
+        self._last_ticket_id = 0
+        self._last_update_id = 0
+        self._tickets = 0
+        self._updates = 0
+
+    def _add_rows(self, db: Session) -> None:
+        chunk_size = settings.TICKET_IMPORT_CHUNK_SIZE
+        ticket_model, update_model = self.ticket_model, self.update_model
+
+        tickets = db.query(ticket_model.ticket_id, ticket_model.subject, ticket_model.description).filter(
+            ticket_model.ticket_id > self._last_ticket_id
+        ).order_by(ticket_model.ticket_id).yield_per(chunk_size)
+        for ticket_id, subject, description in tickets:
+            self.index.add(ticket_id, subject, SUBJECT_WEIGHT)
+            self.index.add(ticket_id, description)
+            self._last_ticket_id = ticket_id
+            self._tickets += 1
+
+        updates = db.query(update_model.update_id, update_model.ticket_id, update_model.description).filter(
+            update_model.update_id > self._last_update_id
+        ).order_by(update_model.update_id).yield_per(chunk_size)
+        for update_id, ticket_id, description in updates:
+            self.index.add(ticket_id, description)
+            self._last_update_id = update_id
+            self._updates += 1
+
+    def sync(self, db: Session) -> None:
+        ticket_count, _ = etags.watermark(db, self.ticket_model.ticket_id)
+        update_count, _ = etags.watermark(db, self.update_model.update_id)
+
+        with self._lock:
+            self._add_rows(db)
+
+            if (self._tickets, self._updates) != (ticket_count, update_count):
+                logger.info(f"Rebuilding the ticket search index for {self.ticket_model.__tablename__}")
+                self.index = InvertedIndex()
+                self._last_ticket_id = self._last_update_id = self._tickets = self._updates = 0
+                self._add_rows(db)
+
+    def search(self, db: Session, query: str) -> List[Tuple[int, float]]:
+        self.sync(db)
+        return self.index.search(query)
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {"tickets": self._tickets, "updates": self._updates, **self.index.info()}
+
+
+text_index = TicketTextIndex(Ticket, TicketUpdate)
+archive_text_index = TicketTextIndex(ArchivedTicket, ArchivedTicketUpdate)
+
+
+def search(db: Session, query: str, limit: int, offset: int, include_archived: bool = False) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Ranked ticket ids matching `query` in the ticket subject, description or update descriptions.
+
+    Returns:
+        tuple: ([(ticket_id, score), ...] for the page, total number of matching tickets)
+    """
+    if use_fulltext(db):
+        return _fulltext_search(db, query, limit, offset, include_archived)
+
+    ranked = text_index.search(db, query)
+    if include_archived:
+        ranked = sorted(ranked + archive_text_index.search(db, query), key=lambda item: (-item[1], item[0]))
+    return ranked[offset:offset + limit], len(ranked)